@@ -1,4 +1,11 @@
+from pathlib import Path
+
+from django.conf import settings
 from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
 from airport.models import (Airport,
                             Crew,
                             Route,
@@ -6,13 +13,87 @@ from airport.models import (Airport,
                             Airplane,
                             AirplaneType,
                             Ticket,
-                            Order)
+                            Order,
+                            ArchivedTicket,
+                            RouteDailyAvailability,
+                            Job,
+                            RequestProfile)
+from airport.jobs import queue_stats
 
 admin.site.register(Airport)
 admin.site.register(Crew)
 admin.site.register(Route)
 admin.site.register(Flight)
 admin.site.register(AirplaneType)
-admin.site.register(Ticket)
 admin.site.register(Order)
 admin.site.register(Airplane)
+admin.site.register(ArchivedTicket)
+admin.site.register(RouteDailyAvailability)
+
+
+@admin.register(Ticket)
+class TicketAdmin(admin.ModelAdmin):
+    list_display = ("id", "flight", "row", "seat", "order", "needs_reseat")
+    list_filter = ("needs_reseat",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id",
+                    "name",
+                    "status",
+                    "attempts",
+                    "created_at",
+                    "started_at",
+                    "finished_at",)
+    list_filter = ("status", "name")
+    readonly_fields = ("created_at", "started_at", "finished_at")
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {**(extra_context or {}),
+                         "queue_stats": queue_stats()}
+        return super().changelist_view(request, extra_context)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ("created_at",
+                    "method",
+                    "path",
+                    "view",
+                    "status",
+                    "duration",
+                    "sql_count",
+                    "sql_duration",
+                    "kind",
+                    "download",)
+    list_filter = ("kind", "view")
+    search_fields = ("path",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="profile")
+    def download(self, obj):
+        url = reverse("admin:airport_requestprofile_download", args=[obj.id])
+        return format_html('<a href="{}">{}</a>', url, obj.file_name)
+
+    def get_urls(self):
+        return [
+            path("<int:profile_id>/download/",
+                 self.admin_site.admin_view(self.download_view),
+                 name="airport_requestprofile_download"),
+            *super().get_urls(),
+        ]
+
+    def download_view(self, request, profile_id):
+        profile = get_object_or_404(RequestProfile, id=profile_id)
+        file_path = Path(settings.PROFILING_DIR) / profile.file_name
+        if not file_path.is_file():
+            raise Http404
+        return FileResponse(open(file_path, "rb"),
+                            as_attachment=True,
+                            filename=profile.file_name)
@@ -0,0 +1,162 @@
+"""
+Admin analytics over the whole schedule.
+
+Load factors and airport traffic come from the Flight.capacity and
+Flight.seats_sold counters, so they are a GROUP BY over flights only;
+ticket tables are scanned just for revenue and the seat heatmap, each
+with one grouped query per table. Results are cached for
+ANALYTICS_CACHE_TIMEOUT seconds.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Concat
+
+from airport.models import Airport, ArchivedTicket, Flight, Ticket
+
+LOAD_FACTOR_GROUPS = ("route", "day", "airplane_type")
+
+
+def cached(name: str, compute, *params):
+    key = ":".join(
+        ["analytics", name]
+        + [param.isoformat() if hasattr(param, "isoformat") else str(param)
+           for param in params]
+    )
+    return cache.get_or_set(key, compute, settings.ANALYTICS_CACHE_TIMEOUT)
+
+
+def ratio(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def departing(queryset, start=None, end=None, prefix: str = ""):
+    if start:
+        queryset = queryset.filter(**{f"{prefix}departure_time__gte": start})
+    if end:
+        queryset = queryset.filter(**{f"{prefix}departure_time__lt": end})
+    return queryset
+
+
+def group_key(group: str, prefix: str = ""):
+    if group == "route":
+        return F(f"{prefix}route_id")
+    if group == "day":
+        return F(f"{prefix}departure_date")
+    return F(f"{prefix}airplane__airplane_type_id")
+
+
+def group_labels(group: str) -> dict:
+    if group == "route":
+        return {"label": Concat("route__source__name",
+                                Value(" > "),
+                                "route__destination__name")}
+    if group == "airplane_type":
+        return {"label": F("airplane__airplane_type__name")}
+    return {}
+
+
+def load_factor(group: str, start=None, end=None) -> list:
+    """Capacity, seats sold, load factor and revenue per `group`."""
+    def compute():
+        revenue = Counter()
+        for model in (Ticket, ArchivedTicket):
+            for key, amount in (
+                departing(model.objects, start, end, "flight__")
+                .values_list(group_key(group, "flight__"))
+                .annotate(revenue=Sum("price"))
+                .order_by()
+            ):
+                revenue[key] += amount or 0
+        rows = (departing(Flight.objects, start, end)
+                .values(key=group_key(group), **group_labels(group))
+                .annotate(flights=Count("id"),
+                          capacity=Sum("capacity"),
+                          seats_sold=Sum("seats_sold"))
+                .order_by("key"))
+        return [{"label": str(row["key"]),
+                 **row,
+                 "load_factor": ratio(row["seats_sold"], row["capacity"]),
+                 "revenue": revenue[row["key"]]}
+                for row in rows]
+
+    return cached("load_factor", compute, group, start, end)
+
+
+def busiest_airports(start=None, end=None, limit: int = 10) -> list:
+    """Airports with the most passengers departing and arriving."""
+    def compute():
+        traffic = {}
+        flights = departing(Flight.objects, start, end)
+        for direction, field in (("departures", "route__source_id"),
+                                 ("arrivals", "route__destination_id")):
+            for airport_id, count, passengers in (
+                flights.values_list(field)
+                .annotate(count=Count("id"), passengers=Sum("seats_sold"))
+                .order_by()
+            ):
+                row = traffic.setdefault(airport_id, {"airport": airport_id,
+                                                      "departures": 0,
+                                                      "arrivals": 0,
+                                                      "passengers": 0})
+                row[direction] = count
+                row["passengers"] += passengers
+        top = sorted(traffic.values(),
+                     key=lambda row: (-row["passengers"],
+                                      -row["departures"] - row["arrivals"],
+                                      row["airport"]))[:limit]
+        names = dict(Airport.objects
+                     .filter(id__in=[row["airport"] for row in top])
+                     .values_list("id", "name"))
+        return [{**row, "name": names[row["airport"]]} for row in top]
+
+    return cached("busiest_airports", compute, start, end, limit)
+
+
+def seat_heatmap(airplane_type_id: int, start=None, end=None) -> dict:
+    """Share of flights each seat was sold on, per row and seat
+    number, for the flights of an airplane type."""
+    def compute():
+        flights = departing(
+            Flight.objects.filter(airplane__airplane_type_id=airplane_type_id),
+            start, end,
+        )
+        layouts = list(flights
+                       .values_list("airplane__rows", "airplane__seats_in_row")
+                       .annotate(count=Count("id"))
+                       .order_by())
+        sold = Counter()
+        for model in (Ticket, ArchivedTicket):
+            tickets = departing(
+                model.objects.filter(
+                    flight__airplane__airplane_type_id=airplane_type_id
+                ),
+                start, end, "flight__",
+            )
+            for row, seat, count in (tickets.values_list("row", "seat")
+                                     .annotate(count=Count("id"))
+                                     .order_by()):
+                sold[row, seat] += count
+        rows_count = max((rows for rows, _, _ in layouts), default=0)
+        seats_count = max((seats for _, seats, _ in layouts), default=0)
+        heatmap = []
+        for row in range(1, rows_count + 1):
+            offered = [
+                sum(count for rows, seats, count in layouts
+                    if rows >= row and seats >= seat)
+                for seat in range(1, seats_count + 1)
+            ]
+            row_sold = [sold[row, seat]
+                        for seat in range(1, seats_count + 1)]
+            heatmap.append({
+                "row": row,
+                "load_factor": ratio(sum(row_sold), sum(offered)),
+                "seats": [ratio(*pair) for pair in zip(row_sold, offered)],
+            })
+        return {"airplane_type": airplane_type_id,
+                "flights": sum(count for _, _, count in layouts),
+                "rows": heatmap}
+
+    return cached("seat_heatmap", compute, airplane_type_id, start, end)
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from airport.models import ArchivedTicket, Flight, Ticket
+
+
+def delete_tickets(ticket_ids: list, using: str,
+                   chunk_size: int = 500) -> None:
+    """Plain DELETE without post_delete signals: archived seats stay
+    sold in the availability summary."""
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for start in range(0, len(ticket_ids), chunk_size):
+            chunk = ticket_ids[start:start + chunk_size]
+            cursor.execute(
+                f"DELETE FROM {quote(Ticket._meta.db_table)} "
+                f"WHERE {quote(Ticket._meta.pk.column)} IN "
+                f"({', '.join(['%s'] * len(chunk))})",
+                chunk,
+            )
+
+
+def archive_tickets(days: int, batch_size: int = 500) -> int:
+    """Move tickets of flights departed more than `days` ago
+    into ArchivedTicket, returns the number of moved tickets."""
+    cutoff = timezone.now() - timedelta(days=days)
+    flight_ids = list(
+        Flight.objects
+        .filter(departure_time__lt=cutoff, tickets__isnull=False)
+        .values_list("id", flat=True)
+        .distinct()
+        .order_by("id")
+    )
+    moved = 0
+    for start in range(0, len(flight_ids), batch_size):
+        batch = flight_ids[start:start + batch_size]
+        with transaction.atomic():
+            tickets = Ticket.objects.filter(flight_id__in=batch).order_by()
+            rows = list(
+                tickets.select_for_update()
+                .values("id", "row", "seat", "flight_id", "order_id", "price")
+            )
+            ArchivedTicket.objects.bulk_create(
+                [ArchivedTicket(**row) for row in rows],
+                batch_size=1000,
+            )
+            delete_tickets([row["id"] for row in rows], tickets.db)
+            moved += len(rows)
+    return moved
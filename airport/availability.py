@@ -0,0 +1,92 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from airport.models import (
+    ArchivedTicket,
+    Flight,
+    RouteDailyAvailability,
+    Ticket,
+)
+
+
+def flight_day(flight: Flight):
+    return flight.departure_date
+
+
+def refresh_route_day(route_id: int, date) -> None:
+    """Recompute a single (route, date) bucket from the base tables."""
+    flights = Flight.objects.filter(
+        route_id=route_id,
+        departure_date=date,
+    )
+    totals = flights.aggregate(
+        flights_count=Count("id"),
+        capacity=Sum(F("airplane__rows") * F("airplane__seats_in_row")),
+    )
+    if not totals["flights_count"]:
+        RouteDailyAvailability.objects.filter(
+            route_id=route_id, date=date
+        ).delete()
+        return
+    seats_sold = sum(
+        model.objects.filter(flight__in=flights).count()
+        for model in (Ticket, ArchivedTicket)
+    )
+    RouteDailyAvailability.objects.update_or_create(
+        route_id=route_id,
+        date=date,
+        defaults={
+            "flights_count": totals["flights_count"],
+            "capacity": totals["capacity"],
+            "seats_sold": seats_sold,
+        },
+    )
+
+
+def add_seats_sold(flight: Flight, delta: int) -> None:
+    """Apply a ticket sale/refund to the flight's bucket in one UPDATE."""
+    date = flight_day(flight)
+    updated = RouteDailyAvailability.objects.filter(
+        route_id=flight.route_id, date=date
+    ).update(seats_sold=F("seats_sold") + delta)
+    if not updated:
+        refresh_route_day(flight.route_id, date)
+
+
+def refresh_all() -> int:
+    """Rebuild the whole summary table, returns the number of buckets."""
+    flights = (
+        Flight.objects
+        .values("route_id", date=F("departure_date"))
+        .annotate(
+            flights_count=Count("id"),
+            capacity=Sum(F("airplane__rows") * F("airplane__seats_in_row")),
+        )
+        .order_by()
+    )
+    sold = Counter()
+    for model in (Ticket, ArchivedTicket):
+        for row in (
+            model.objects
+            .values(route_id=F("flight__route_id"),
+                    date=F("flight__departure_date"))
+            .annotate(seats_sold=Count("id"))
+            .order_by()
+        ):
+            sold[row["route_id"], row["date"]] += row["seats_sold"]
+    buckets = [
+        RouteDailyAvailability(
+            route_id=row["route_id"],
+            date=row["date"],
+            flights_count=row["flights_count"],
+            capacity=row["capacity"],
+            seats_sold=sold[row["route_id"], row["date"]],
+        )
+        for row in flights
+    ]
+    with transaction.atomic():
+        RouteDailyAvailability.objects.all().delete()
+        RouteDailyAvailability.objects.bulk_create(buckets, batch_size=1000)
+    return len(buckets)
@@ -0,0 +1,91 @@
+"""
+Crew schedules and overlap checks.
+
+`CrewAssignment` mirrors the Flight.crew table together with the
+flight times and is indexed by (crew, departure_time), so every crew
+member has a sorted array of duty intervals. While a member's
+intervals don't overlap, a new interval [departure, arrival) can only
+collide with the last interval starting before it or with intervals
+starting inside it: two index seeks per crew member, however many
+flights they already flew.
+"""
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+
+from airport.models import Crew, CrewAssignment, Flight
+from airport.utils import chunked
+
+
+def conflicts(crew_ids, departure, arrival,
+              exclude_flight_id: int = None) -> list:
+    """Assignments of `crew_ids` overlapping [departure, arrival)."""
+    crew_ids = list(crew_ids)
+    others = CrewAssignment.objects.all()
+    if exclude_flight_id is not None:
+        others = others.exclude(flight_id=exclude_flight_id)
+    previous_ids = (
+        Crew.objects
+        .filter(id__in=crew_ids)
+        .annotate(previous_id=Subquery(
+            others
+            .filter(crew=OuterRef("pk"), departure_time__lt=departure)
+            .order_by("-departure_time")
+            .values("id")[:1]
+        ))
+        .values("previous_id")
+    )
+    return list(
+        others
+        .filter(crew_id__in=crew_ids)
+        .filter(Q(departure_time__gte=departure, departure_time__lt=arrival)
+                | Q(id__in=previous_ids, arrival_time__gt=departure))
+        .select_related("crew")
+        .order_by("crew_id", "departure_time")
+    )
+
+
+def add(flight_ids, crew_ids) -> None:
+    flights = Flight.objects.filter(id__in=flight_ids).values_list(
+        "id", "departure_time", "arrival_time"
+    )
+    CrewAssignment.objects.bulk_create(
+        [CrewAssignment(crew_id=crew_id,
+                        flight_id=flight_id,
+                        departure_time=departure,
+                        arrival_time=arrival)
+         for flight_id, departure, arrival in flights
+         for crew_id in crew_ids],
+        ignore_conflicts=True,
+    )
+
+
+def sync_flight_times(flight: Flight) -> None:
+    CrewAssignment.objects.filter(flight=flight).update(
+        departure_time=flight.departure_time,
+        arrival_time=flight.arrival_time,
+    )
+
+
+def rebuild(chunk_size: int = 10_000) -> int:
+    """Refill CrewAssignment from Flight.crew, returns the row count."""
+    through = Flight.crew.through
+    rows = (through.objects
+            .order_by("id")
+            .values_list("crew_id",
+                         "flight_id",
+                         "flight__departure_time",
+                         "flight__arrival_time")
+            .iterator(chunk_size=chunk_size))
+    count = 0
+    with transaction.atomic():
+        CrewAssignment.objects.all().delete()
+        for chunk in chunked(rows, chunk_size):
+            CrewAssignment.objects.bulk_create(
+                CrewAssignment(crew_id=crew_id,
+                               flight_id=flight_id,
+                               departure_time=departure,
+                               arrival_time=arrival)
+                for crew_id, flight_id, departure, arrival in chunk
+            )
+            count += len(chunk)
+    return count
@@ -0,0 +1,309 @@
+"""
+Deterministic synthetic data for performance investigations.
+
+Every stage draws from its own `random.Random(f"{seed}-{stage}")`, so
+the same seed, sizes and `as_of` date always give the same rows.
+Rows are produced by generators and written with `bulk_create` one
+chunk at a time; only ids (and the route graph) are kept in memory,
+flights are streamed back from the database to generate orders and
+tickets.
+
+Flights follow airplane rotations (see airport.rotation) and tickets
+carry the fare they would have been sold at (see airport.pricing), so
+the generated data passes the same checks as data entered through the
+API.
+"""
+import itertools
+import random
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from airport.availability import refresh_all
+from airport.inventory import recount
+from airport.localtime import fill_local_dates
+from airport.models import (Airplane,
+                            AirplaneType,
+                            Airport,
+                            Flight,
+                            Order,
+                            Route,
+                            Ticket)
+from airport.pricing import (days_bucket,
+                             fare,
+                             load_bucket,
+                             recompute_all)
+from airport.rotation import min_turnaround
+from airport.utils import chunked
+
+SCALES = {
+    "tiny": {"users": 5, "airports": 10, "airplanes": 5, "flights": 40},
+    "small": {"users": 500, "airports": 200, "airplanes": 50,
+              "flights": 5_000},
+    "medium": {"users": 5_000, "airports": 1_000, "airplanes": 300,
+               "flights": 50_000},
+    "large": {"users": 20_000, "airports": 5_000, "airplanes": 1_000,
+              "flights": 200_000},
+}
+AIRPLANE_TYPES = ("Airbus A320", "Boeing 737", "Embraer E190", "ATR 72")
+DEFAULT_PASSWORD = "generated-password"
+
+
+def stage_rng(seed: int, stage: str) -> random.Random:
+    return random.Random(f"{seed}-{stage}")
+
+
+def iter_users(count: int, email_prefix: str, password: str):
+    user_model = get_user_model()
+    for i in range(count):
+        yield user_model(email=f"{email_prefix}{i}@example.com",
+                         password=password)
+
+
+def iter_airports(rng: random.Random, count: int):
+    for i in range(count):
+        yield Airport(name=f"Airport {i:05d}",
+                      closest_big_city=f"City {rng.randint(0, count)}")
+
+
+def iter_routes(rng: random.Random, airport_ids: list):
+    """Hub and spoke graph: hubs are fully connected, every other
+    airport flies to and from one to three hubs."""
+    hubs_count = max(len(airport_ids) // 20, 2)
+    hubs, spokes = airport_ids[:hubs_count], airport_ids[hubs_count:]
+    for source, destination in itertools.permutations(hubs, 2):
+        yield Route(source_id=source,
+                    destination_id=destination,
+                    distance=rng.randint(800, 9000))
+    for spoke in spokes:
+        for hub in rng.sample(hubs, min(rng.randint(1, 3), len(hubs))):
+            distance = rng.randint(200, 3000)
+            yield Route(source_id=spoke,
+                        destination_id=hub,
+                        distance=distance)
+            yield Route(source_id=hub,
+                        destination_id=spoke,
+                        distance=distance)
+
+
+def iter_airplanes(rng: random.Random, count: int, type_ids: list):
+    for i in range(count):
+        yield Airplane(name=f"Airplane {i:05d}",
+                       rows=rng.randint(15, 35),
+                       seats_in_row=rng.choice((4, 6, 6, 6)),
+                       airplane_type_id=rng.choice(type_ids))
+
+
+def iter_flights(rng: random.Random, count: int, routes: dict,
+                 airplane_ids: list, start, days: int, turnaround):
+    """Rotations: every airplane flies its share of `count` legs in a
+    chain, each departing from where the previous one arrived, at
+    least `turnaround` after it. `routes` maps a source airport id to
+    its [(route id, destination id)]."""
+    start = timezone.make_aware(datetime.combine(start, time()))
+    turnaround_minutes = int(turnaround.total_seconds() // 60)
+    sources = sorted(routes)
+    share, extra = divmod(count, len(airplane_ids))
+    for index, airplane_id in enumerate(airplane_ids):
+        legs = share + (index < extra)
+        if not legs:
+            continue
+        slot = days * 24 * 60 // legs
+        airport = rng.choice(sources)
+        departure = start + timedelta(minutes=rng.randrange(max(slot, 1)))
+        for _ in range(legs):
+            route_id, destination = rng.choice(routes[airport])
+            duration = rng.randint(45, 14 * 60)
+            arrival = departure + timedelta(minutes=duration)
+            yield Flight(route_id=route_id,
+                         airplane_id=airplane_id,
+                         departure_time=departure,
+                         arrival_time=arrival)
+            slack = max(slot - duration - turnaround_minutes, 0)
+            departure = arrival + timedelta(
+                minutes=turnaround_minutes + rng.randint(0, 2 * slack)
+            )
+            airport = destination
+
+
+def flight_load(rng: random.Random, load_factor: float,
+                departure, now, horizon_days: int) -> float:
+    """Share of sold seats: a Beta around `load_factor` for departed
+    flights, scaled down by a linear booking curve for future ones."""
+    concentration = 10
+    load = rng.betavariate(load_factor * concentration,
+                           (1 - load_factor) * concentration)
+    days_left = (departure - now).total_seconds() / 86400
+    if days_left > 0:
+        load *= max(0.05, 1 - days_left / horizon_days)
+    return load
+
+
+def iter_orders(rng: random.Random, flights, user_ids: list,
+                load_factor: float, now, horizon_days: int):
+    """Yield (order, [tickets]) for every flight row
+    (id, departure_time, rows, seats_in_row, distance).
+
+    Orders are sold one after another over the booking horizon and
+    priced with `pricing.fare` for the flight's load and days to
+    departure at the moment of the sale.
+    """
+    for flight_id, departure, rows, seats_in_row, distance in flights:
+        capacity = rows * seats_in_row
+        sold = int(capacity * flight_load(rng, load_factor, departure,
+                                          now, horizon_days))
+        seats = rng.sample(range(capacity), min(sold, capacity - 1))
+        booking_starts = departure - timedelta(days=horizon_days)
+        booking_ends = min(departure, now)
+        booked = 0
+        while seats:
+            group_size = rng.choices((1, 2, 3, 4), (55, 30, 10, 5))[0]
+            group, seats = seats[:group_size], seats[group_size:]
+            sold_at = booking_starts + (
+                (booking_ends - booking_starts) * (booked / capacity)
+            )
+            price = fare(distance,
+                         load_bucket(booked, capacity),
+                         days_bucket(departure, sold_at))
+            booked += len(group)
+            order = Order(user_id=rng.choice(user_ids))
+            yield order, [
+                Ticket(row=index // seats_in_row + 1,
+                       seat=index % seats_in_row + 1,
+                       flight_id=flight_id,
+                       price=price)
+                for index in group
+            ]
+
+
+def iter_flight_rows(after_id: int, chunk_size: int):
+    last_id = after_id
+    while True:
+        rows = list(
+            Flight.objects
+            .filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id",
+                         "departure_time",
+                         "airplane__rows",
+                         "airplane__seats_in_row",
+                         "route__distance")[:chunk_size]
+        )
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1][0]
+
+
+def bulk_insert(model, objects, chunk_size: int) -> list:
+    """bulk_create chunk by chunk, returns the new ids."""
+    ids = []
+    for chunk in chunked(objects, chunk_size):
+        with transaction.atomic():
+            ids.extend(obj.id for obj in
+                       model.objects.bulk_create(chunk))
+    return ids
+
+
+def insert_orders(pairs, chunk_size: int) -> tuple:
+    orders_count = tickets_count = 0
+    for chunk in chunked(pairs, chunk_size):
+        with transaction.atomic():
+            orders = Order.objects.bulk_create([order for order, _ in chunk])
+            tickets = []
+            for order, (_, order_tickets) in zip(orders, chunk):
+                for ticket in order_tickets:
+                    ticket.order_id = order.id
+                    tickets.append(ticket)
+            Ticket.objects.bulk_create(tickets)
+        orders_count += len(orders)
+        tickets_count += len(tickets)
+    return orders_count, tickets_count
+
+
+def generate(seed: int = 0,
+             users: int = 5,
+             airports: int = 10,
+             airplanes: int = 5,
+             flights: int = 40,
+             as_of=None,
+             start_date=None,
+             days: int = 120,
+             load_factor: float = 0.8,
+             email_prefix: str = "user",
+             password: str = DEFAULT_PASSWORD,
+             chunk_size: int = 5_000,
+             log=None) -> dict:
+    log = log or (lambda message: None)
+    as_of = as_of or timezone.now()
+    start_date = start_date or (
+        timezone.localtime(as_of).date() - timedelta(days=30)
+    )
+
+    user_ids = bulk_insert(
+        get_user_model(),
+        iter_users(users, email_prefix, make_password(password)),
+        chunk_size,
+    )
+    log(f"users: {len(user_ids)}")
+    airport_ids = bulk_insert(
+        Airport, iter_airports(stage_rng(seed, "airports"), airports),
+        chunk_size,
+    )
+    log(f"airports: {len(airport_ids)}")
+    route_ids = bulk_insert(
+        Route, iter_routes(stage_rng(seed, "routes"), airport_ids),
+        chunk_size,
+    )
+    log(f"routes: {len(route_ids)}")
+    routes = {}
+    for route_id, source_id, destination_id in (
+        Route.objects.filter(id__range=(route_ids[0], route_ids[-1]))
+        .order_by("id")
+        .values_list("id", "source_id", "destination_id")
+    ):
+        routes.setdefault(source_id, []).append((route_id, destination_id))
+    type_ids = bulk_insert(
+        AirplaneType,
+        (AirplaneType(name=name) for name in AIRPLANE_TYPES),
+        chunk_size,
+    )
+    airplane_ids = bulk_insert(
+        Airplane,
+        iter_airplanes(stage_rng(seed, "airplanes"), airplanes, type_ids),
+        chunk_size,
+    )
+    log(f"airplanes: {len(airplane_ids)}")
+    last_flight_id = (Flight.objects.order_by("-id")
+                      .values_list("id", flat=True).first() or 0)
+    flight_ids = bulk_insert(
+        Flight,
+        iter_flights(stage_rng(seed, "flights"), flights, routes,
+                     airplane_ids, start_date, days, min_turnaround()),
+        chunk_size,
+    )
+    fill_local_dates(Flight.objects.filter(id__gt=last_flight_id),
+                     chunk_size)
+    log(f"flights: {len(flight_ids)}")
+    orders_count, tickets_count = insert_orders(
+        iter_orders(stage_rng(seed, "orders"),
+                    iter_flight_rows(last_flight_id, chunk_size),
+                    user_ids, load_factor, as_of, days),
+        chunk_size,
+    )
+    log(f"orders: {orders_count}, tickets: {tickets_count}")
+    recount(Flight.objects.filter(id__gt=last_flight_id))
+    refresh_all()
+    recompute_all(now=as_of, chunk_size=chunk_size)
+    return {
+        "users": len(user_ids),
+        "airports": len(airport_ids),
+        "routes": len(route_ids),
+        "airplanes": len(airplane_ids),
+        "flights": len(flight_ids),
+        "orders": orders_count,
+        "tickets": tickets_count,
+    }
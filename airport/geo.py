@@ -0,0 +1,250 @@
+"""
+Airport coordinates and great-circle distances.
+
+Route distances are computed from the airports' latitude and
+longitude with the haversine formula. The batch recompute reads the
+airports once and the routes as a stream of id tuples, so a global
+airport database with all its routes is recomputed in seconds and only the
+routes whose distance changed are written.
+
+"Nearby airports" queries go through AirportGrid, a dict of one-degree
+cells held in process memory. It is rebuilt lazily when the
+`GRID_VERSION_KEY` token in the cache changes, which every airport
+change does, including load_airports run from a management command.
+This needs the cache shared by all processes (see CACHES), otherwise
+other workers keep their grid. The grid is always built from the
+primary, so a grid built under a new token never holds coordinates a
+lagging replica had.
+"""
+import math
+import uuid
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from airport import pricing
+from airport.models import Airport, Route
+from airport.utils import chunked
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GRID_VERSION_KEY = "geo:airport_grid_version"
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance in km between two points given in radians."""
+    chord = (math.sin((lat2 - lat1) / 2) ** 2
+             + math.cos(lat1) * math.cos(lat2)
+             * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord)))
+
+
+def great_circle_km(lat1: float, lon1: float,
+                    lat2: float, lon2: float) -> float:
+    """Distance in km between two points given in degrees."""
+    return haversine(*map(math.radians, (lat1, lon1, lat2, lon2)))
+
+
+def route_distance(source: Airport, destination: Airport):
+    """Rounded distance in km, None when coordinates are missing."""
+    coordinates = (source.latitude, source.longitude,
+                   destination.latitude, destination.longitude)
+    if None in coordinates:
+        return None
+    return round(great_circle_km(*coordinates))
+
+
+def airport_radians() -> dict:
+    airports = Airport.objects.filter(latitude__isnull=False,
+                                      longitude__isnull=False)
+    return {
+        airport_id: (math.radians(latitude), math.radians(longitude))
+        for airport_id, latitude, longitude in
+        airports.values_list("id", "latitude", "longitude")
+    }
+
+
+def save_distances(changed: list) -> None:
+    """Write (distance, route id) pairs with one prepared UPDATE,
+    bulk_update's CASE expressions are far slower at this size, and
+    reprice the routes' flights."""
+    connection = connections[Route.objects.db]
+    quote = connection.ops.quote_name
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {quote(Route._meta.db_table)} "
+            f"SET {quote('distance')} = %s WHERE {quote('id')} = %s",
+            changed,
+        )
+        pricing.refresh_routes(route_id for _distance, route_id in changed)
+
+
+def recompute_distances(airport_ids=None, check: bool = False,
+                        tolerance: float = 0.0,
+                        chunk_size: int = 2_000) -> dict:
+    """Compare Route.distance with the great-circle distance.
+
+    Routes touching `airport_ids` (all routes by default) whose stored
+    distance differs by more than `tolerance` (a share of the computed
+    distance) are updated, or only reported when `check` is set.
+    Returns counts and, with `check`, the mismatching
+    (route id, stored, computed) tuples.
+    """
+    routes = Route.objects.order_by("id")
+    if airport_ids is not None:
+        airport_ids = list(airport_ids)
+        routes = (routes.filter(source_id__in=airport_ids)
+                  | routes.filter(destination_id__in=airport_ids))
+    points = airport_radians()
+    result = {"routes": 0, "missing": 0, "mismatched": 0, "updated": 0}
+    mismatches = []
+    rows = routes.values_list("id", "source_id", "destination_id",
+                              "distance").iterator(chunk_size=chunk_size)
+    for chunk in chunked(rows, chunk_size):
+        changed = []
+        for route_id, source_id, destination_id, distance in chunk:
+            result["routes"] += 1
+            if source_id not in points or destination_id not in points:
+                result["missing"] += 1
+                continue
+            computed = round(haversine(*points[source_id],
+                                       *points[destination_id]))
+            if abs(distance - computed) > computed * tolerance:
+                if check:
+                    mismatches.append((route_id, distance, computed))
+                changed.append((computed, route_id))
+        result["mismatched"] += len(changed)
+        if changed and not check:
+            save_distances(changed)
+            result["updated"] += len(changed)
+    if check:
+        result["mismatches"] = mismatches
+    return result
+
+
+def load_airports(rows: list, chunk_size: int = 2_000) -> dict:
+    """Create or update airports from dicts with name,
+    closest_big_city, latitude and longitude, matched on name and
+    city, then recompute the distances of their routes."""
+    existing = {
+        (name, city): airport_id
+        for airport_id, name, city in
+        Airport.objects.values_list("id", "name", "closest_big_city")
+    }
+    created, updated = [], []
+    for row in rows:
+        airport = Airport(name=row["name"],
+                          closest_big_city=row["closest_big_city"],
+                          latitude=row["latitude"],
+                          longitude=row["longitude"])
+        airport.id = existing.get((airport.name, airport.closest_big_city))
+        (updated if airport.id else created).append(airport)
+    with transaction.atomic():
+        for chunk in chunked(created, chunk_size):
+            Airport.objects.bulk_create(chunk)
+        for chunk in chunked(updated, chunk_size):
+            Airport.objects.bulk_update(chunk, ["latitude", "longitude"])
+    distances = recompute_distances(
+        airport_ids=[airport.id for airport in updated],
+        chunk_size=chunk_size,
+    ) if updated else {"updated": 0}
+    # Right away outside a transaction, at commit inside one.
+    transaction.on_commit(invalidate_grid)
+    return {"created": len(created),
+            "updated": len(updated),
+            "routes_updated": distances["updated"]}
+
+
+class AirportGrid:
+    """Airports bucketed by whole degrees of latitude and longitude."""
+
+    def __init__(self, rows):
+        self.cells = defaultdict(list)
+        for airport_id, latitude, longitude in rows:
+            self.cells[self.cell(latitude, longitude)].append(
+                (airport_id,
+                 math.radians(latitude),
+                 math.radians(longitude))
+            )
+
+    @staticmethod
+    def cell(latitude: float, longitude: float) -> tuple:
+        return math.floor(latitude), math.floor(longitude) % 360
+
+    def candidates(self, latitude: float, longitude: float,
+                   radius_km: float):
+        lat_span = radius_km / KM_PER_DEGREE
+        lat_min = max(math.floor(latitude - lat_span), -90)
+        lat_max = min(math.floor(latitude + lat_span), 90)
+        # Cells narrow towards the poles, size the longitude span for
+        # the highest latitude the circle reaches.
+        highest = abs(latitude) + lat_span
+        if highest >= 89:
+            lon_cells = range(360)
+        else:
+            lon_span = lat_span / math.cos(math.radians(highest))
+            lon_min = math.floor(longitude - lon_span)
+            lon_max = math.floor(longitude + lon_span)
+            lon_cells = (range(360) if lon_max - lon_min >= 359
+                         else [lon % 360
+                               for lon in range(lon_min, lon_max + 1)])
+        for lat in range(lat_min, lat_max + 1):
+            for lon in lon_cells:
+                yield from self.cells.get((lat, lon), ())
+
+    def nearby(self, latitude: float, longitude: float,
+               radius_km: float) -> list:
+        """[(distance km, airport id)] within `radius_km`, nearest
+        first."""
+        origin = (math.radians(latitude), math.radians(longitude))
+        found = []
+        for airport_id, lat, lon in self.candidates(latitude, longitude,
+                                                    radius_km):
+            distance = haversine(*origin, lat, lon)
+            if distance <= radius_km:
+                found.append((distance, airport_id))
+        return sorted(found)
+
+
+_grid = {"version": None, "grid": None}
+
+
+def grid_version() -> str:
+    version = cache.get(GRID_VERSION_KEY)
+    if version is None:
+        cache.add(GRID_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(GRID_VERSION_KEY)
+    return version
+
+
+def get_grid() -> AirportGrid:
+    version = grid_version()
+    if _grid["version"] != version:
+        _grid["grid"] = AirportGrid(
+            Airport.objects
+            .using(DEFAULT_DB_ALIAS)
+            .filter(latitude__isnull=False, longitude__isnull=False)
+            .values_list("id", "latitude", "longitude")
+        )
+        _grid["version"] = version
+    return _grid["grid"]
+
+
+def invalidate_grid() -> None:
+    cache.set(GRID_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def nearby_airports(latitude: float, longitude: float,
+                    radius_km: float, limit: int = None) -> list:
+    """Airports within `radius_km` with a `distance` attribute."""
+    found = get_grid().nearby(latitude, longitude, radius_km)[:limit]
+    airports = Airport.objects.in_bulk([airport_id
+                                        for _, airport_id in found])
+    result = []
+    for distance, airport_id in found:
+        if airport_id in airports:
+            airport = airports[airport_id]
+            airport.distance = round(distance, 1)
+            result.append(airport)
+    return result
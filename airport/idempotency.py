@@ -0,0 +1,88 @@
+"""
+`Idempotency-Key` support for endpoints that create orders.
+
+The key row is inserted in the same transaction as the order, so a
+concurrent duplicate blocks on the unique (user, key) index until the
+first request commits and then replays the stored response. Only
+successful responses are stored; a failed request rolls its key back
+and can be retried. Keys older than IDEMPOTENCY_KEY_TTL are ignored
+and removed by `manage.py purge_idempotency_keys`.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from airport.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+
+
+def fingerprint(data) -> str:
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def replay(record: IdempotencyKey, request_fingerprint: str) -> Response:
+    if record.fingerprint != request_fingerprint:
+        return Response(
+            {"detail": f"{HEADER} was already used for another request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(record.response,
+                    status=record.status_code,
+                    headers={"Idempotent-Replayed": "true"})
+
+
+def run_once(request, handler) -> Response:
+    """Run `handler()` once per (user, Idempotency-Key) and replay its
+    response for retries of the same request."""
+    key = request.headers.get(HEADER)
+    if not key:
+        return handler()
+    if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+        raise ValidationError({HEADER: "Key is too long."})
+    request_fingerprint = fingerprint(request.data)
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=request.user,
+                    key=key,
+                    fingerprint=request_fingerprint,
+                )
+        except IntegrityError:
+            record = None
+        if record is not None:
+            response = handler()
+            if status.is_success(response.status_code):
+                record.status_code = response.status_code
+                record.response = response.data
+                record.save(update_fields=["status_code", "response"])
+            else:
+                record.delete()
+            return response
+
+    record = IdempotencyKey.objects.get(user=request.user, key=key)
+    if record.created_at < expiry_cutoff():
+        record.delete()
+        return run_once(request, handler)
+    return replay(record, request_fingerprint)
+
+
+def purge_expired() -> int:
+    deleted, _ = IdempotencyKey.objects.filter(
+        created_at__lt=expiry_cutoff()
+    ).delete()
+    return deleted
@@ -0,0 +1,99 @@
+import io
+import logging
+import pathlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+RENDITIONS = {
+    "thumb": (200, 200),
+    "medium": (800, 800),
+}
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True},
+}
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.AIRPLANE_IMAGE_WORKERS,
+            thread_name_prefix="airplane-image",
+        )
+    return _executor
+
+
+def rendition_path(image_name: str, rendition: str, fmt: str) -> str:
+    path = pathlib.PurePosixPath(image_name)
+    return str(path.parent / "renditions" / f"{path.stem}-{rendition}.{fmt}")
+
+
+def rendition_paths(image_name: str) -> dict:
+    return {
+        rendition: {
+            fmt: rendition_path(image_name, rendition, fmt)
+            for fmt in FORMATS
+        }
+        for rendition in RENDITIONS
+    }
+
+
+def generate_renditions(image_name: str) -> list:
+    """Decode the original once and write every rendition
+    without EXIF or other metadata, returns the written paths."""
+    # Pillow is only needed once an upload is processed, not at boot.
+    from PIL import Image, ImageOps
+
+    with default_storage.open(image_name, "rb") as original:
+        image = Image.open(original)
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    written = []
+    for rendition, size in RENDITIONS.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.Resampling.LANCZOS)
+        for fmt, options in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, **options)
+            path = rendition_path(image_name, rendition, fmt)
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            written.append(
+                default_storage.save(path, ContentFile(buffer.getvalue()))
+            )
+    return written
+
+
+def delete_renditions(image_name: str) -> None:
+    for formats in rendition_paths(image_name).values():
+        for path in formats.values():
+            default_storage.delete(path)
+
+
+def log_failure(image_name: str, future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Renditions of %s failed", image_name,
+                     exc_info=future.exception())
+
+
+def submit_renditions(image_name: str) -> Future:
+    """Generate the renditions on the worker pool, logging a failure
+    nobody would otherwise see."""
+    future = get_executor().submit(generate_renditions, image_name)
+    future.add_done_callback(partial(log_failure, image_name))
+    return future
+
+
+def schedule_renditions(image_name: str) -> None:
+    """Queue rendition generation on the worker pool
+    once the upload is committed."""
+    transaction.on_commit(lambda: submit_renditions(image_name))
@@ -0,0 +1,94 @@
+"""
+Per-flight seat inventory.
+
+`Flight.capacity` mirrors the airplane's seat grid and
+`Flight.seats_sold` counts live and archived tickets. A sale is a
+single conditional UPDATE that only matches while enough seats are
+left, so concurrent checkouts can never oversell a flight.
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from airport import seatmap
+from airport.models import Airplane, ArchivedTicket, Flight, Ticket
+
+
+def reserve(flight_id: int, seats: int) -> bool:
+    return bool(
+        Flight.objects
+        .filter(id=flight_id, seats_sold__lte=F("capacity") - seats)
+        .update(seats_sold=F("seats_sold") + seats)
+    )
+
+
+def release(flight_id: int, seats: int) -> None:
+    Flight.objects.filter(id=flight_id).update(
+        seats_sold=F("seats_sold") - seats
+    )
+
+
+def tickets_count(model):
+    return Coalesce(
+        Subquery(
+            model.objects
+            .filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        ),
+        Value(0),
+    )
+
+
+def recount(flights=None) -> int:
+    """Rebuild capacity and seats_sold from the base tables."""
+    flights = Flight.objects.all() if flights is None else flights
+    return flights.update(
+        capacity=Subquery(
+            Airplane.objects
+            .filter(id=OuterRef("airplane_id"))
+            .values(capacity=F("rows") * F("seats_in_row"))
+        ),
+        seats_sold=tickets_count(Ticket) + tickets_count(ArchivedTicket),
+    )
+
+
+def rehome_tickets(flight: Flight) -> dict:
+    """Fit the tickets of `flight` into its current airplane.
+
+    Tickets outside the seat grid are moved to free seats, keeping
+    each order's tickets next to each other where possible; what does
+    not fit is flagged with `needs_reseat` for the airline to handle.
+    """
+    airplane = flight.airplane
+    with transaction.atomic():
+        Flight.objects.filter(id=flight.id).update(
+            capacity=airplane.capacity
+        )
+        stranded = list(
+            flight.tickets
+            .filter(Q(row__gt=airplane.rows)
+                    | Q(seat__gt=airplane.seats_in_row)
+                    | Q(needs_reseat=True))
+            .order_by("order_id", "row", "seat")
+        )
+        if not stranded:
+            return {"remapped": 0, "flagged": 0}
+        seat_map = seatmap.SeatMap.build(flight)
+        free = [
+            (row, seat)
+            for row in range(1, airplane.rows + 1)
+            for start, length in seat_map.free_blocks(row)
+            for seat in range(start, start + length)
+        ]
+        remapped, flagged = stranded[:len(free)], stranded[len(free):]
+        for ticket, (row, seat) in zip(remapped, free):
+            ticket.row, ticket.seat, ticket.needs_reseat = row, seat, False
+        Ticket.objects.bulk_update(remapped, ["row", "seat", "needs_reseat"])
+        Ticket.objects.filter(
+            id__in=[ticket.id for ticket in flagged]
+        ).update(needs_reseat=True)
+    seatmap.invalidate(flight.id)
+    return {"remapped": len(remapped), "flagged": len(flagged)}
@@ -0,0 +1,187 @@
+"""
+Database-backed job queue, no external broker needed.
+
+Handlers are registered with `@task("name")` and enqueued with
+`enqueue_on_commit`; `@task("name", every=seconds)` also runs the
+handler periodically, `run_jobs` keeps one job of it queued. The
+`run_jobs` command claims due jobs with a conditional UPDATE that sets
+`locked_until`; a job whose worker died becomes claimable again once
+that visibility timeout passes, unless it already used all its
+attempts: then it is marked failed, so a job that keeps killing its
+worker is not retried forever.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.db.models import (Avg,
+                              Count,
+                              DurationField,
+                              ExpressionWrapper,
+                              F,
+                              Max,
+                              Min,
+                              Q)
+from django.utils import timezone
+
+from airport.models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+# name -> seconds between two runs
+PERIODIC = {}
+
+
+def task(name: str, every: int = None):
+    def register(func):
+        TASKS[name] = func
+        if every:
+            PERIODIC[name] = every
+        return func
+    return register
+
+
+def enqueue(name: str, max_attempts: int = 5, **payload) -> Job:
+    if name not in TASKS:
+        raise KeyError(f"Unknown task: {name}")
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+    )
+
+
+def enqueue_on_commit(name: str, **payload) -> None:
+    transaction.on_commit(lambda: enqueue(name, **payload))
+
+
+def schedule_periodic(now=None) -> list:
+    """Queue the next run of each periodic task that has none pending,
+    `every` seconds after the previous run. Returns the new jobs."""
+    now = now or timezone.now()
+    scheduled = []
+    for name, every in PERIODIC.items():
+        jobs = Job.objects.filter(name=name)
+        if jobs.filter(status__in=[Job.Status.PENDING,
+                                   Job.Status.RUNNING]).exists():
+            continue
+        last_run = jobs.aggregate(last_run=Max("run_at"))["last_run"]
+        run_at = (max(now, last_run + timedelta(seconds=every))
+                  if last_run else now)
+        scheduled.append(Job.objects.create(name=name, run_at=run_at))
+    return scheduled
+
+
+def claimable(now) -> Q:
+    return (
+        Q(status=Job.Status.PENDING, run_at__lte=now)
+        | Q(status=Job.Status.RUNNING,
+            locked_until__lt=now,
+            attempts__lt=F("max_attempts"))
+    )
+
+
+def fail_abandoned(now) -> int:
+    """Fail expired RUNNING jobs that have no attempts left."""
+    return Job.objects.filter(
+        status=Job.Status.RUNNING,
+        locked_until__lt=now,
+        attempts__gte=F("max_attempts"),
+    ).update(
+        status=Job.Status.FAILED,
+        locked_until=None,
+        finished_at=now,
+        last_error="The worker stopped while running the last attempt.",
+    )
+
+
+def claim_jobs(limit: int, visibility_timeout: int) -> list:
+    now = timezone.now()
+    fail_abandoned(now)
+    candidates = list(
+        Job.objects
+        .filter(claimable(now))
+        .order_by("run_at")
+        .values_list("id", flat=True)[:limit]
+    )
+    claimed = []
+    for job_id in candidates:
+        # Another worker may have claimed it since the SELECT.
+        updated = Job.objects.filter(claimable(now), id=job_id).update(
+            status=Job.Status.RUNNING,
+            locked_until=now + timedelta(seconds=visibility_timeout),
+            attempts=F("attempts") + 1,
+            started_at=now,
+        )
+        if updated:
+            claimed.append(job_id)
+    return list(Job.objects.filter(id__in=claimed).order_by("run_at"))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(2 ** attempts, 3600))
+
+
+def run_job(job: Job) -> None:
+    try:
+        TASKS[job.name](**job.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.id, job.name)
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.Status.FAILED
+            job.finished_at = timezone.now()
+        else:
+            job.status = Job.Status.PENDING
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+    else:
+        job.status = Job.Status.DONE
+        job.finished_at = timezone.now()
+    job.locked_until = None
+    job.save(update_fields=[
+        "status", "run_at", "locked_until", "finished_at", "last_error"
+    ])
+
+
+def run_job_in_thread(job: Job) -> None:
+    """run_job for pool threads, each of which owns a DB connection."""
+    close_old_connections()
+    try:
+        run_job(job)
+    finally:
+        close_old_connections()
+
+
+def queue_stats() -> dict:
+    """Depth and latency figures for the admin changelist."""
+    now = timezone.now()
+    counts = dict(
+        Job.objects.values_list("status").annotate(Count("id")).order_by()
+    )
+    oldest = (Job.objects
+              .filter(status=Job.Status.PENDING, run_at__lte=now)
+              .aggregate(oldest=Min("run_at"))["oldest"])
+    recent = Job.objects.filter(
+        finished_at__gte=now - timedelta(hours=1),
+        status=Job.Status.DONE,
+    ).aggregate(
+        wait=Avg(ExpressionWrapper(
+            F("started_at") - F("run_at"), output_field=DurationField()
+        )),
+        run=Avg(ExpressionWrapper(
+            F("finished_at") - F("started_at"), output_field=DurationField()
+        )),
+        done=Count("id"),
+    )
+    return {
+        "counts": {
+            status.label: counts.get(status, 0) for status in Job.Status
+        },
+        "depth": counts.get(Job.Status.PENDING, 0),
+        "oldest_pending_age": now - oldest if oldest else None,
+        "avg_wait": recent["wait"],
+        "avg_run": recent["run"],
+        "done_last_hour": recent["done"],
+    }
@@ -0,0 +1,70 @@
+"""
+Airport-local dates of flights.
+
+Flight.departure_date and Flight.arrival_date hold the day of the
+departure in the source airport's timezone and of the arrival in the
+destination airport's timezone. They are filled when a flight is
+written, so date filters compare a plain indexed column instead of
+converting every departure_time in SQL.
+"""
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from airport.utils import chunked
+
+
+@lru_cache(maxsize=None)
+def zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def validate_timezone(name: str) -> None:
+    try:
+        zone(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"Unknown timezone: {name}.")
+
+
+def local_date(moment, zone_name: str):
+    return timezone.localtime(moment, zone(zone_name)).date()
+
+
+def fill_local_dates(flights, chunk_size: int = 5_000) -> int:
+    """Recompute the local dates of `flights` (a Flight queryset),
+    writing the flights whose dates changed. Returns their count."""
+    rows = (flights
+            .order_by("id")
+            .values_list("id",
+                         "departure_time",
+                         "arrival_time",
+                         "route__source__timezone",
+                         "route__destination__timezone",
+                         "departure_date",
+                         "arrival_date")
+            .iterator(chunk_size=chunk_size))
+    connection = connections[flights.db]
+    quote = connection.ops.quote_name
+    table = quote(flights.model._meta.db_table)
+    updated = 0
+    for chunk in chunked(rows, chunk_size):
+        changed = []
+        for (flight_id, departure, arrival, source_zone, destination_zone,
+             departure_date, arrival_date) in chunk:
+            dates = (local_date(departure, source_zone),
+                     local_date(arrival, destination_zone))
+            if dates != (departure_date, arrival_date):
+                changed.append((*dates, flight_id))
+        if changed:
+            with transaction.atomic(using=flights.db), \
+                    connection.cursor() as cursor:
+                cursor.executemany(
+                    f"UPDATE {table} SET {quote('departure_date')} = %s, "
+                    f"{quote('arrival_date')} = %s WHERE {quote('id')} = %s",
+                    changed,
+                )
+        updated += len(changed)
+    return updated
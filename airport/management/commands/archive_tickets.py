@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from airport.archive import archive_tickets
+
+
+class Command(BaseCommand):
+    help = "Move tickets of long departed flights to the archive."  # noqa
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Archive flights departed more than N days ago.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of flights moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        moved = archive_tickets(options["days"], options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} tickets."))
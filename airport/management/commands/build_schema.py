@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from airport_service import schema
+
+
+class Command(BaseCommand):
+    help = ("Render the OpenAPI schema into API_SCHEMA_DIR "  # noqa
+            "for /doc/ to serve.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            help="Output directory instead of API_SCHEMA_DIR.",
+        )
+
+    def handle(self, *args, **options):
+        for fmt, path in schema.build(options["dir"]).items():
+            self.stdout.write(f"{fmt}: {path} ({path.stat().st_size} bytes)")
+        self.stdout.write(self.style.SUCCESS("Schema built."))
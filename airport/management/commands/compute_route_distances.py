@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.geo import recompute_distances
+
+
+class Command(BaseCommand):
+    help = ("Set route distances to the great-circle distance "  # noqa
+            "between their airports.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report routes with a different distance.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.0,
+            help="Allowed difference as a share of the computed distance.",
+        )
+
+    def handle(self, *args, **options):
+        result = recompute_distances(check=options["check"],
+                                     tolerance=options["tolerance"])
+        if options["check"]:
+            for route_id, stored, computed in result["mismatches"]:
+                self.stderr.write(
+                    f"route {route_id}: {stored} km, computed {computed} km"
+                )
+            if result["mismatches"]:
+                raise CommandError(
+                    f"{result['mismatched']} of {result['routes']} routes "
+                    f"have a different distance."
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {result['routes']} routes, "
+            f"updated {result['updated']}, "
+            f"{result['missing']} without coordinates."
+        ))
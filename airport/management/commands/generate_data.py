@@ -0,0 +1,67 @@
+import time
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from airport.datagen import DEFAULT_PASSWORD, SCALES, generate
+
+
+class Command(BaseCommand):
+    help = "Generate a deterministic synthetic dataset."  # noqa
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="small")
+        parser.add_argument("--seed", type=int, default=0)
+        for name in ("users", "airports", "airplanes", "flights"):
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                help=f"Override the number of {name} of the scale.",
+            )
+        parser.add_argument(
+            "--as-of",
+            type=date.fromisoformat,
+            help="Date the booking curve is computed for (YYYY-MM-DD), "
+                 "defaults to today.",
+        )
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            help="First departure date (YYYY-MM-DD), "
+                 "defaults to 30 days before --as-of.",
+        )
+        parser.add_argument("--days", type=int, default=120)
+        parser.add_argument("--load-factor", type=float, default=0.8)
+        parser.add_argument("--email-prefix", default="user")
+        parser.add_argument("--password", default=DEFAULT_PASSWORD)
+        parser.add_argument("--chunk-size", type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        if not 0 < options["load_factor"] < 1:
+            raise CommandError("--load-factor must be between 0 and 1.")
+        sizes = {
+            name: options[name] if options[name] is not None else value
+            for name, value in SCALES[options["scale"]].items()
+        }
+        as_of = options["as_of"] and timezone.make_aware(
+            datetime.combine(options["as_of"], datetime.min.time())
+        )
+        started = time.perf_counter()
+        summary = generate(
+            seed=options["seed"],
+            as_of=as_of,
+            start_date=options["start_date"],
+            days=options["days"],
+            load_factor=options["load_factor"],
+            email_prefix=options["email_prefix"],
+            password=options["password"],
+            chunk_size=options["chunk_size"],
+            log=self.stdout.write,
+            **sizes,
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {summary['tickets']} tickets "
+            f"on {summary['flights']} flights in {elapsed:.1f}s."
+        ))
@@ -0,0 +1,63 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airport.rotation import import_schedule
+
+
+def parse_time(value: str):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise CommandError(f"Invalid datetime: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_row(row: dict) -> dict:
+    try:
+        return {"route": int(row["route"]),
+                "airplane": int(row["airplane"]),
+                "departure_time": parse_time(row["departure_time"]),
+                "arrival_time": parse_time(row["arrival_time"])}
+    except (KeyError, TypeError, ValueError) as error:
+        raise CommandError(f"Invalid value: {error}")
+
+
+class Command(BaseCommand):
+    help = ("Import flights from a CSV file with route, airplane, "  # noqa
+            "departure_time and arrival_time columns.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only validate the schedule.",
+        )
+
+    def handle(self, *args, **options):
+        rows = []
+        with open(options["path"], newline="") as schedule_file:
+            reader = csv.DictReader(schedule_file)
+            for row in reader:
+                try:
+                    rows.append(parse_row(row))
+                except CommandError as error:
+                    raise CommandError(f"line {reader.line_num}: {error}")
+        created, errors = import_schedule(rows, dry_run=options["dry_run"])
+        for index, error in errors:
+            # Line 1 of the file is the header.
+            self.stderr.write(f"line {index + 2}: {error}")
+        if errors:
+            raise CommandError(f"{len(errors)} errors, nothing imported.")
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(rows)} flights are valid."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Imported {created} flights."
+            ))
@@ -0,0 +1,35 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.geo import load_airports
+
+
+class Command(BaseCommand):
+    help = ("Create or update airports from a CSV file with name, "  # noqa
+            "closest_big_city, latitude and longitude columns.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+
+    def handle(self, *args, **options):
+        with open(options["path"], newline="") as airports_file:
+            try:
+                rows = [
+                    {"name": row["name"],
+                     "closest_big_city": row["closest_big_city"],
+                     "latitude": float(row["latitude"]),
+                     "longitude": float(row["longitude"])}
+                    for row in csv.DictReader(airports_file)
+                ]
+            except (KeyError, ValueError) as error:
+                raise CommandError(f"Invalid airports file: {error}")
+        for line, row in enumerate(rows, start=2):
+            if not (-90 <= row["latitude"] <= 90
+                    and -180 <= row["longitude"] <= 180):
+                raise CommandError(f"line {line}: invalid coordinates.")
+        result = load_airports(rows)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} and updated {result['updated']} "
+            f"airports, {result['routes_updated']} route distances changed."
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from airport import partitioning
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the ticket table hash-partitioned by flight "  # noqa
+            "(PostgreSQL).")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--partitions",
+            type=int,
+            default=16,
+            help="Number of partitions, 1 for a plain table.",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Database alias to rebuild.",
+        )
+
+    def handle(self, *args, **options):
+        if options["partitions"] < 1:
+            raise CommandError("--partitions must be at least 1.")
+        using = options["database"]
+        if not partitioning.is_supported(using):
+            self.stdout.write(
+                "This database has no declarative partitioning, "
+                "tickets stay in a single partition."
+            )
+            return
+        partitions = partitioning.repartition(options["partitions"], using)
+        self.stdout.write(self.style.SUCCESS(
+            f"Tickets are stored in {partitions} partition(s)."
+        ))
@@ -0,0 +1,24 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ("Wait for the database, apply migrations, create the cache "  # noqa
+            "table and the superuser from DJANGO_SUPERUSER_* in one "
+            "process.")
+
+    def handle(self, *args, **options):
+        call_command("wait_for_db", stdout=self.stdout)
+        call_command("migrate", interactive=False, stdout=self.stdout)
+        # A no-op unless CACHES uses the database backend.
+        call_command("createcachetable", stdout=self.stdout)
+        email = os.environ.get("DJANGO_SUPERUSER_EMAIL")
+        if email and not get_user_model().objects.filter(
+                email=email).exists():
+            call_command("createsuperuser",
+                         interactive=False,
+                         stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS("Service prepared."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from airport.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Delete stored order responses older than IDEMPOTENCY_KEY_TTL."  # noqa
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} idempotency keys.")
+        )
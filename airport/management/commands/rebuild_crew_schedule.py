@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from airport.crew_schedule import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the crew schedule index from flight crews."  # noqa
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10_000,
+            help="Number of assignments inserted per query.",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild(options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {count} crew assignments.")
+        )
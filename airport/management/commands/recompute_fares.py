@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from airport.pricing import recompute_all
+
+
+class Command(BaseCommand):
+    help = "Recompute the fare table of all flights."  # noqa
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5_000,
+            help="Number of flights priced per query.",
+        )
+
+    def handle(self, *args, **options):
+        result = recompute_all(chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Priced {result['flights']} flights, "
+                f"{result['updated']} fares changed."
+            )
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from airport.availability import refresh_all
+from airport.inventory import recount
+
+
+class Command(BaseCommand):
+    help = ("Rebuild flight seat counters and "  # noqa
+            "the route/day availability table.")
+
+    def handle(self, *args, **options):
+        flights = recount()
+        self.stdout.write(f"Recounted seats of {flights} flights.")
+        buckets = refresh_all()
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed {buckets} route/day buckets.")
+        )
@@ -0,0 +1,58 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from airport.jobs import (claim_jobs,
+                          run_job,
+                          run_job_in_thread,
+                          schedule_periodic)
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs."  # noqa
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of worker threads, 1 runs jobs inline.",
+        )
+        parser.add_argument(
+            "--visibility-timeout",
+            type=int,
+            default=300,
+            help="Seconds before a claimed but unfinished job is retried.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is drained.",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        processed = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                schedule_periodic()
+                jobs = claim_jobs(workers, options["visibility_timeout"])
+                if not jobs:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+                if workers > 1:
+                    list(executor.map(run_job_in_thread, jobs))
+                else:
+                    for job in jobs:
+                        run_job(job)
+                processed += len(jobs)
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs."))
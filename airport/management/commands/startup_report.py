@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from airport_service import startup
+
+
+class Command(BaseCommand):
+    help = ("Boot the service in a fresh interpreter and report "  # noqa
+            "import time per module.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            choices=sorted(startup.TARGETS),
+            default="wsgi",
+            help="What to boot: a web worker or a bare manage.py command.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=25,
+            help="Number of modules and packages listed.",
+        )
+        parser.add_argument(
+            "--sort",
+            choices=["cumulative", "own"],
+            default="cumulative",
+            help="Order modules by time including or excluding "
+                 "their own imports.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = startup.measure(options["target"])
+        except RuntimeError as error:
+            raise CommandError(f"Booting failed:\n{error}")
+        limit = options["limit"]
+        column = 2 if options["sort"] == "cumulative" else 1
+        imports = sorted(result["imports"], key=lambda row: -row[column])
+
+        self.stdout.write(f"{'own ms':>9} {'total ms':>9}  module")
+        for module, own, total, _depth in imports[:limit]:
+            self.stdout.write(
+                f"{own / 1000:9.1f} {total / 1000:9.1f}  {module}"
+            )
+        self.stdout.write(f"\n{'own ms':>9}  package")
+        packages = startup.by_package(result["imports"])
+        for package, own in list(packages.items())[:limit]:
+            self.stdout.write(f"{own / 1000:9.1f}  {package}")
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{result['target']}: {len(result['imports'])} modules "
+            f"imported, booted in {result['seconds'] * 1000:.0f} ms."
+        ))
@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-19 07:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RouteDailyAvailability",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("flights_count", models.IntegerField(default=0)),
+                ("capacity", models.IntegerField(default=0)),
+                ("seats_sold", models.IntegerField(default=0)),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_availability",
+                        to="airport.route",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "route daily availability",
+                "ordering": ["date", "route"],
+                "unique_together": {("route", "date")},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2 on 2026-10-19 08:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0004_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("method", models.CharField(max_length=10)),
+                ("path", models.CharField(max_length=500)),
+                ("view", models.CharField(max_length=200)),
+                ("status", models.IntegerField()),
+                ("duration", models.FloatField()),
+                ("sql_count", models.IntegerField(default=0)),
+                ("sql_duration", models.FloatField(default=0)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("cprofile", "Cprofile"), ("stacks", "Stacks")],
+                        max_length=10,
+                    ),
+                ),
+                ("file_name", models.CharField(max_length=200)),
+            ],
+            options={
+                "ordering": ["-duration"],
+            },
+        ),
+    ]
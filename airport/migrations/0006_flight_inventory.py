@@ -0,0 +1,58 @@
+# Generated by Django 4.2 on 2026-10-19 08:12
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_inventory(apps, schema_editor):
+    Airplane = apps.get_model("airport", "Airplane")
+    Flight = apps.get_model("airport", "Flight")
+
+    def tickets_count(model_name):
+        model = apps.get_model("airport", model_name)
+        return Coalesce(
+            Subquery(
+                model.objects.filter(flight=OuterRef("pk"))
+                .order_by()
+                .values("flight")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            Value(0),
+        )
+
+    Flight.objects.update(
+        capacity=Subquery(
+            Airplane.objects.filter(id=OuterRef("airplane_id")).values(
+                capacity=F("rows") * F("seats_in_row")
+            )
+        ),
+        seats_sold=tickets_count("Ticket") + tickets_count("ArchivedTicket"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0005_requestprofile"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="capacity",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="flight",
+            name="seats_sold",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="needs_reseat",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(fill_inventory, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2 on 2026-10-19 08:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_crew_assignments(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    CrewAssignment = apps.get_model("airport", "CrewAssignment")
+    CrewAssignment.objects.bulk_create(
+        [
+            CrewAssignment(
+                crew_id=crew_id,
+                flight_id=flight_id,
+                departure_time=departure,
+                arrival_time=arrival,
+            )
+            for crew_id, flight_id, departure, arrival in (
+                Flight.crew.through.objects.values_list(
+                    "crew_id",
+                    "flight_id",
+                    "flight__departure_time",
+                    "flight__arrival_time",
+                ).iterator()
+            )
+        ],
+        batch_size=10_000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0007_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CrewAssignment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("departure_time", models.DateTimeField()),
+                ("arrival_time", models.DateTimeField()),
+                (
+                    "crew",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="assignments",
+                        to="airport.crew",
+                    ),
+                ),
+                (
+                    "flight",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="crew_assignments",
+                        to="airport.flight",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["departure_time"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="crewassignment",
+            index=models.Index(
+                fields=["crew", "departure_time"], name="airport_cre_crew_id_031e1d_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="crewassignment",
+            unique_together={("crew", "flight")},
+        ),
+        migrations.RunPython(fill_crew_assignments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-19 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0008_crewassignment"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["airplane", "departure_time"],
+                name="airport_fli_airplan_da655c_idx",
+            ),
+        ),
+    ]
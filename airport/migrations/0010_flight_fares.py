@@ -0,0 +1,47 @@
+# Generated by Django 4.2 on 2026-10-19 08:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0009_flight_airplane_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlightFare",
+            fields=[
+                (
+                    "flight",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="fare",
+                        serialize=False,
+                        to="airport.flight",
+                    ),
+                ),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("load_bucket", models.IntegerField()),
+                ("days_bucket", models.IntegerField()),
+                ("computed_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="archivedticket",
+            name="price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2 on 2026-10-19 08:53
+
+import airport.localtime
+from django.db import migrations, models
+
+
+def fill_local_dates(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    airport.localtime.fill_local_dates(Flight.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0011_airport_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="airport",
+            name="timezone",
+            field=models.CharField(
+                default="UTC",
+                max_length=64,
+                validators=[airport.localtime.validate_timezone],
+            ),
+        ),
+        migrations.AddField(
+            model_name="flight",
+            name="arrival_date",
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="flight",
+            name="departure_date",
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["departure_date"], name="airport_fli_departu_d17c9d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["arrival_date"], name="airport_fli_arrival_e273fa_idx"
+            ),
+        ),
+        migrations.RunPython(fill_local_dates, migrations.RunPython.noop),
+    ]
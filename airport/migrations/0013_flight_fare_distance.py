@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0012_local_dates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flightfare",
+            name="distance",
+            field=models.IntegerField(null=True),
+        ),
+    ]
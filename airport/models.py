@@ -1,11 +1,16 @@
 import pathlib
 import uuid
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 from django.utils.text import slugify
 from rest_framework.exceptions import ValidationError
 
+from airport.localtime import local_date, validate_timezone
+
 
 class Crew(models.Model):
     first_name = models.CharField(max_length=100)
@@ -22,6 +27,17 @@ class Crew(models.Model):
 class Airport(models.Model):
     name = models.CharField(max_length=100)
     closest_big_city = models.CharField(max_length=100)
+    timezone = models.CharField(max_length=64,
+                                default="UTC",
+                                validators=[validate_timezone])
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)])
 
     def __str__(self):
         return f"{self.name}"
@@ -90,6 +106,31 @@ class Flight(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew)
+    # Kept in sync by airport.inventory, seats_sold never exceeds
+    # capacity for new sales.
+    capacity = models.IntegerField(default=0)
+    seats_sold = models.IntegerField(default=0)
+    # Days in the source and destination airports' timezones,
+    # see airport.localtime.
+    departure_date = models.DateField(null=True, editable=False)
+    arrival_date = models.DateField(null=True, editable=False)
+
+    def set_local_dates(self) -> None:
+        self.departure_date = local_date(self.departure_time,
+                                         self.route.source.timezone)
+        self.arrival_date = local_date(self.arrival_time,
+                                       self.route.destination.timezone)
+
+    def save(self, *args, **kwargs):
+        if kwargs.get("update_fields") is None:
+            self.capacity = self.airplane.capacity
+            self.set_local_dates()
+            if not self._state.adding:
+                kwargs["update_fields"] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name != "seats_sold"
+                ]
+        return super().save(*args, **kwargs)
 
     def __str__(self):
         return (f"{self.route}"
@@ -97,6 +138,11 @@ class Flight(models.Model):
                 f", {self.departure_time}"
                 f", {self.arrival_time}")
 
+    class Meta:
+        indexes = [models.Index(fields=["airplane", "departure_time"]),
+                   models.Index(fields=["departure_date"]),
+                   models.Index(fields=["arrival_date"])]
+
 
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -108,6 +154,10 @@ class Order(models.Model):
     def __str__(self):
         return f"{self.created_at}, {self.user}"
 
+    @property
+    def ticket_history(self) -> list:
+        return [*self.tickets.all(), *self.archived_tickets.all()]
+
     class Meta:
         ordering = ["-created_at"]
 
@@ -122,6 +172,14 @@ class Ticket(models.Model):
     order = models.ForeignKey("Order",
                               on_delete=models.CASCADE,
                               related_name="tickets")
+    # Set when an airplane change left the seat outside the new grid.
+    needs_reseat = models.BooleanField(default=False)
+    price = models.DecimalField(max_digits=10,
+                                decimal_places=2,
+                                null=True,
+                                blank=True)
+    # Set by callers that already took the seat from Flight.seats_sold.
+    seat_reserved = False
 
     @staticmethod
     def validate_ticket(row, seat, airplane, error_to_raise):
@@ -147,6 +205,13 @@ class Ticket(models.Model):
             self.flight.airplane,
             ValidationError,
         )
+        # The archive keeps the seat sold after its ticket moved there.
+        if ArchivedTicket.objects.filter(flight_id=self.flight_id,
+                                         row=self.row,
+                                         seat=self.seat).exists():
+            raise ValidationError(
+                {"seat": f"Seat {self.row}, {self.seat} is already sold."}
+            )
 
     def save(self,
              *args,
@@ -154,10 +219,22 @@ class Ticket(models.Model):
              force_update=False,
              using=None,
              update_fields=None):
+        from airport.inventory import reserve
+        from airport.pricing import current_fares
+
         self.full_clean()
-        return super(Ticket, self).save(
-            force_insert, force_update, using, update_fields
-        )
+        with transaction.atomic():
+            if self._state.adding and self.price is None:
+                self.price = current_fares([self.flight_id])[self.flight_id]
+            if (self._state.adding
+                    and not self.seat_reserved
+                    and not reserve(self.flight_id, 1)):
+                raise ValidationError(
+                    {"flight": f"Flight {self.flight_id} is sold out."}
+                )
+            return super(Ticket, self).save(
+                force_insert, force_update, using, update_fields
+            )
 
     def __str__(self):
         return f"{self.row}, {self.seat}, {self.flight}, {self.order}"
@@ -165,3 +242,160 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("row", "seat", "flight")
         ordering = ["row", "seat"]
+
+
+class ArchivedTicket(models.Model):
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        "Flight",
+        on_delete=models.CASCADE,
+        related_name="archived_tickets")
+    order = models.ForeignKey("Order",
+                              on_delete=models.CASCADE,
+                              related_name="archived_tickets")
+    price = models.DecimalField(max_digits=10,
+                                decimal_places=2,
+                                null=True,
+                                blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.row}, {self.seat}, {self.flight}, {self.order}"
+
+    class Meta:
+        unique_together = ("row", "seat", "flight")
+
+
+class RouteDailyAvailability(models.Model):
+    route = models.ForeignKey(
+        "Route",
+        on_delete=models.CASCADE,
+        related_name="daily_availability")
+    date = models.DateField()
+    flights_count = models.IntegerField(default=0)
+    capacity = models.IntegerField(default=0)
+    seats_sold = models.IntegerField(default=0)
+
+    @property
+    def seats_available(self) -> int:
+        return self.capacity - self.seats_sold
+
+    def __str__(self):
+        return f"{self.route}, {self.date}, {self.seats_available}"
+
+    class Meta:
+        unique_together = ("route", "date")
+        ordering = ["date", "route"]
+        verbose_name_plural = "route daily availability"
+
+
+class Job(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.name}, {self.status}, {self.attempts}"
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_at"])]
+
+
+class RequestProfile(models.Model):
+    class Kind(models.TextChoices):
+        CPROFILE = "cprofile"
+        STACKS = "stacks"
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    view = models.CharField(max_length=200)
+    status = models.IntegerField()
+    duration = models.FloatField()
+    sql_count = models.IntegerField(default=0)
+    sql_duration = models.FloatField(default=0)
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    file_name = models.CharField(max_length=200)
+
+    def __str__(self):
+        return f"{self.method} {self.path}, {self.duration:.3f}s"
+
+    class Meta:
+        ordering = ["-duration"]
+
+
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys")
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.IntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.user}, {self.key}, {self.status_code}"
+
+    class Meta:
+        unique_together = ("user", "key")
+
+
+class CrewAssignment(models.Model):
+    """Flight.crew rows with the flight's times copied next to them,
+    so a crew member's schedule is a range scan of one index."""
+    crew = models.ForeignKey(
+        "Crew",
+        on_delete=models.CASCADE,
+        related_name="assignments")
+    flight = models.ForeignKey(
+        "Flight",
+        on_delete=models.CASCADE,
+        related_name="crew_assignments")
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.crew}, {self.flight_id}, {self.departure_time}"
+
+    class Meta:
+        unique_together = ("crew", "flight")
+        indexes = [models.Index(fields=["crew", "departure_time"])]
+        ordering = ["departure_time"]
+
+
+class FlightFare(models.Model):
+    """Current price of a flight, see airport.pricing."""
+    flight = models.OneToOneField(
+        "Flight",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="fare")
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    load_bucket = models.IntegerField()
+    days_bucket = models.IntegerField()
+    # Route distance the price was computed from.
+    distance = models.IntegerField(null=True)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.flight_id}, {self.price}"
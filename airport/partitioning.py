@@ -0,0 +1,137 @@
+"""
+Hash-partitioned ticket storage (PostgreSQL).
+
+repartition(n) rebuilds airport_ticket as a table partitioned by
+HASH (flight_id) into n partitions, so concurrent sales of different
+flights write to different heaps and unique indexes; repartition(1)
+turns it back into a plain table. The ORM keeps using one table name:
+Ticket, its managers and serializers don't change.
+
+PostgreSQL requires unique constraints of a partitioned table to
+contain the partition key. The primary key becomes (id, flight_id) and
+unique_together ("row", "seat", "flight") is kept as it is; a new
+unique constraint on Ticket must include flight as well.
+
+Other databases keep a single partition: the plain table.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from airport.models import Ticket
+
+
+def is_supported(using: str = DEFAULT_DB_ALIAS) -> bool:
+    return connections[using].vendor == "postgresql"
+
+
+def partition_count(using: str = DEFAULT_DB_ALIAS) -> int:
+    """Number of partitions of the ticket table, 1 for a plain table."""
+    if not is_supported(using):
+        return 1
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM pg_inherits "
+            "WHERE inhparent = %s::regclass",
+            [Ticket._meta.db_table],
+        )
+        return cursor.fetchone()[0] or 1
+
+
+def rebuild_sql(partitions: int, quote) -> list:
+    """Statements that copy the ticket table into a new one with
+    `partitions` hash partitions (a plain table for 1) and swap it in.
+    `quote` is the connection's quote_name."""
+    if partitions < 1:
+        raise ValueError("partitions must be at least 1.")
+    meta = Ticket._meta
+    table = meta.db_table
+    new = f"{table}_new"
+    pk = quote(meta.pk.column)
+    flight = quote(meta.get_field("flight").column)
+    unique = ", ".join(
+        quote(meta.get_field(name).column)
+        for name in meta.unique_together[0]
+    )
+    sequence = f"{table}_{meta.pk.column}_seq"
+    if partitions > 1:
+        key = f"{pk}, {flight}"
+        partition_by = f" PARTITION BY HASH ({flight})"
+        children = [f"p{index}" for index in range(partitions)]
+    else:
+        key, partition_by, children = pk, "", []
+
+    statements = [
+        f"CREATE TABLE {quote(new)} (LIKE {quote(table)} "
+        f"INCLUDING DEFAULTS INCLUDING STORAGE){partition_by}",
+        f"ALTER TABLE {quote(new)} "
+        f"ADD CONSTRAINT {quote(new + '_pkey')} PRIMARY KEY ({key}), "
+        f"ADD CONSTRAINT {quote(new + '_uniq')} UNIQUE ({unique})",
+    ]
+    statements += [
+        f"CREATE TABLE {quote(f'{new}_{child}')} PARTITION OF {quote(new)} "
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {index})"
+        for index, child in enumerate(children)
+    ]
+    constraints, indexes = ["pkey", "uniq"], []
+    for name in ("flight", "order"):
+        field = meta.get_field(name)
+        related = field.related_model._meta
+        statements += [
+            f"ALTER TABLE {quote(new)} "
+            f"ADD CONSTRAINT {quote(f'{new}_{name}_fk')} "
+            f"FOREIGN KEY ({quote(field.column)}) "
+            f"REFERENCES {quote(related.db_table)} "
+            f"({quote(related.pk.column)}) DEFERRABLE INITIALLY DEFERRED",
+            f"CREATE INDEX {quote(f'{new}_{name}_idx')} "
+            f"ON {quote(new)} ({quote(field.column)})",
+        ]
+        constraints.append(f"{name}_fk")
+        indexes.append(f"{name}_idx")
+
+    statements += [
+        f"INSERT INTO {quote(new)} SELECT * FROM {quote(table)}",
+        # Takes the old id sequence (or identity) and partitions along.
+        f"DROP TABLE {quote(table)}",
+        f"ALTER TABLE {quote(new)} RENAME TO {quote(table)}",
+    ]
+    statements += [
+        f"ALTER TABLE {quote(table)} RENAME CONSTRAINT "
+        f"{quote(f'{new}_{suffix}')} TO {quote(f'{table}_{suffix}')}"
+        for suffix in constraints
+    ]
+    statements += [
+        f"ALTER INDEX {quote(f'{new}_{suffix}')} "
+        f"RENAME TO {quote(f'{table}_{suffix}')}"
+        for suffix in indexes
+    ]
+    statements += [
+        f"ALTER TABLE {quote(f'{new}_{child}')} "
+        f"RENAME TO {quote(f'{table}_{child}')}"
+        for child in children
+    ]
+    statements += [
+        f"CREATE SEQUENCE {quote(sequence)} OWNED BY {quote(table)}.{pk}",
+        f"ALTER TABLE {quote(table)} ALTER COLUMN {pk} "
+        f"SET DEFAULT nextval('{sequence}')",
+        f"SELECT setval('{sequence}', "
+        f"COALESCE((SELECT max({pk}) FROM {quote(table)}), 0) + 1, false)",
+    ]
+    return statements
+
+
+def repartition(partitions: int, using: str = DEFAULT_DB_ALIAS) -> int:
+    """Rebuild the ticket table with `partitions` hash partitions.
+
+    Locks the table for the copy. Returns the resulting partition
+    count: always 1 on databases without declarative partitioning.
+    """
+    if not is_supported(using):
+        return 1
+    connection = connections[using]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(
+            f"LOCK TABLE {connection.ops.quote_name(Ticket._meta.db_table)} "
+            f"IN ACCESS EXCLUSIVE MODE"
+        )
+        for statement in rebuild_sql(partitions, connection.ops.quote_name):
+            cursor.execute(statement)
+    return partition_count(using)
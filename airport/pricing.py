@@ -0,0 +1,166 @@
+"""
+Flight fares.
+
+A fare is the route's base fare (from its distance) times a load
+factor multiplier and a time-to-departure multiplier. Both factors are
+bucketed, so the price only changes when a flight crosses a bucket
+or its route's distance changes: FlightFare keeps the current price
+with the buckets and distance it was computed from, and a refresh
+writes nothing while they stay the same.
+
+Sales refresh their flights right away; the days buckets move with the
+clock, so the worker (manage.py run_jobs) runs `recompute_all` as the
+periodic "recompute_fares" job every FARE_RECOMPUTE_INTERVAL seconds.
+manage.py recompute_fares runs it by hand.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+
+from django.db import transaction
+from django.utils import timezone
+
+from airport.models import Flight, FlightFare
+from airport.utils import chunked
+
+BASE_FARE = Decimal("30")
+FARE_PER_KM = Decimal("0.08")
+# (load factor from, multiplier), the last matching bucket wins.
+LOAD_FACTOR_BUCKETS = (
+    (0.0, Decimal("1.00")),
+    (0.5, Decimal("1.10")),
+    (0.7, Decimal("1.25")),
+    (0.85, Decimal("1.45")),
+    (0.95, Decimal("1.75")),
+)
+# (days before departure from, multiplier), the first matching bucket
+# wins, departed flights fall into the last one.
+DEPARTURE_CURVE = (
+    (60, Decimal("0.85")),
+    (21, Decimal("1.00")),
+    (7, Decimal("1.15")),
+    (2, Decimal("1.35")),
+    (0, Decimal("1.60")),
+)
+FARE_FIELDS = ("id",
+               "capacity",
+               "seats_sold",
+               "departure_time",
+               "route__distance",
+               "fare__load_bucket",
+               "fare__days_bucket",
+               "fare__distance",
+               "fare__price")
+
+
+def load_bucket(seats_sold: int, capacity: int) -> int:
+    load = seats_sold / capacity if capacity else 1.0
+    bucket = 0
+    for index, (start, _) in enumerate(LOAD_FACTOR_BUCKETS):
+        if load >= start:
+            bucket = index
+    return bucket
+
+
+def days_bucket(departure_time, now) -> int:
+    days = (departure_time - now).total_seconds() / 86400
+    for index, (start, _) in enumerate(DEPARTURE_CURVE):
+        if days >= start:
+            return index
+    return len(DEPARTURE_CURVE) - 1
+
+
+@lru_cache(maxsize=4096)
+def fare(distance: int, load: int, days: int) -> Decimal:
+    base = BASE_FARE + FARE_PER_KM * distance
+    price = base * LOAD_FACTOR_BUCKETS[load][1] * DEPARTURE_CURVE[days][1]
+    return price.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def price_rows(rows, now) -> tuple:
+    """({flight id: price}, [changed FlightFare]) for FARE_FIELDS rows."""
+    prices = {}
+    changed = []
+    for (flight_id, capacity, seats_sold, departure_time, distance,
+         old_load, old_days, old_distance, old_price) in rows:
+        load = load_bucket(seats_sold, capacity)
+        days = days_bucket(departure_time, now)
+        if (load, days, distance) == (old_load, old_days, old_distance):
+            prices[flight_id] = old_price
+            continue
+        prices[flight_id] = fare(distance, load, days)
+        changed.append(FlightFare(flight_id=flight_id,
+                                  price=prices[flight_id],
+                                  load_bucket=load,
+                                  days_bucket=days,
+                                  distance=distance,
+                                  computed_at=now))
+    return prices, changed
+
+
+def save_fares(fares: list) -> None:
+    FlightFare.objects.bulk_create(
+        fares,
+        update_conflicts=True,
+        unique_fields=["flight"],
+        update_fields=["price",
+                       "load_bucket",
+                       "days_bucket",
+                       "distance",
+                       "computed_at"],
+    )
+
+
+def refresh(flight_ids, now=None) -> dict:
+    """Bring the fares of `flight_ids` up to date, returns
+    {flight id: price}. One SELECT, plus one upsert when a flight
+    moved to another bucket."""
+    now = now or timezone.now()
+    prices, changed = price_rows(
+        Flight.objects.filter(id__in=list(flight_ids))
+        .values_list(*FARE_FIELDS),
+        now,
+    )
+    if changed:
+        save_fares(changed)
+    return prices
+
+
+def current_fares(flight_ids) -> dict:
+    """{flight id: price} as stored, computing missing fares."""
+    prices = dict(FlightFare.objects
+                  .filter(flight_id__in=list(flight_ids))
+                  .values_list("flight_id", "price"))
+    missing = set(flight_ids) - set(prices)
+    if missing:
+        prices.update(refresh(missing))
+    return prices
+
+
+def recompute_all(now=None, chunk_size: int = 5_000, flights=None) -> dict:
+    """Refresh the fares of `flights` (a Flight queryset, every flight
+    by default), streaming them in id order.
+
+    Returns counts of priced and changed flights.
+    """
+    now = now or timezone.now()
+    flights = Flight.objects.all() if flights is None else flights
+    rows = (flights
+            .order_by("id")
+            .values_list(*FARE_FIELDS)
+            .iterator(chunk_size=chunk_size))
+    priced = updated = 0
+    for chunk in chunked(rows, chunk_size):
+        _, changed = price_rows(chunk, now)
+        if changed:
+            with transaction.atomic():
+                save_fares(changed)
+        priced += len(chunk)
+        updated += len(changed)
+    return {"flights": priced, "updated": updated}
+
+
+def refresh_routes(route_ids, now=None) -> dict:
+    """Reprice the flights of routes whose distance changed."""
+    return recompute_all(
+        now=now, flights=Flight.objects.filter(route_id__in=list(route_ids))
+    )
@@ -0,0 +1,218 @@
+"""
+Airplane rotations: the flights of one airplane ordered by departure.
+
+Two consecutive legs are valid when the second one departs from the
+airport the first one arrived at, no earlier than
+AIRPLANE_MIN_TURNAROUND minutes after the arrival. A single new flight
+is checked against its neighbours only, found with two seeks of the
+(airplane, departure_time) index; a whole schedule is checked with two
+queries and one sorted sweep over existing and new legs together.
+"""
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from airport import availability, inventory, pricing
+from airport.localtime import local_date
+from airport.models import Airplane, Flight, Route
+
+LEG_FIELDS = ("id",
+              "airplane_id",
+              "departure_time",
+              "arrival_time",
+              "route__source_id",
+              "route__destination_id")
+
+
+def min_turnaround() -> timedelta:
+    return timedelta(minutes=settings.AIRPLANE_MIN_TURNAROUND)
+
+
+def make_leg(flight_id, airplane_id, departure, arrival,
+             source_id, destination_id) -> dict:
+    return {"id": flight_id,
+            "airplane_id": airplane_id,
+            "departure_time": departure,
+            "arrival_time": arrival,
+            "source_id": source_id,
+            "destination_id": destination_id}
+
+
+def leg_errors(previous: dict, following: dict) -> list:
+    errors = []
+    ready = previous["arrival_time"] + min_turnaround()
+    if following["departure_time"] < ready:
+        errors.append(
+            f"Airplane {following['airplane_id']} is not ready before "
+            f"{ready:%Y-%m-%d %H:%M} after flight {previous['id'] or 'new'}."
+        )
+    if following["source_id"] != previous["destination_id"]:
+        errors.append(
+            f"Airplane {following['airplane_id']} arrives at airport "
+            f"{previous['destination_id']} and cannot depart from airport "
+            f"{following['source_id']}."
+        )
+    return errors
+
+
+def neighbours(airplane_id: int, departure, exclude_flight_id=None):
+    flights = (Flight.objects
+               .filter(airplane_id=airplane_id)
+               .values_list(*LEG_FIELDS))
+    if exclude_flight_id is not None:
+        flights = flights.exclude(id=exclude_flight_id)
+    previous = (flights.filter(departure_time__lt=departure)
+                .order_by("-departure_time").first())
+    following = (flights.filter(departure_time__gte=departure)
+                 .order_by("departure_time").first())
+    return (make_leg(*previous) if previous else None,
+            make_leg(*following) if following else None)
+
+
+def validate_flight(airplane_id: int, route: Route, departure, arrival,
+                    exclude_flight_id: int = None) -> list:
+    """Errors of putting a flight into the airplane's rotation."""
+    leg = make_leg(exclude_flight_id, airplane_id, departure, arrival,
+                   route.source_id, route.destination_id)
+    previous, following = neighbours(airplane_id, departure,
+                                     exclude_flight_id)
+    errors = []
+    if previous:
+        errors += leg_errors(previous, leg)
+    if following:
+        errors += leg_errors(leg, following)
+    return errors
+
+
+def rotation(airplane_id: int, start, end) -> list:
+    """Legs departing in [start, end) with ground time and issues."""
+    flights = (Flight.objects
+               .filter(airplane_id=airplane_id)
+               .values_list(*LEG_FIELDS)
+               .order_by("departure_time"))
+    previous = (flights.filter(departure_time__lt=start)
+                .order_by("-departure_time").first())
+    previous = make_leg(*previous) if previous else None
+    legs = []
+    for row in flights.filter(departure_time__gte=start,
+                              departure_time__lt=end):
+        leg = make_leg(*row)
+        leg["ground_minutes"] = None
+        leg["issues"] = []
+        if previous:
+            ground = leg["departure_time"] - previous["arrival_time"]
+            leg["ground_minutes"] = int(ground.total_seconds() // 60)
+            leg["issues"] = leg_errors(previous, leg)
+        legs.append(leg)
+        previous = leg
+    return legs
+
+
+def validate_schedule(legs: list) -> list:
+    """(index, error) for new `legs` clashing with each other or with
+    the existing flights of their airplanes.
+
+    Existing legs are read with one query for the schedule's time span
+    and one for the flights right before and after it.
+    """
+    if not legs:
+        return []
+    airplane_ids = {leg["airplane_id"] for leg in legs}
+    start = min(leg["departure_time"] for leg in legs)
+    end = max(leg["departure_time"] for leg in legs)
+    flights = Flight.objects.filter(airplane_id__in=airplane_ids)
+    around = Airplane.objects.filter(id__in=airplane_ids).annotate(
+        before=Subquery(flights.filter(airplane=OuterRef("pk"),
+                                       departure_time__lt=start)
+                        .order_by("-departure_time").values("id")[:1]),
+        after=Subquery(flights.filter(airplane=OuterRef("pk"),
+                                      departure_time__gt=end)
+                       .order_by("departure_time").values("id")[:1]),
+    )
+    boundary_ids = [flight_id
+                    for pair in around.values_list("before", "after")
+                    for flight_id in pair if flight_id]
+    existing = (
+        flights.filter(departure_time__gte=start, departure_time__lte=end)
+        | Flight.objects.filter(id__in=boundary_ids)
+    ).values_list(*LEG_FIELDS)
+
+    timeline = [(make_leg(*row), None) for row in existing]
+    timeline += [(leg, index) for index, leg in enumerate(legs)]
+    timeline.sort(key=lambda item: (item[0]["airplane_id"],
+                                    item[0]["departure_time"]))
+    errors = []
+    for _, items in groupby(timeline,
+                            key=lambda item: item[0]["airplane_id"]):
+        items = list(items)
+        for (previous, previous_index), (leg, index) in zip(items,
+                                                            items[1:]):
+            if previous_index is None and index is None:
+                continue
+            for error in leg_errors(previous, leg):
+                errors.append((index if index is not None
+                               else previous_index, error))
+    return errors
+
+
+def import_schedule(rows: list, dry_run: bool = False) -> tuple:
+    """Validate and insert flights given as dicts with route, airplane,
+    departure_time and arrival_time ids/datetimes.
+
+    Returns (created count, [(index, error), ...]); nothing is
+    inserted when there is any error.
+    """
+    routes = {
+        route_id: (source_id, destination_id, source_zone, destination_zone)
+        for (route_id, source_id, destination_id,
+             source_zone, destination_zone) in
+        Route.objects.filter(id__in={row["route"] for row in rows})
+        .values_list("id", "source_id", "destination_id",
+                     "source__timezone", "destination__timezone")
+    }
+    airplanes = set(Airplane.objects
+                    .filter(id__in={row["airplane"] for row in rows})
+                    .values_list("id", flat=True))
+    errors = []
+    legs = []
+    for index, row in enumerate(rows):
+        if row["route"] not in routes:
+            errors.append((index, f"Route {row['route']} does not exist."))
+        if row["airplane"] not in airplanes:
+            errors.append(
+                (index, f"Airplane {row['airplane']} does not exist.")
+            )
+        if row["arrival_time"] <= row["departure_time"]:
+            errors.append((index, "Arrival must be after departure."))
+        source_id, destination_id, _, _ = routes.get(row["route"],
+                                                     (None,) * 4)
+        legs.append(make_leg(None, row["airplane"], row["departure_time"],
+                             row["arrival_time"], source_id,
+                             destination_id))
+    if errors:
+        return 0, sorted(errors)
+    errors = validate_schedule(legs)
+    if errors or dry_run:
+        return 0, sorted(errors)
+    with transaction.atomic():
+        created = Flight.objects.bulk_create([
+            Flight(route_id=row["route"],
+                   airplane_id=row["airplane"],
+                   departure_time=row["departure_time"],
+                   arrival_time=row["arrival_time"],
+                   departure_date=local_date(row["departure_time"],
+                                             routes[row["route"]][2]),
+                   arrival_date=local_date(row["arrival_time"],
+                                           routes[row["route"]][3]))
+            for row in rows
+        ])
+        created_ids = [flight.id for flight in created]
+        inventory.recount(Flight.objects.filter(id__in=created_ids))
+        pricing.refresh(created_ids)
+        for bucket in {(flight.route_id, availability.flight_day(flight))
+                       for flight in created}:
+            availability.refresh_route_day(*bucket)
+    return len(created), []
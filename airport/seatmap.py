@@ -0,0 +1,155 @@
+"""
+Seat occupancy of a flight as one integer bitmask per row.
+
+Bit `seat - 1` of `masks[row - 1]` is set when the seat is taken. The
+masks are built with a single query over live and archived tickets and
+cached per flight; ticket signals drop the cached copy and readers
+also rebuild it when it disagrees with a ticket count they already
+have, so a flight response never mixes two different snapshots.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from airport.models import ArchivedTicket, Flight, Ticket
+
+
+def cache_key(flight_id: int) -> str:
+    return f"seatmap:{flight_id}"
+
+
+class SeatMap:
+    def __init__(self, rows: int, seats_in_row: int, masks: list,
+                 tickets: int):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self.masks = masks
+        # Sold seats, live and archived, to validate cached copies.
+        self.tickets = tickets
+
+    @classmethod
+    def build(cls, flight: Flight) -> "SeatMap":
+        airplane = flight.airplane
+        masks = [0] * airplane.rows
+        tickets = 0
+        occupied = (
+            Ticket.objects.filter(flight=flight)
+            .values_list("row", "seat")
+            .order_by()
+            .union(ArchivedTicket.objects.filter(flight=flight)
+                   .values_list("row", "seat")
+                   .order_by(), all=True)
+        )
+        for row, seat in occupied:
+            tickets += 1
+            if 1 <= row <= airplane.rows:
+                masks[row - 1] |= 1 << (seat - 1)
+        return cls(airplane.rows, airplane.seats_in_row, masks, tickets)
+
+    @property
+    def full_mask(self) -> int:
+        return (1 << self.seats_in_row) - 1
+
+    @property
+    def seats_available(self) -> int:
+        return sum(self.seats_in_row - (mask & self.full_mask).bit_count()
+                   for mask in self.masks)
+
+    def is_free(self, row: int, seat: int) -> bool:
+        return not self.masks[row - 1] >> (seat - 1) & 1
+
+    def free_blocks(self, row: int) -> list:
+        """(first seat, length) of every run of free seats in a row."""
+        blocks = []
+        mask = self.masks[row - 1]
+        start = None
+        for seat in range(1, self.seats_in_row + 2):
+            free = seat <= self.seats_in_row and not mask >> (seat - 1) & 1
+            if free and start is None:
+                start = seat
+            elif not free and start is not None:
+                blocks.append((start, seat - start))
+                start = None
+        return blocks
+
+    def summary(self) -> list:
+        rows = []
+        for row in range(1, self.rows + 1):
+            blocks = self.free_blocks(row)
+            largest = max(blocks, key=lambda block: block[1],
+                          default=(None, 0))
+            rows.append({
+                "row": row,
+                "free_seats": [seat
+                               for start, length in blocks
+                               for seat in range(start, start + length)],
+                "largest_block": largest[1],
+                "largest_block_start": largest[0],
+            })
+        return rows
+
+    def allocate(self, count: int):
+        """Pick `count` free seats as [(row, seat), ...], or None.
+
+        The tightest free block of a single row that fits the whole
+        group wins. Otherwise the group is split over the fewest
+        adjacent rows, taking the largest blocks of each row first.
+        """
+        fitting = [
+            (length, row, start)
+            for row in range(1, self.rows + 1)
+            for start, length in self.free_blocks(row)
+            if length >= count
+        ]
+        if fitting:
+            _, row, start = min(fitting)
+            return [(row, seat) for seat in range(start, start + count)]
+
+        free = [sum(length for _, length in self.free_blocks(row))
+                for row in range(1, self.rows + 1)]
+        best = None
+        for first in range(self.rows):
+            total = 0
+            for last in range(first, self.rows):
+                total += free[last]
+                if total >= count:
+                    if best is None or last - first < best[1] - best[0]:
+                        best = (first, last)
+                    break
+        if best is None:
+            return None
+        seats = []
+        for row in range(best[0] + 1, best[1] + 2):
+            blocks = sorted(self.free_blocks(row),
+                            key=lambda block: -block[1])
+            for start, length in blocks:
+                take = min(length, count - len(seats))
+                seats += [(row, seat) for seat in range(start, start + take)]
+            if len(seats) == count:
+                break
+        return seats
+
+    def to_cache(self) -> dict:
+        return {"layout": (self.rows, self.seats_in_row),
+                "masks": self.masks,
+                "tickets": self.tickets}
+
+
+def get_seat_map(flight: Flight, tickets: int = None) -> SeatMap:
+    """Cached seat map of `flight`; `tickets` is the sold seat count
+    (Flight.seats_sold) the caller already knows, a cached copy that
+    disagrees is rebuilt."""
+    airplane = flight.airplane
+    cached = cache.get(cache_key(flight.id))
+    if (cached
+            and cached["layout"] == (airplane.rows, airplane.seats_in_row)
+            and (tickets is None or cached["tickets"] == tickets)):
+        return SeatMap(airplane.rows, airplane.seats_in_row,
+                       cached["masks"], cached["tickets"])
+    seat_map = SeatMap.build(flight)
+    cache.set(cache_key(flight.id), seat_map.to_cache(),
+              settings.SEAT_MAP_CACHE_TIMEOUT)
+    return seat_map
+
+
+def invalidate(flight_id: int) -> None:
+    cache.delete(cache_key(flight_id))
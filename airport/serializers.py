@@ -1,8 +1,16 @@
+from collections import Counter
+
 from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from django.core.exceptions import ValidationError as DjangoValidationError
 
+from airport import crew_schedule, geo, pricing, rotation
+from airport.images import rendition_paths
+from airport.inventory import reserve
+from airport.localtime import zone
+from airport.seatmap import SeatMap, get_seat_map
 from airport.models import (
     Airport,
     Crew,
@@ -12,9 +20,24 @@ from airport.models import (
     Flight,
     Order,
     Ticket,
+    RouteDailyAvailability,
+    CrewAssignment,
 )
 
 
+def reserve_seats(seats_per_flight: dict) -> None:
+    """Take the seats of an order from the flights' counters.
+
+    Each conditional UPDATE also locks its flight row until the
+    transaction ends, flights go in id order so orders can't deadlock.
+    """
+    for flight_id in sorted(seats_per_flight):
+        if not reserve(flight_id, seats_per_flight[flight_id]):
+            raise ValidationError(
+                {"flight": f"Flight {flight_id} is sold out."}
+            )
+
+
 class CrewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Crew
@@ -27,16 +50,60 @@ class CrewFullNameSerializer(CrewSerializer):
         fields = ("full_name",)
 
 
+class CrewScheduleSerializer(serializers.ModelSerializer):
+    source = serializers.CharField(
+        source="flight.route.source.name",
+        read_only=True)
+    destination = serializers.CharField(
+        source="flight.route.destination.name",
+        read_only=True)
+
+    class Meta:
+        model = CrewAssignment
+        fields = ("flight",
+                  "source",
+                  "destination",
+                  "departure_time",
+                  "arrival_time",)
+
+
 class AirportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Airport
-        fields = ("id", "name", "closest_big_city")
+        fields = ("id",
+                  "name",
+                  "closest_big_city",
+                  "timezone",
+                  "latitude",
+                  "longitude")
+
+
+class AirportNearbySerializer(AirportSerializer):
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Airport
+        fields = AirportSerializer.Meta.fields + ("distance",)
 
 
 class RouteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = ("id", "source", "destination", "distance")
+        extra_kwargs = {"distance": {"required": False}}
+
+    def validate(self, attrs):
+        data = super(RouteSerializer, self).validate(attrs=attrs)
+        if "distance" not in attrs and not self.partial:
+            distance = geo.route_distance(attrs["source"],
+                                          attrs["destination"])
+            if distance is None:
+                raise ValidationError(
+                    {"distance": "Required when the airports "
+                                 "have no coordinates."}
+                )
+            data["distance"] = distance
+        return data
 
 
 class RouteListSerializer(RouteSerializer):
@@ -55,10 +122,41 @@ class RouteRetrieveSerializer(RouteSerializer):
     destination = AirportSerializer()
 
 
+class AirplaneImageRenditionsField(serializers.Field):
+    """URLs of the resized copies of `image`, keyed by size and format."""
+
+    def __init__(self, **kwargs):
+        kwargs["source"] = "image"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get("request")
+        renditions = {}
+        for rendition, formats in rendition_paths(value.name).items():
+            renditions[rendition] = {}
+            for fmt, path in formats.items():
+                url = value.storage.url(path)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                renditions[rendition][fmt] = url
+        return renditions
+
+
 class AirplaneForAirplaneTypeSerializer(serializers.ModelSerializer):
+    image_renditions = AirplaneImageRenditionsField()
+
     class Meta:
         model = Airplane
-        fields = ("id", "name", "rows", "seats_in_row", "capacity", "image",)
+        fields = ("id",
+                  "name",
+                  "rows",
+                  "seats_in_row",
+                  "capacity",
+                  "image",
+                  "image_renditions",)
         read_only_fields = ("capacity",)
 
 
@@ -78,6 +176,8 @@ class AirplaneTypeRetrieveSerializer(AirplaneTypeSerializer):
 
 
 class AirplaneSerializer(serializers.ModelSerializer):
+    image_renditions = AirplaneImageRenditionsField()
+
     class Meta:
         model = Airplane
         fields = ("id",
@@ -86,14 +186,17 @@ class AirplaneSerializer(serializers.ModelSerializer):
                   "seats_in_row",
                   "capacity",
                   "airplane_type",
-                  "image",)
+                  "image",
+                  "image_renditions",)
         read_only_fields = ("capacity", "image",)
 
 
 class AirplaneImageSerializer(serializers.ModelSerializer):
+    image_renditions = AirplaneImageRenditionsField()
+
     class Meta:
         model = Airplane
-        fields = ("id", "image")
+        fields = ("id", "image", "image_renditions")
 
 
 class AirplaneListSerializer(AirplaneSerializer):
@@ -112,7 +215,8 @@ class AirplaneRetrieveSerializer(AirplaneSerializer):
                   "seats_in_row",
                   "capacity",
                   "airplane_type",
-                  "image",)
+                  "image",
+                  "image_renditions",)
 
 
 class FlightSerializer(serializers.ModelSerializer):
@@ -126,9 +230,75 @@ class FlightSerializer(serializers.ModelSerializer):
                   "crew",
                   )
 
+    def validate(self, attrs):
+        data = super(FlightSerializer, self).validate(attrs=attrs)
+        instance = self.instance
+        departure = attrs.get("departure_time",
+                              getattr(instance, "departure_time", None))
+        arrival = attrs.get("arrival_time",
+                            getattr(instance, "arrival_time", None))
+        route = attrs.get("route", getattr(instance, "route", None))
+        airplane = attrs.get("airplane", getattr(instance, "airplane", None))
+        if departure and arrival and arrival <= departure:
+            raise ValidationError(
+                {"arrival_time": "Arrival must be after departure."}
+            )
+        if route and airplane and departure and arrival:
+            errors = rotation.validate_flight(
+                airplane.id,
+                route,
+                departure,
+                arrival,
+                exclude_flight_id=getattr(instance, "id", None),
+            )
+            if errors:
+                raise ValidationError({"airplane": errors})
+        if "crew" in attrs:
+            crew_ids = [member.id for member in attrs["crew"]]
+        elif instance is not None:
+            crew_ids = list(instance.crew.values_list("id", flat=True))
+        else:
+            crew_ids = []
+        if crew_ids and departure and arrival:
+            busy = crew_schedule.conflicts(
+                crew_ids,
+                departure,
+                arrival,
+                exclude_flight_id=getattr(instance, "id", None),
+            )
+            if busy:
+                raise ValidationError({"crew": [
+                    f"{assignment.crew.full_name} is assigned to flight "
+                    f"{assignment.flight_id} from "
+                    f"{assignment.departure_time:%Y-%m-%d %H:%M} to "
+                    f"{assignment.arrival_time:%Y-%m-%d %H:%M}."
+                    for assignment in busy
+                ]})
+        return data
+
 
-class FlightListSerializer(FlightSerializer):
+class FlightLocalTimesMixin(serializers.Serializer):
+    departure_local_time = serializers.SerializerMethodField()
+    arrival_local_time = serializers.SerializerMethodField()
+
+    def get_departure_local_time(self, obj) -> str:
+        return timezone.localtime(
+            obj.departure_time, zone(obj.route.source.timezone)
+        ).isoformat()
+
+    def get_arrival_local_time(self, obj) -> str:
+        return timezone.localtime(
+            obj.arrival_time, zone(obj.route.destination.timezone)
+        ).isoformat()
+
+
+class FlightListSerializer(FlightLocalTimesMixin, FlightSerializer):
     tickets_available = serializers.IntegerField(read_only=True)
+    fare = serializers.DecimalField(source="fare.price",
+                                    max_digits=10,
+                                    decimal_places=2,
+                                    read_only=True,
+                                    default=None)
     source = serializers.CharField(source="route.source.name", read_only=True)
     destination = serializers.CharField(
         source="route.destination.name",
@@ -143,12 +313,20 @@ class FlightListSerializer(FlightSerializer):
             "destination",
             "departure_time",
             "arrival_time",
+            "departure_local_time",
+            "arrival_local_time",
             "tickets_available",
+            "fare",
         )
 
 
-class FlightRetrieveSerializer(FlightSerializer):
+class FlightRetrieveSerializer(FlightLocalTimesMixin, FlightSerializer):
     tickets_available = serializers.IntegerField(read_only=True)
+    fare = serializers.DecimalField(source="fare.price",
+                                    max_digits=10,
+                                    decimal_places=2,
+                                    read_only=True,
+                                    default=None)
     crew = CrewSerializer(many=True, read_only=True)
     route = RouteListSerializer(read_only=True)
     airplane = AirplaneSerializer(read_only=True)
@@ -160,12 +338,26 @@ class FlightRetrieveSerializer(FlightSerializer):
             "airplane",
             "departure_time",
             "arrival_time",
+            "departure_local_time",
+            "arrival_local_time",
             "crew",
             "route",
             "tickets_available",
+            "fare",
         )
 
 
+class FlightRetrieveWithSeatsSerializer(FlightRetrieveSerializer):
+    seat_availability = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Flight
+        fields = FlightRetrieveSerializer.Meta.fields + ("seat_availability",)
+
+    def get_seat_availability(self, obj) -> list:
+        return get_seat_map(obj, tickets=obj.seats_sold).summary()
+
+
 class TicketSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
@@ -180,7 +372,8 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
 
-        fields = ("id", "row", "seat", "flight")
+        fields = ("id", "row", "seat", "flight", "price")
+        read_only_fields = ("price",)
 
 
 class FlightForTicketSerializer(serializers.ModelSerializer):
@@ -212,14 +405,93 @@ class OrderSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
+            seats = Counter(ticket["flight"].id for ticket in tickets_data)
+            fares = pricing.current_fares(seats)
+            reserve_seats(seats)
             order = Order.objects.create(**validated_data)
             for ticket_data in tickets_data:
+                ticket = Ticket(order=order,
+                                price=fares[ticket_data["flight"].id],
+                                **ticket_data)
+                ticket.seat_reserved = True
+                try:
+                    ticket.save()
+                except DjangoValidationError as e:
+                    raise ValidationError(e.message_dict)
+            pricing.refresh(seats)
+            return order
+
+
+class OrderSeatAllocationSerializer(serializers.ModelSerializer):
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane"),
+        write_only=True)
+    passengers = serializers.IntegerField(min_value=1, write_only=True)
+    tickets = TicketSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ("id", "flight", "passengers", "tickets", "created_at")
+
+    def create(self, validated_data):
+        flight = validated_data.pop("flight")
+        passengers = validated_data.pop("passengers")
+        with transaction.atomic():
+            price = pricing.current_fares([flight.id])[flight.id]
+            seats = None
+            if reserve(flight.id, passengers):
+                seats = SeatMap.build(flight).allocate(passengers)
+            if seats is None:
+                flight.refresh_from_db(fields=["capacity", "seats_sold"])
+                seats_left = max(flight.capacity - flight.seats_sold, 0)
+                raise ValidationError({
+                    "passengers": f"Only {seats_left} "
+                                  f"seats are left on this flight."
+                })
+            order = Order.objects.create(**validated_data)
+            for row, seat in seats:
+                ticket = Ticket(order=order,
+                                flight=flight,
+                                row=row,
+                                seat=seat,
+                                price=price)
+                ticket.seat_reserved = True
                 try:
-                    Ticket.objects.create(order=order, **ticket_data)
+                    ticket.save()
                 except DjangoValidationError as e:
                     raise ValidationError(e.message_dict)
+            pricing.refresh([flight.id])
             return order
 
 
+class OrderRetrieveSerializer(OrderSerializer):
+    tickets = TicketSerializer(many=True,
+                               read_only=True,
+                               source="ticket_history")
+
+
 class OrderListSerializer(OrderSerializer):
-    tickets = TicketListSerializer(many=True, read_only=True)
+    tickets = TicketListSerializer(
+        many=True,
+        read_only=True,
+        source="ticket_history")
+
+
+class RouteDailyAvailabilitySerializer(serializers.ModelSerializer):
+    source = serializers.CharField(source="route.source.name", read_only=True)
+    destination = serializers.CharField(
+        source="route.destination.name",
+        read_only=True)
+    seats_available = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = RouteDailyAvailability
+        fields = ("id",
+                  "route",
+                  "source",
+                  "destination",
+                  "date",
+                  "flights_count",
+                  "capacity",
+                  "seats_sold",
+                  "seats_available",)
@@ -0,0 +1,272 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.signals import (m2m_changed,
+                                      post_delete,
+                                      post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from django.db.models import Q
+
+from airport import (availability,
+                     crew_schedule,
+                     geo,
+                     inventory,
+                     localtime,
+                     pricing,
+                     seatmap)
+from airport.models import (Airplane,
+                            Airport,
+                            ArchivedTicket,
+                            CrewAssignment,
+                            Flight,
+                            Route,
+                            Ticket)
+
+
+@receiver(pre_save, sender=Airport)
+def remember_airport_geodata(sender, instance, **kwargs):
+    instance._previous_geodata = (
+        Airport.objects
+        .filter(pk=instance.pk)
+        .values_list("latitude", "longitude", "timezone")
+        .first()
+    ) if instance.pk else None
+
+
+@receiver(post_save, sender=Airport)
+def refresh_airport_geodata(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_geodata", None)
+    coordinates = (instance.latitude, instance.longitude)
+    if previous and previous[:2] != coordinates and None not in coordinates:
+        geo.recompute_distances(airport_ids=[instance.pk])
+    geo.invalidate_grid()
+    transaction.on_commit(geo.invalidate_grid)
+
+
+@receiver(post_save, sender=Airport)
+def refresh_airport_local_dates(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_geodata", None)
+    if not previous or previous[2] == instance.timezone:
+        return
+    flights = Flight.objects.filter(
+        Q(route__source=instance) | Q(route__destination=instance)
+    )
+    buckets = set(flights.values_list("route_id", "departure_date"))
+    localtime.fill_local_dates(flights)
+    buckets |= set(flights.values_list("route_id", "departure_date"))
+    for bucket in buckets:
+        availability.refresh_route_day(*bucket)
+
+
+@receiver(post_delete, sender=Airport)
+def drop_airport_from_grid(sender, instance, **kwargs):
+    geo.invalidate_grid()
+    transaction.on_commit(geo.invalidate_grid)
+
+
+@receiver(pre_save, sender=Route)
+def remember_route_distance(sender, instance, **kwargs):
+    instance._previous_distance = (
+        Route.objects
+        .filter(pk=instance.pk)
+        .values_list("distance", flat=True)
+        .first()
+    ) if instance.pk else None
+
+
+@receiver(post_save, sender=Route)
+def reprice_route_flights(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_distance", None)
+    if not created and previous != instance.distance:
+        pricing.refresh_routes([instance.pk])
+
+
+@receiver(pre_save, sender=Flight)
+def remember_flight_bucket(sender, instance, **kwargs):
+    instance._availability_bucket = None
+    instance._previous_airplane_id = None
+    instance._previous_times = None
+    if instance.pk:
+        previous = (Flight.objects
+                    .filter(pk=instance.pk)
+                    .only("route_id",
+                          "departure_time",
+                          "departure_date",
+                          "arrival_time",
+                          "airplane_id")
+                    .first())
+        if previous:
+            instance._availability_bucket = (
+                previous.route_id,
+                availability.flight_day(previous),
+            )
+            instance._previous_airplane_id = previous.airplane_id
+            instance._previous_times = (previous.departure_time,
+                                        previous.arrival_time)
+
+
+@receiver(post_save, sender=Flight)
+def refresh_flight_bucket(sender, instance, **kwargs):
+    bucket = (instance.route_id, availability.flight_day(instance))
+    previous = getattr(instance, "_availability_bucket", None)
+    if previous and previous != bucket:
+        availability.refresh_route_day(*previous)
+    availability.refresh_route_day(*bucket)
+
+
+@receiver(post_save, sender=Flight)
+def rehome_flight_tickets(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_airplane_id", None)
+    if not created and previous and previous != instance.airplane_id:
+        inventory.rehome_tickets(instance)
+
+
+@receiver(post_save, sender=Flight)
+def sync_crew_assignment_times(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_times", None)
+    times = (instance.departure_time, instance.arrival_time)
+    if not created and previous and previous != times:
+        crew_schedule.sync_flight_times(instance)
+
+
+@receiver(post_save, sender=Flight)
+def refresh_flight_fare(sender, instance, **kwargs):
+    pricing.refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def sync_crew_assignments(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    if action == "post_add":
+        if reverse:
+            crew_schedule.add(pk_set, [instance.pk])
+        else:
+            crew_schedule.add([instance.pk], pk_set)
+    elif action == "post_remove":
+        if reverse:
+            assignments = CrewAssignment.objects.filter(
+                crew_id=instance.pk, flight_id__in=pk_set
+            )
+        else:
+            assignments = CrewAssignment.objects.filter(
+                flight_id=instance.pk, crew_id__in=pk_set
+            )
+        assignments.delete()
+    elif action == "pre_clear":
+        CrewAssignment.objects.filter(
+            **{"crew_id" if reverse else "flight_id": instance.pk}
+        ).delete()
+
+
+@receiver(post_delete, sender=Flight)
+def drop_flight_bucket(sender, instance, **kwargs):
+    availability.refresh_route_day(
+        instance.route_id, availability.flight_day(instance)
+    )
+
+
+@receiver(post_save, sender=Airplane)
+def refresh_airplane_buckets(sender, instance, created, **kwargs):
+    if created:
+        return
+    buckets = {
+        (flight.route_id, availability.flight_day(flight))
+        for flight in instance.flight_set.only("route_id", "departure_date")
+    }
+    for bucket in buckets:
+        availability.refresh_route_day(*bucket)
+
+
+@receiver(post_save, sender=Airplane)
+def rehome_airplane_tickets(sender, instance, created, **kwargs):
+    if created:
+        return
+    instance.flight_set.update(capacity=instance.capacity)
+    stranded_flight_ids = (
+        Ticket.objects
+        .filter(flight__airplane=instance)
+        .filter(Q(row__gt=instance.rows)
+                | Q(seat__gt=instance.seats_in_row)
+                | Q(needs_reseat=True))
+        .values_list("flight_id", flat=True)
+        .distinct()
+    )
+    for flight in Flight.objects.filter(id__in=list(stranded_flight_ids)):
+        inventory.rehome_tickets(flight)
+    pricing.refresh(instance.flight_set.values_list("id", flat=True))
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_flight(sender, instance, **kwargs):
+    instance._previous_flight_id = (
+        Ticket.objects
+        .filter(pk=instance.pk)
+        .values_list("flight_id", flat=True)
+        .first()
+    ) if instance.pk else None
+
+
+def moved_from(ticket):
+    """Id of the flight `ticket` was saved away from, or None."""
+    previous = getattr(ticket, "_previous_flight_id", None)
+    return previous if previous not in (None, ticket.flight_id) else None
+
+
+@receiver(post_save, sender=Ticket)
+def count_ticket_sold(sender, instance, created, **kwargs):
+    previous = moved_from(instance)
+    if created:
+        availability.add_seats_sold(instance.flight, 1)
+    elif previous:
+        previous_flight = Flight.objects.filter(pk=previous).first()
+        if previous_flight:
+            availability.add_seats_sold(previous_flight, -1)
+        availability.add_seats_sold(instance.flight, 1)
+
+
+@receiver(post_save, sender=Ticket)
+def move_ticket_seat(sender, instance, created, **kwargs):
+    previous = moved_from(instance)
+    if created or not previous:
+        return
+    inventory.release(previous, 1)
+    if not inventory.reserve(instance.flight_id, 1):
+        raise ValidationError(
+            {"flight": f"Flight {instance.flight_id} is sold out."}
+        )
+    pricing.refresh([previous, instance.flight_id])
+
+
+@receiver(post_save, sender=Ticket)
+def refresh_ticket_fare(sender, instance, created, **kwargs):
+    # Callers reserving seats in bulk refresh their flights' fares once.
+    if created and not instance.seat_reserved:
+        pricing.refresh([instance.flight_id])
+
+
+@receiver(post_delete, sender=Ticket)
+@receiver(post_delete, sender=ArchivedTicket)
+def count_ticket_refunded(sender, instance, **kwargs):
+    flight = Flight.objects.filter(pk=instance.flight_id).first()
+    if flight:
+        availability.add_seats_sold(flight, -1)
+        inventory.release(flight.id, 1)
+        # After commit: a cascade from Flight deletes the flight last.
+        transaction.on_commit(lambda: pricing.refresh([flight.id]))
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+@receiver(post_delete, sender=ArchivedTicket)
+def invalidate_seat_map(sender, instance, **kwargs):
+    flight_ids = [instance.flight_id]
+    if sender is Ticket and moved_from(instance):
+        flight_ids.append(moved_from(instance))
+
+    def invalidate():
+        for flight_id in flight_ids:
+            seatmap.invalidate(flight_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from airport import pricing
+from airport.jobs import task
+from airport.models import Order
+
+
+@task("order_confirmation")
+def send_order_confirmation(order_id: int) -> None:
+    order = (Order.objects
+             .select_related("user")
+             .prefetch_related("tickets__flight__route__source",
+                               "tickets__flight__route__destination")
+             .filter(id=order_id)
+             .first())
+    if order is None:
+        return
+    lines = [
+        f"Row {ticket.row}, seat {ticket.seat}: {ticket.flight}"
+        for ticket in order.tickets.all()
+    ]
+    send_mail(
+        subject=f"Airport Service order #{order.id}",
+        message="\n".join(lines),
+        from_email=None,
+        recipient_list=[order.user.email],
+    )
+
+
+@task("recompute_fares", every=settings.FARE_RECOMPUTE_INTERVAL)
+def recompute_fares() -> None:
+    """Move fares into their current days-to-departure bucket."""
+    pricing.recompute_all()
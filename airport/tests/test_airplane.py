@@ -1,5 +1,7 @@
 import tempfile
 import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 from PIL import Image
 from django.contrib.auth import get_user_model
@@ -9,7 +11,9 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from airport.models import Airplane, AirplaneType
 from airport.serializers import AirplaneListSerializer
+from airport.images import generate_renditions, delete_renditions, submit_renditions
 from django.core.cache import cache
+from django.core.files.storage import default_storage
 
 AIRPLANE_URL = reverse("airport:airplanes-list")
 
@@ -46,6 +50,8 @@ class AirplaneAdminTests(TestCase):
         self.airplanes = AirplaneListSerializer([self.airplane1, self.airplane2], many=True).data
 
     def tearDown(self):
+        if self.airplane1.image:
+            delete_renditions(self.airplane1.image.name)
         self.airplane1.image.delete()
 
     def test_upload_image_to_movie(self):
@@ -109,6 +115,47 @@ class AirplaneAdminTests(TestCase):
         res = self.client.get(AIRPLANE_URL)
         self.assertIn("image", res.data["results"][0].keys())
 
+    def test_upload_image_schedules_renditions(self):
+        url = image_upload_url(self.airplane1.id)
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
+            img = Image.new("RGB", (10, 10))
+            img.save(ntf, format="JPEG")
+            ntf.seek(0)
+            with self.captureOnCommitCallbacks() as callbacks:
+                res = self.client.post(url, {"image": ntf}, format="multipart")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(callbacks), 1)
+        self.assertIn("thumb", res.data["image_renditions"])
+        self.assertTrue(res.data["image_renditions"]["thumb"]["webp"].endswith("-thumb.webp"))
+
+    def test_generate_renditions(self):
+        url = image_upload_url(self.airplane1.id)
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
+            img = Image.new("RGB", (1600, 1000))
+            exif = Image.Exif()
+            exif[0x010F] = "SkyCamera"
+            img.save(ntf, format="JPEG", exif=exif)
+            ntf.seek(0)
+            self.client.post(url, {"image": ntf}, format="multipart")
+        self.airplane1.refresh_from_db()
+        paths = generate_renditions(self.airplane1.image.name)
+        self.assertEqual(len(paths), 4)
+        sizes = {}
+        for path in paths:
+            with Image.open(default_storage.path(path)) as rendition:
+                sizes[os.path.basename(path).rsplit("-", 1)[1]] = rendition.size
+                self.assertEqual(len(rendition.getexif()), 0)
+        self.assertEqual(sizes["thumb.webp"], (200, 125))
+        self.assertEqual(sizes["medium.jpeg"], (800, 500))
+
+    def test_failed_renditions_are_logged(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        with mock.patch("airport.images._executor", executor), self.assertLogs("airport.images", "ERROR") as logs:
+            submit_renditions("airplanes/missing.jpg")
+            executor.shutdown(wait=True)
+        self.assertIn("Renditions of airplanes/missing.jpg failed", logs.output[0])
+        self.assertIn("FileNotFoundError", logs.output[0])
+
     def test_airplane_str(self):
         self.assertEqual(str(self.airplane1),
                          f"{self.airplane1.name}, {self.airplane1.rows}, {self.airplane1.seats_in_row}")
@@ -0,0 +1,108 @@
+from datetime import datetime
+from decimal import Decimal
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            AirplaneType,
+                            Airplane,
+                            Order,
+                            Ticket)
+from django.core.cache import cache
+
+LOAD_FACTOR_URL = reverse("airport:analytics-load-factor")
+BUSIEST_AIRPORTS_URL = reverse("airport:analytics-busiest-airports")
+SEAT_HEATMAP_URL = reverse("airport:analytics-seat-heatmap")
+
+
+def at(day, hour):
+    return timezone.make_aware(datetime(2025, 1, day, hour, 0, 0))
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_superuser(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.kyiv = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        self.barcelona = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        self.warsaw = Airport.objects.create(name="Warsaw Chopin", closest_big_city="Warsaw")
+        self.kyiv_barcelona = Route.objects.create(source=self.kyiv, destination=self.barcelona, distance=2400)
+        self.warsaw_kyiv = Route.objects.create(source=self.warsaw, destination=self.kyiv, distance=800)
+        self.boeing = AirplaneType.objects.create(name="Boeing 737")
+        self.flight1 = self.create_flight(self.kyiv_barcelona, rows=2, seats_in_row=2, departure=at(12, 9))
+        self.flight2 = self.create_flight(self.warsaw_kyiv, rows=3, seats_in_row=2, departure=at(13, 9))
+        order = Order.objects.create(user=self.user)
+        for row, seat, flight, price in [(1, 1, self.flight1, "100.00"),
+                                         (1, 2, self.flight1, "120.00"),
+                                         (1, 1, self.flight2, "50.00"),
+                                         (3, 2, self.flight2, "60.00")]:
+            Ticket.objects.create(row=row, seat=seat, flight=flight, order=order, price=Decimal(price))
+
+    def create_flight(self, route, rows, seats_in_row, departure):
+        return Flight.objects.create(
+            route=route,
+            airplane=Airplane.objects.create(name="SkyBird", rows=rows, seats_in_row=seats_in_row, airplane_type=self.boeing),
+            departure_time=departure,
+            arrival_time=departure.replace(hour=departure.hour + 2),
+        )
+
+    def test_admin_only(self):
+        regular = get_user_model().objects.create_user(email="user@gmail.com", password="ASDasfsfgwe$123")
+        self.client.force_authenticate(user=regular)
+        self.assertEqual(self.client.get(LOAD_FACTOR_URL).status_code, 403)
+
+    def test_load_factor_per_route(self):
+        res = self.client.get(LOAD_FACTOR_URL)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data[0]["label"], "Kyiv Boryspil > Barcelona El Prat")
+        self.assertEqual((res.data[0]["capacity"], res.data[0]["seats_sold"], res.data[0]["load_factor"]), (4, 2, 0.5))
+        self.assertEqual(res.data[0]["revenue"], Decimal("220.00"))
+        self.assertEqual(res.data[1]["load_factor"], 0.3333)
+
+    def test_load_factor_per_day_and_type(self):
+        res = self.client.get(LOAD_FACTOR_URL, {"group": "day", "from": "2025-01-13"})
+        self.assertEqual([row["label"] for row in res.data], ["2025-01-13"])
+        res = self.client.get(LOAD_FACTOR_URL, {"group": "airplane_type"})
+        self.assertEqual(res.data[0]["label"], "Boeing 737")
+        self.assertEqual((res.data[0]["flights"], res.data[0]["load_factor"]), (2, 0.4))
+        self.assertEqual(res.data[0]["revenue"], Decimal("330.00"))
+        self.assertEqual(self.client.get(LOAD_FACTOR_URL, {"group": "crew"}).status_code, 400)
+
+    def test_load_factor_is_cached(self):
+        self.client.get(LOAD_FACTOR_URL)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(LOAD_FACTOR_URL).status_code, 200)
+
+    def test_busiest_airports(self):
+        res = self.client.get(BUSIEST_AIRPORTS_URL, {"limit": 2})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([row["name"] for row in res.data], ["Kyiv Boryspil", "Barcelona El Prat"])
+        self.assertEqual((res.data[0]["departures"], res.data[0]["arrivals"], res.data[0]["passengers"]), (1, 1, 4))
+
+    def test_seat_heatmap(self):
+        res = self.client.get(SEAT_HEATMAP_URL, {"airplane_type": self.boeing.id})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["flights"], 2)
+        self.assertEqual(res.data["rows"][0], {"row": 1, "load_factor": 0.75, "seats": [1.0, 0.5]})
+        self.assertEqual(res.data["rows"][2], {"row": 3, "load_factor": 0.5, "seats": [0.0, 1.0]})
+        self.assertEqual(self.client.get(SEAT_HEATMAP_URL).status_code, 400)
+
+    def test_invalid_parameters(self):
+        for url, params in ((BUSIEST_AIRPORTS_URL, {"limit": "ten"}),
+                            (BUSIEST_AIRPORTS_URL, {"limit": -1}),
+                            (BUSIEST_AIRPORTS_URL, {"from": "yesterday"}),
+                            (SEAT_HEATMAP_URL, {"airplane_type": "boeing"}),
+                            (LOAD_FACTOR_URL, {"to": "2025-13-01"})):
+            res = self.client.get(url, params)
+            self.assertEqual(res.status_code, 400, params)
+            self.assertIn(next(iter(params)), res.data)
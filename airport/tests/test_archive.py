@@ -0,0 +1,103 @@
+from io import StringIO
+from datetime import datetime, timedelta
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            AirplaneType,
+                            Airplane,
+                            Order,
+                            Ticket,
+                            ArchivedTicket,
+                            RouteDailyAvailability)
+from django.core.cache import cache
+
+ORDER_URL = reverse("airport:orders-list")
+
+
+class ArchiveTicketsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.airport1 = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        self.airport2 = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        self.route1 = Route.objects.create(
+            source=self.airport1,
+            destination=self.airport2,
+            distance=2400,
+        )
+        self.airplane_type1 = AirplaneType.objects.create(name="Boeing 737")
+        self.airplane1 = Airplane.objects.create(
+            name="SkyBird-737",
+            rows=25,
+            seats_in_row=6,
+            airplane_type=self.airplane_type1,
+        )
+        self.old_flight = Flight.objects.create(
+            route=self.route1,
+            airplane=self.airplane1,
+            departure_time=timezone.make_aware(datetime(2025, 1, 12, 9, 0, 0)),
+            arrival_time=timezone.make_aware(datetime(2025, 1, 12, 12, 30, 0)),
+        )
+        self.new_flight = Flight.objects.create(
+            route=self.route1,
+            airplane=self.airplane1,
+            departure_time=timezone.now() + timedelta(days=10),
+            arrival_time=timezone.now() + timedelta(days=10, hours=3),
+        )
+        self.order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.old_flight, order=self.order)
+        Ticket.objects.create(row=1, seat=2, flight=self.old_flight, order=self.order)
+        Ticket.objects.create(row=1, seat=1, flight=self.new_flight, order=self.order)
+
+    def test_archive_moves_old_tickets(self):
+        call_command("archive_tickets", "--days=30", stdout=StringIO())
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(ArchivedTicket.objects.count(), 2)
+        self.assertFalse(Ticket.objects.filter(flight=self.old_flight).exists())
+        bucket = RouteDailyAvailability.objects.get(route=self.route1, date=self.old_flight.departure_time.date())
+        self.assertEqual(bucket.seats_sold, 2)
+
+    def test_order_history_spans_archive(self):
+        call_command("archive_tickets", "--days=30", stdout=StringIO())
+        res = self.client.get(ORDER_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"][0]["tickets"]), 3)
+        res = self.client.get(reverse("airport:orders-detail", args=[self.order.id]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted((ticket["flight"], ticket["seat"]) for ticket in res.data["tickets"]),
+                         [(self.old_flight.id, 1), (self.old_flight.id, 2), (self.new_flight.id, 1)])
+
+    def test_archived_seat_not_sold_again(self):
+        call_command("archive_tickets", "--days=30", stdout=StringIO())
+        payload = {"tickets": [{"row": 1, "seat": 1, "flight": self.old_flight.id}]}
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        payload = {"tickets": [{"row": 2, "seat": 1, "flight": self.old_flight.id}]}
+        self.assertEqual(self.client.post(ORDER_URL, payload, format="json").status_code, status.HTTP_201_CREATED)
+        res = self.client.get(reverse("airport:flights-detail", args=[self.old_flight.id]))
+        self.assertEqual(res.data["tickets_available"], 150 - 3)
+        call_command("archive_tickets", "--days=30", stdout=StringIO())
+        self.assertEqual(ArchivedTicket.objects.filter(flight=self.old_flight).count(), 3)
+        self.assertFalse(Ticket.objects.filter(flight=self.old_flight).exists())
+
+    def test_refresh_counts_archived_tickets(self):
+        call_command("archive_tickets", "--days=30", stdout=StringIO())
+        call_command("refresh_availability", stdout=StringIO())
+        bucket = RouteDailyAvailability.objects.get(route=self.route1, date=self.old_flight.departure_time.date())
+        self.assertEqual(bucket.seats_sold, 2)
+        self.order.delete()
+        bucket.refresh_from_db()
+        self.assertEqual(bucket.seats_sold, 0)
@@ -0,0 +1,163 @@
+from io import StringIO
+from datetime import datetime
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            AirplaneType,
+                            Airplane,
+                            Order,
+                            Ticket,
+                            RouteDailyAvailability)
+from django.core.cache import cache
+
+AVAILABILITY_URL = reverse("airport:availability-list")
+ORDER_URL = reverse("airport:orders-list")
+
+
+class RouteDailyAvailabilityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.airport1 = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        self.airport2 = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        self.route1 = Route.objects.create(
+            source=self.airport1,
+            destination=self.airport2,
+            distance=2400,
+        )
+        self.airplane_type1 = AirplaneType.objects.create(name="Boeing 737")
+        self.airplane1 = Airplane.objects.create(
+            name="SkyBird-737",
+            rows=25,
+            seats_in_row=6,
+            airplane_type=self.airplane_type1,
+        )
+        self.airplane2 = Airplane.objects.create(
+            name="AeroJet-A320",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=self.airplane_type1,
+        )
+        self.flight1 = Flight.objects.create(
+            route=self.route1,
+            airplane=self.airplane1,
+            departure_time=timezone.make_aware(datetime(2025, 1, 12, 9, 0, 0)),
+            arrival_time=timezone.make_aware(datetime(2025, 1, 12, 12, 30, 0)),
+        )
+        self.flight2 = Flight.objects.create(
+            route=self.route1,
+            airplane=self.airplane2,
+            departure_time=timezone.make_aware(datetime(2025, 1, 12, 18, 0, 0)),
+            arrival_time=timezone.make_aware(datetime(2025, 1, 12, 21, 30, 0)),
+        )
+
+    def get_bucket(self):
+        return RouteDailyAvailability.objects.get(
+            route=self.route1,
+            date=self.flight1.departure_time.date(),
+        )
+
+    def test_flights_create_bucket(self):
+        bucket = self.get_bucket()
+        self.assertEqual(bucket.flights_count, 2)
+        self.assertEqual(bucket.capacity, 150 + 180)
+        self.assertEqual(bucket.seats_sold, 0)
+
+    def test_order_updates_seats_sold(self):
+        data = {
+            "tickets": [
+                {"row": 2, "seat": 3, "flight": self.flight1.id},
+                {"row": 2, "seat": 4, "flight": self.flight2.id}
+            ]
+        }
+        res = self.client.post(ORDER_URL, data, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.get_bucket().seats_sold, 2)
+        Order.objects.get(id=res.data["id"]).delete()
+        self.assertEqual(self.get_bucket().seats_sold, 0)
+
+    def test_flight_moved_to_other_day(self):
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight2,
+            order=Order.objects.create(user=self.user),
+        )
+        self.flight2.departure_time = timezone.make_aware(datetime(2025, 1, 13, 9, 0, 0))
+        self.flight2.save()
+        bucket = self.get_bucket()
+        self.assertEqual(bucket.flights_count, 1)
+        self.assertEqual(bucket.seats_sold, 0)
+        moved = RouteDailyAvailability.objects.get(route=self.route1, date=datetime(2025, 1, 13).date())
+        self.assertEqual(moved.seats_sold, 1)
+        self.flight2.delete()
+        self.assertFalse(RouteDailyAvailability.objects.filter(date=datetime(2025, 1, 13).date()).exists())
+
+    def test_ticket_moved_to_other_flight(self):
+        later = Flight.objects.create(
+            route=self.route1,
+            airplane=self.airplane2,
+            departure_time=timezone.make_aware(datetime(2025, 1, 13, 9, 0, 0)),
+            arrival_time=timezone.make_aware(datetime(2025, 1, 13, 12, 30, 0)),
+        )
+        ticket = Ticket.objects.create(row=1, seat=1, flight=self.flight1, order=Order.objects.create(user=self.user))
+        ticket.flight = later
+        ticket.save()
+        self.assertEqual(self.get_bucket().seats_sold, 0)
+        moved = RouteDailyAvailability.objects.get(route=self.route1, date=datetime(2025, 1, 13).date())
+        self.assertEqual(moved.seats_sold, 1)
+        self.flight1.refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual((self.flight1.seats_sold, later.seats_sold), (0, 1))
+        ticket.delete()
+        moved.refresh_from_db()
+        self.assertEqual(moved.seats_sold, 0)
+
+    def test_ticket_not_moved_to_sold_out_flight(self):
+        ticket = Ticket.objects.create(row=1, seat=1, flight=self.flight1, order=Order.objects.create(user=self.user))
+        Flight.objects.filter(id=self.flight2.id).update(seats_sold=F("capacity"))
+        ticket.flight = self.flight2
+        with self.assertRaises(ValidationError):
+            ticket.save()
+        self.assertEqual(Ticket.objects.get(id=ticket.id).flight_id, self.flight1.id)
+        self.assertEqual(self.get_bucket().seats_sold, 1)
+
+    def test_refresh_command(self):
+        RouteDailyAvailability.objects.all().delete()
+        Ticket.objects.bulk_create([
+            Ticket(row=1, seat=1, flight=self.flight1, order=Order.objects.create(user=self.user)),
+        ])
+        call_command("refresh_availability", stdout=StringIO())
+        bucket = self.get_bucket()
+        self.assertEqual(bucket.flights_count, 2)
+        self.assertEqual(bucket.seats_sold, 1)
+        self.assertEqual(bucket.seats_available, 329)
+
+    def test_invalid_filters(self):
+        for params in ({"route": "abc"}, {"date": "bad"}):
+            res = self.client.get(AVAILABILITY_URL, params)
+            self.assertEqual(res.status_code, 400, params)
+            self.assertIn(next(iter(params)), res.data)
+
+    def test_get_with_filter(self):
+        res = self.client.get(AVAILABILITY_URL, {"date": "2025-01-12", "source": "Kyiv"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["seats_available"], 330)
+        res = self.client.get(AVAILABILITY_URL, {"date": "2025-01-13"})
+        self.assertEqual(len(res.data["results"]), 0)
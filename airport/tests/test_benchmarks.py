@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from airport.models import Flight, FlightFare, Ticket
+from airport.datagen import SCALES, generate
+from benchmarks import runner
+
+
+class BenchmarkHelpersTests(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(runner.percentile(values, 50), 51)
+        self.assertEqual(runner.percentile(values, 99), 99)
+        self.assertEqual(runner.percentile([], 95), 0.0)
+
+    def test_compare(self):
+        base = {"results": {"flight_list": {
+            "throughput_rps": 100.0,
+            "latency_ms": {"p50": 10.0, "p95": 20.0, "p99": 40.0},
+            "queries_per_request": 4.0,
+        }}}
+        new = {"results": {"flight_list": {
+            "throughput_rps": 150.0,
+            "latency_ms": {"p50": 5.0, "p95": 20.0, "p99": 40.0},
+            "queries_per_request": 2.0,
+        }}}
+        rows = {(row[0], row[1]): row[4] for row in runner.compare(base, new)}
+        self.assertEqual(rows["flight_list", "throughput_rps"], 50.0)
+        self.assertEqual(rows["flight_list", "p50_ms"], -50.0)
+        self.assertEqual(rows["flight_list", "queries_per_request"], -50.0)
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_CLASSES": []})
+class BenchmarkRunTests(TransactionTestCase):
+    def test_run_in_process(self):
+        generate(email_prefix=runner.BENCH_EMAIL_PREFIX, **SCALES["tiny"])
+        self.assertGreater(Ticket.objects.count(), 0)
+        user = get_user_model().objects.get(email=runner.BENCH_EMAIL)
+        targets = {
+            "flights": list(Flight.objects.values_list("id", "airplane__rows", "airplane__seats_in_row")),
+            "flight_pages": 2,
+        }
+        results = runner.run(
+            lambda: runner.ClientTransport(user),
+            targets,
+            requests=4,
+            concurrency=2,
+        )
+        self.assertEqual(set(results), set(runner.SCENARIOS))
+        self.assertEqual(results["flight_list"]["statuses"], {"200": 4})
+        self.assertEqual(results["order_list"]["requests"], 4)
+        self.assertGreater(results["flight_retrieve"]["queries_per_request"], 0)
+
+    def test_pricing_measure(self):
+        from benchmarks.pricing import measure
+
+        result = measure(flights=40, chunk_size=15)
+        self.assertEqual(result["flights"], 40)
+        self.assertEqual(result["cold"]["updated"], 40)
+        self.assertEqual(result["warm"]["updated"], 0)
+        self.assertEqual(FlightFare.objects.count(), 40)
+
+
+class EncodingBenchmarkTests(TestCase):
+    def test_measure(self):
+        from benchmarks.encoding import measure
+
+        result = measure(sizes=[1_000, 20_000], min_seconds=0)
+        self.assertEqual([row["target_bytes"] for row in result["sizes"]], [1_000, 20_000])
+        large = result["sizes"][1]
+        self.assertGreaterEqual(large["bytes"], 19_000)
+        self.assertGreater(large["compression"]["gzip"]["ratio"], 1)
+        self.assertEqual(set(large["render_ms"]), {"stdlib", "fast"})
+        self.assertLess(large["layouts"]["table"], large["bytes"])
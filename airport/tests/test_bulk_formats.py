@@ -0,0 +1,81 @@
+import json
+from datetime import datetime
+from unittest import skipUnless
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            AirplaneType,
+                            Airplane)
+from airport_service.renderers import msgpack, to_table
+from django.core.cache import cache
+
+FLIGHT_URL = reverse("airport:flights-list")
+ROUTE_URL = reverse("airport:routes-list")
+TABLE = "application/vnd.airport.table+json"
+
+
+class BulkFormatTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        airport1 = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        airport2 = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        self.route = Route.objects.create(source=airport1, destination=airport2, distance=2400)
+        airplane_type = AirplaneType.objects.create(name="Boeing 737")
+        for day in (12, 13):
+            Flight.objects.create(
+                route=self.route,
+                airplane=Airplane.objects.create(name=f"SkyBird-{day}", rows=25, seats_in_row=6, airplane_type=airplane_type),
+                departure_time=timezone.make_aware(datetime(2025, 1, day, 9, 0, 0)),
+                arrival_time=timezone.make_aware(datetime(2025, 1, day, 12, 30, 0)),
+            )
+
+    def test_flight_list_as_table(self):
+        rows = self.client.get(FLIGHT_URL).data["results"]
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT=TABLE)
+        self.assertEqual(res["Content-Type"], TABLE)
+        table = json.loads(res.content)
+        self.assertEqual(table["count"], 2)
+        self.assertNotIn("results", table)
+        self.assertEqual(table["columns"], list(rows[0]))
+        self.assertEqual([dict(zip(table["columns"], row)) for row in table["rows"]], json.loads(json.dumps(rows)))
+
+    def test_route_list_format_parameter(self):
+        table = json.loads(self.client.get(ROUTE_URL, {"format": "table"}).content)
+        self.assertEqual(table["rows"][0][table["columns"].index("distance")], 2400)
+
+    def test_empty_page_keeps_columns(self):
+        table = json.loads(self.client.get(FLIGHT_URL, {"format": "table", "departure_time": "2030-01-01"}).content)
+        self.assertEqual(table["rows"], [])
+        self.assertIn("tickets_available", table["columns"])
+
+    def test_objects_and_errors_unchanged(self):
+        flight = Flight.objects.first()
+        res = self.client.get(reverse("airport:flights-detail", args=[flight.id]), HTTP_ACCEPT=TABLE)
+        self.assertEqual(json.loads(res.content)["id"], flight.id)
+        self.assertEqual(to_table({"detail": "Not found."}), {"detail": "Not found."})
+        self.assertEqual(to_table([{"id": 1}, {"id": 2}]), {"columns": ["id"], "rows": [[1], [2]]})
+
+    @skipUnless(msgpack, "msgpack is not installed")
+    def test_msgpack(self):
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT="application/vnd.airport.table+msgpack")
+        table = msgpack.unpackb(res.content)
+        self.assertEqual(table["rows"], json.loads(self.client.get(FLIGHT_URL, HTTP_ACCEPT=TABLE).content)["rows"])
+        res = self.client.get(ROUTE_URL, {"format": "msgpack"})
+        self.assertEqual(msgpack.unpackb(res.content)["results"][0]["distance"], 2400)
+
+    @skipUnless(msgpack is None, "msgpack is installed")
+    def test_msgpack_not_offered_without_package(self):
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(res.status_code, 406)
@@ -0,0 +1,82 @@
+import gzip
+import io
+import json
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from airport_service import compression, parsers, renderers
+from airport_service.compression import CompressionMiddleware, choose_coding
+
+BODY = json.dumps([{"id": index, "name": "SkyBird"} for index in range(200)]).encode()
+
+
+class CompressionMiddlewareTests(TestCase):
+    def respond(self, body=BODY, content_type="application/json", **headers):
+        response = HttpResponse(body, content_type=content_type)
+        response["ETag"] = '"abc"'
+        request = RequestFactory().get("/airport/flights/", **headers)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_gzip(self):
+        res = self.respond(HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content), BODY)
+        self.assertEqual(res["Content-Length"], str(len(res.content)))
+        self.assertEqual(res["ETag"], 'W/"abc"')
+        self.assertEqual(res["Vary"], "Accept-Encoding")
+
+    def test_passes_through(self):
+        self.assertFalse(self.respond().has_header("Content-Encoding"))
+        self.assertFalse(self.respond(HTTP_ACCEPT_ENCODING="gzip;q=0").has_header("Content-Encoding"))
+        self.assertFalse(self.respond(content_type="image/webp", HTTP_ACCEPT_ENCODING="gzip").has_header("Content-Encoding"))
+        with override_settings(COMPRESSION_MIN_SIZE=len(BODY) + 1):
+            res = self.respond(HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(res.content, BODY)
+        self.assertEqual(res["Vary"], "Accept-Encoding")
+
+    def test_choose_coding(self):
+        codings = {"gzip": gzip.compress, "br": bytes, "zstd": bytes}
+        with mock.patch.dict(compression.CODINGS, codings):
+            self.assertEqual(choose_coding("gzip, br, zstd"), "br")
+            self.assertEqual(choose_coding("gzip, br;q=0.5"), "gzip")
+            self.assertEqual(choose_coding("*"), "br")
+            self.assertEqual(choose_coding("identity"), None)
+            self.assertEqual(choose_coding(""), None)
+
+
+class FastJSONTests(TestCase):
+    data = {
+        "id": 1,
+        "name": "Kyiv Boryspil",
+        "departure_time": datetime(2025, 1, 12, 9, 0, tzinfo=dt_timezone.utc),
+        "fare": Decimal("129.90"),
+        "error": gettext_lazy("This field is required."),
+        "seats": {1: [1, 2]},
+        "tickets": ({"row": 1, "seat": 2},),
+    }
+
+    def test_renders_like_drf(self):
+        self.assertIsNotNone(renderers.orjson)
+        self.assertEqual(renderers.FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        indented = renderers.FastJSONRenderer().render(self.data, "application/json; indent=4")
+        self.assertEqual(indented, JSONRenderer().render(self.data, "application/json; indent=4"))
+        huge = {"id": 2 ** 70}
+        self.assertEqual(renderers.FastJSONRenderer().render(huge), JSONRenderer().render(huge))
+
+    def test_parses_like_drf(self):
+        body = JSONRenderer().render({"tickets": [{"row": 1, "seat": 2, "flight": 3}]})
+        self.assertEqual(parsers.FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        with self.assertRaises(ParseError):
+            parsers.FastJSONParser().parse(io.BytesIO(b"{"))
+
+    def test_fallback_without_orjson(self):
+        with mock.patch.object(renderers, "orjson", None), mock.patch.object(parsers, "orjson", None):
+            self.assertEqual(renderers.FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+            self.assertEqual(parsers.FastJSONParser().parse(io.BytesIO(b'{"id": 1}')), {"id": 1})
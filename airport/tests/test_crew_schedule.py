@@ -0,0 +1,140 @@
+from datetime import datetime
+from io import StringIO
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport.crew_schedule import conflicts
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            Crew,
+                            CrewAssignment,
+                            AirplaneType,
+                            Airplane)
+from django.core.cache import cache
+
+FLIGHT_URL = reverse("airport:flights-list")
+
+
+def at(day, hour):
+    return timezone.make_aware(datetime(2025, 1, day, hour, 0, 0))
+
+
+def schedule_url(crew_id):
+    return reverse("airport:crew-schedule", args=[crew_id])
+
+
+class CrewScheduleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_superuser(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        airport1 = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        airport2 = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        self.route = Route.objects.create(source=airport1, destination=airport2, distance=2400)
+        self.airplane_type = AirplaneType.objects.create(name="Boeing 737")
+        self.pilot = Crew.objects.create(first_name="John", last_name="Walker")
+        self.attendant = Crew.objects.create(first_name="Anna", last_name="Smith")
+        self.flight = self.create_flight(at(12, 9), at(12, 12))
+        self.flight.crew.add(self.pilot, self.attendant)
+
+    def create_airplane(self):
+        return Airplane.objects.create(
+            name="SkyBird-737",
+            rows=25,
+            seats_in_row=6,
+            airplane_type=self.airplane_type,
+        )
+
+    def create_flight(self, departure, arrival):
+        return Flight.objects.create(
+            route=self.route,
+            airplane=self.create_airplane(),
+            departure_time=departure,
+            arrival_time=arrival,
+        )
+
+    def payload(self, departure, arrival, crew):
+        return {
+            "route": self.route.id,
+            "airplane": self.create_airplane().id,
+            "departure_time": departure.isoformat(),
+            "arrival_time": arrival.isoformat(),
+            "crew": [member.id for member in crew],
+        }
+
+    def test_m2m_changes_update_index(self):
+        self.assertEqual(CrewAssignment.objects.count(), 2)
+        self.flight.crew.remove(self.attendant)
+        self.assertEqual(list(CrewAssignment.objects.values_list("crew_id", flat=True)), [self.pilot.id])
+        self.attendant.flight_set.add(self.flight)
+        self.assertEqual(CrewAssignment.objects.count(), 2)
+        self.flight.crew.clear()
+        self.assertFalse(CrewAssignment.objects.exists())
+
+    def test_flight_time_change_updates_index(self):
+        self.flight.departure_time = at(13, 9)
+        self.flight.arrival_time = at(13, 12)
+        self.flight.save()
+        self.assertEqual(set(CrewAssignment.objects.values_list("departure_time", flat=True)), {at(13, 9)})
+
+    def test_conflicts(self):
+        later = self.create_flight(at(12, 14), at(12, 16))
+        later.crew.add(self.pilot)
+        self.assertEqual(conflicts([self.pilot.id], at(12, 12), at(12, 14)), [])
+        self.assertEqual([a.flight_id for a in conflicts([self.pilot.id], at(12, 11), at(12, 13))], [self.flight.id])
+        self.assertEqual([a.flight_id for a in conflicts([self.pilot.id], at(12, 8), at(12, 15))], [self.flight.id, later.id])
+        self.assertEqual(conflicts([self.pilot.id], at(12, 10), at(12, 11), exclude_flight_id=self.flight.id), [])
+
+    def test_create_flight_with_busy_crew_rejected(self):
+        res = self.client.post(FLIGHT_URL, self.payload(at(12, 11), at(12, 14), [self.pilot]), format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("John Walker is assigned to flight", res.data["crew"][0])
+        res = self.client.post(FLIGHT_URL, self.payload(at(12, 12), at(12, 14), [self.pilot]), format="json")
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(self.pilot.assignments.count(), 2)
+
+    def test_update_flight_times_checks_current_crew(self):
+        other = self.create_flight(at(12, 14), at(12, 16))
+        other.crew.add(self.attendant)
+        res = self.client.patch(
+            reverse("airport:flights-detail", args=[other.id]),
+            {"departure_time": at(12, 11).isoformat()},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 400)
+        res = self.client.patch(
+            reverse("airport:flights-detail", args=[self.flight.id]),
+            {"departure_time": at(12, 8).isoformat()},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 200)
+
+    def test_schedule_endpoint(self):
+        later = self.create_flight(at(20, 9), at(20, 12))
+        later.crew.add(self.pilot)
+        res = self.client.get(schedule_url(self.pilot.id))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([row["flight"] for row in res.data["results"]], [self.flight.id, later.id])
+        self.assertEqual(res.data["results"][0]["source"], "Kyiv Boryspil")
+        res = self.client.get(schedule_url(self.pilot.id), {"from": "2025-01-13", "to": "2025-01-20"})
+        self.assertEqual([row["flight"] for row in res.data["results"]], [later.id])
+
+    def test_schedule_invalid_dates(self):
+        for params in ({"from": "bad"}, {"to": "2025-02-30"}):
+            res = self.client.get(schedule_url(self.pilot.id), params)
+            self.assertEqual(res.status_code, 400, params)
+            self.assertIn(next(iter(params)), res.data)
+
+    def test_rebuild_command(self):
+        CrewAssignment.objects.all().delete()
+        call_command("rebuild_crew_schedule", stdout=StringIO())
+        self.assertEqual(CrewAssignment.objects.count(), 2)
@@ -0,0 +1,69 @@
+from io import StringIO
+from datetime import date, datetime
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase
+from airport.datagen import generate
+from airport.rotation import LEG_FIELDS, make_leg, validate_schedule
+from airport.models import Airport, Route, Flight, Order, Ticket, RouteDailyAvailability
+
+AS_OF = timezone.make_aware(datetime(2025, 3, 1))
+
+
+def snapshot():
+    first_flight = Flight.objects.order_by("id").first().id
+    return sorted(
+        (flight_id - first_flight, row, seat)
+        for flight_id, row, seat in Ticket.objects.values_list("flight_id", "row", "seat")
+    )
+
+
+class GenerateDataTests(TestCase):
+    def test_generate_counts(self):
+        summary = generate(seed=1, as_of=AS_OF, chunk_size=7)
+        self.assertEqual(summary["users"], get_user_model().objects.count())
+        self.assertEqual(summary["airports"], Airport.objects.count())
+        self.assertEqual(summary["routes"], Route.objects.count())
+        self.assertEqual(summary["flights"], 40)
+        self.assertEqual(summary["orders"], Order.objects.count())
+        self.assertEqual(summary["tickets"], Ticket.objects.count())
+        self.assertGreater(summary["tickets"], 0)
+        self.assertFalse(Route.objects.filter(source=F("destination")).exists())
+        self.assertEqual(
+            sum(RouteDailyAvailability.objects.values_list("seats_sold", flat=True)),
+            summary["tickets"],
+        )
+
+    def test_generated_rotations_are_valid(self):
+        generate(seed=2, as_of=AS_OF, airplanes=3, flights=60)
+        legs = [make_leg(*row) for row in Flight.objects.values_list(*LEG_FIELDS)]
+        for leg in legs:
+            leg["id"] = None
+        Flight.objects.all().delete()
+        self.assertEqual(validate_schedule(legs), [])
+
+    def test_generated_tickets_are_priced(self):
+        summary = generate(seed=4, as_of=AS_OF)
+        self.assertGreater(summary["tickets"], 0)
+        self.assertFalse(Ticket.objects.filter(price__isnull=True).exists())
+        self.assertGreater(Ticket.objects.values("price").distinct().count(), 1)
+
+    def test_generate_is_deterministic(self):
+        generate(seed=3, as_of=AS_OF, start_date=date(2025, 2, 1))
+        first = snapshot()
+        for model in (Ticket, Order, Flight, Route, Airport):
+            model.objects.all().delete()
+        get_user_model().objects.all().delete()
+        generate(seed=3, as_of=AS_OF, start_date=date(2025, 2, 1))
+        self.assertEqual(first, snapshot())
+
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            "generate_data", "--scale=tiny", "--flights=10", "--as-of=2025-03-01", stdout=out,
+        )
+        self.assertEqual(Flight.objects.count(), 10)
+        self.assertIn("Generated", out.getvalue())
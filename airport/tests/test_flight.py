@@ -1,7 +1,7 @@
 from datetime import datetime
 from django.utils import timezone
 
-from django.db.models import Count, F
+from django.db.models import F
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
@@ -22,10 +22,7 @@ class FlightAdminTests(TestCase):
             .select_related("route", "airplane", "route__source", "route__destination")
             .prefetch_related("crew")
             .annotate(
-                tickets_available=(
-                        F("airplane__rows") * F("airplane__seats_in_row")
-                        - Count("tickets")
-                )
+                tickets_available=F("capacity") - F("seats_sold")
             )
             .order_by("id")
         )
@@ -91,16 +88,16 @@ class FlightAdminTests(TestCase):
 
     def test_post_admin(self):
         data = {
-            "route": self.route2.id,
+            "route": self.route1.id,
             "airplane": self.airplane2.id,
-            "departure_time": timezone.make_aware(datetime(2025, 1, 13, 14, 0, 0)),
-            "arrival_time": timezone.make_aware(datetime(2025, 1, 13, 15, 30, 0)),
+            "departure_time": timezone.make_aware(datetime(2025, 1, 14, 14, 0, 0)),
+            "arrival_time": timezone.make_aware(datetime(2025, 1, 14, 15, 30, 0)),
             "crew": [self.crew1.id, self.crew2.id],
         }
         res = self.client.post(FLIGHT_URL, data)
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
         data_filter = {
-            "route": self.route2,
+            "route": self.route1,
             "airplane": self.airplane2,
             "departure_time": data["departure_time"],
             "arrival_time": data["arrival_time"],
@@ -134,10 +131,7 @@ class FlightAuthenticatedUserTests(TestCase):
             .select_related("route", "airplane", "route__source", "route__destination")
             .prefetch_related("crew")
             .annotate(
-                tickets_available=(
-                        F("airplane__rows") * F("airplane__seats_in_row")
-                        - Count("tickets")
-                )
+                tickets_available=F("capacity") - F("seats_sold")
             )
             .order_by("id")
         )
@@ -0,0 +1,105 @@
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport import geo
+from airport.models import Airport, Route
+from django.core.cache import cache
+
+ROUTE_URL = reverse("airport:routes-list")
+
+
+def nearby_url(airport_id):
+    return reverse("airport:airports-nearby", args=[airport_id])
+
+
+class GeoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_superuser(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.boryspil = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv", latitude=50.345, longitude=30.8947)
+        self.zhuliany = Airport.objects.create(name="Kyiv Zhuliany", closest_big_city="Kyiv", latitude=50.4017, longitude=30.4497)
+        self.chopin = Airport.objects.create(name="Warsaw Chopin", closest_big_city="Warsaw", latitude=52.1657, longitude=20.9671)
+        self.el_prat = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona", latitude=41.2971, longitude=2.0785)
+        self.route = Route.objects.create(source=self.boryspil, destination=self.el_prat, distance=1)
+
+    def test_great_circle_km(self):
+        self.assertAlmostEqual(geo.great_circle_km(50.345, 30.8947, 52.1657, 20.9671), 719, delta=2)
+        self.assertAlmostEqual(geo.great_circle_km(0, 179.5, 0, -179.5), 111.2, delta=0.1)
+
+    def test_recompute_distances(self):
+        result = geo.recompute_distances(check=True)
+        self.assertEqual(result["mismatches"], [(self.route.id, 1, 2429)])
+        self.route.refresh_from_db()
+        self.assertEqual(self.route.distance, 1)
+        self.assertEqual(geo.recompute_distances()["updated"], 1)
+        self.route.refresh_from_db()
+        self.assertEqual(self.route.distance, 2429)
+
+    def test_check_command_reports_mismatches(self):
+        stderr = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("compute_route_distances", "--check", stdout=StringIO(), stderr=stderr)
+        self.assertIn(f"route {self.route.id}: 1 km, computed 2429 km", stderr.getvalue())
+        call_command("compute_route_distances", "--check", "--tolerance", "1", stdout=StringIO())
+
+    def test_route_distance_filled_from_coordinates(self):
+        res = self.client.post(ROUTE_URL, {"source": self.chopin.id, "destination": self.el_prat.id})
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data["distance"], 1870)
+        no_coordinates = Airport.objects.create(name="Lviv", closest_big_city="Lviv")
+        res = self.client.post(ROUTE_URL, {"source": self.chopin.id, "destination": no_coordinates.id})
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("distance", res.data)
+
+    def test_moving_airport_updates_its_routes(self):
+        self.el_prat.latitude, self.el_prat.longitude = 52.1657, 20.9671
+        self.el_prat.save()
+        self.route.refresh_from_db()
+        self.assertEqual(self.route.distance, 719)
+
+    def test_nearby(self):
+        res = self.client.get(nearby_url(self.boryspil.id), {"radius": 800})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([row["name"] for row in res.data], ["Kyiv Zhuliany", "Warsaw Chopin"])
+        self.assertEqual(res.data[0]["distance"], 32.2)
+        res = self.client.get(nearby_url(self.boryspil.id), {"radius": 20})
+        self.assertEqual(res.data, [])
+
+    def test_nearby_invalid_parameters(self):
+        for params in ({"radius": "far"}, {"radius": "inf"}, {"radius": -1}, {"limit": "ten"}, {"limit": -1}):
+            res = self.client.get(nearby_url(self.boryspil.id), params)
+            self.assertEqual(res.status_code, 400, params)
+            self.assertIn(next(iter(params)), res.data)
+
+    def test_grid_follows_airport_changes(self):
+        self.assertEqual(len(geo.nearby_airports(41.3, 2.08, 50)), 1)
+        Airport.objects.create(name="Girona", closest_big_city="Girona", latitude=41.901, longitude=2.7606)
+        self.assertEqual(len(geo.nearby_airports(41.3, 2.08, 100)), 2)
+
+    def test_grid_across_antimeridian_and_pole(self):
+        grid = geo.AirportGrid([(1, 0.0, 179.9), (2, 0.0, -179.9), (3, 89.9, 0.0), (4, 89.9, 180.0)])
+        self.assertEqual([airport_id for _, airport_id in grid.nearby(0.0, 179.95, 50)], [1, 2])
+        self.assertEqual(sorted(airport_id for _, airport_id in grid.nearby(89.5, 90.0, 100)), [3, 4])
+
+    def test_load_airports_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as airports:
+            airports.write("name,closest_big_city,latitude,longitude\n")
+            airports.write("Barcelona El Prat,Barcelona,52.1657,20.9671\n")
+            airports.write("Girona,Girona,41.901,2.7606\n")
+            airports.flush()
+            out = StringIO()
+            call_command("load_airports", airports.name, stdout=out)
+        self.assertIn("Created 1 and updated 1 airports, 1 route distances changed.", out.getvalue())
+        self.route.refresh_from_db()
+        self.assertEqual(self.route.distance, 719)
+        self.assertEqual(len(geo.nearby_airports(41.9, 2.76, 10)), 1)
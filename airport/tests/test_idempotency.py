@@ -0,0 +1,135 @@
+import threading
+from datetime import datetime, timedelta
+from io import StringIO
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            AirplaneType,
+                            Airplane,
+                            IdempotencyKey,
+                            Order)
+from django.core.cache import cache
+
+ORDER_URL = reverse("airport:orders-list")
+ALLOCATE_URL = reverse("airport:orders-allocate")
+
+
+def create_flight():
+    airport1 = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+    airport2 = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+    return Flight.objects.create(
+        route=Route.objects.create(source=airport1, destination=airport2, distance=2400),
+        airplane=Airplane.objects.create(
+            name="SkyBird-737",
+            rows=25,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Boeing 737"),
+        ),
+        departure_time=timezone.make_aware(datetime(2025, 1, 12, 9, 0, 0)),
+        arrival_time=timezone.make_aware(datetime(2025, 1, 12, 12, 30, 0)),
+    )
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.flight = create_flight()
+        self.payload = {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]}
+
+    def post(self, payload, key="key-1", url=ORDER_URL):
+        return self.client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_first_response(self):
+        first = self.post(self.payload)
+        self.assertEqual(first.status_code, 201)
+        with self.assertNumQueries(7):
+            retry = self.post(self.payload)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_allocate_retry_replays_first_response(self):
+        payload = {"flight": self.flight.id, "passengers": 2}
+        first = self.post(payload, url=ALLOCATE_URL)
+        retry = self.post(payload, url=ALLOCATE_URL)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_for_other_request(self):
+        self.post(self.payload)
+        res = self.post({"tickets": [{"row": 2, "seat": 1, "flight": self.flight.id}]})
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_request_is_not_stored(self):
+        invalid = {"tickets": [{"row": 100, "seat": 1, "flight": self.flight.id}]}
+        self.assertEqual(self.post(invalid).status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.post(self.payload).status_code, 201)
+
+    def test_keys_are_per_user(self):
+        self.post(self.payload)
+        other = get_user_model().objects.create_user(email="other@gmail.com", password="ASDasfsfgwe$123")
+        self.client.force_authenticate(user=other)
+        payload = {"tickets": [{"row": 3, "seat": 1, "flight": self.flight.id}]}
+        self.assertEqual(self.post(payload).status_code, 201)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_expired_key_runs_again(self):
+        self.post(self.payload)
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        payload = {"tickets": [{"row": 4, "seat": 1, "flight": self.flight.id}]}
+        self.assertEqual(self.post(payload).status_code, 201)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_purge_command(self):
+        self.post(self.payload)
+        self.post({"tickets": [{"row": 2, "seat": 1, "flight": self.flight.id}]}, key="key-2")
+        IdempotencyKey.objects.filter(key="key-1").update(created_at=timezone.now() - timedelta(days=2))
+        call_command("purge_idempotency_keys", stdout=StringIO())
+        self.assertEqual(list(IdempotencyKey.objects.values_list("key", flat=True)), ["key-2"])
+
+
+@skipUnlessDBFeature("test_db_allows_multiple_connections")
+class ConcurrentIdempotencyKeyTests(TransactionTestCase):
+    """Runs in the test-postgres CI job."""
+
+    def test_simultaneous_duplicates_create_one_order(self):
+        user = get_user_model().objects.create_user(email="test@gmail.com", password="ASDasfsfgwe$123")
+        flight = create_flight()
+        payload = {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]}
+        barrier = threading.Barrier(4)
+        statuses = []
+
+        def send():
+            client = APIClient()
+            client.force_authenticate(user=user)
+            barrier.wait()
+            try:
+                res = client.post(ORDER_URL, payload, format="json", HTTP_IDEMPOTENCY_KEY="same")
+                statuses.append(res.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=send) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(statuses, [201] * 4)
+        self.assertEqual(Order.objects.count(), 1)
@@ -0,0 +1,111 @@
+from datetime import datetime
+from io import StringIO
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport.inventory import reserve
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            AirplaneType,
+                            Airplane,
+                            Order,
+                            Ticket)
+from django.core.cache import cache
+
+ORDER_URL = reverse("airport:orders-list")
+
+
+class InventoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        airport1 = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        airport2 = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        route = Route.objects.create(source=airport1, destination=airport2, distance=2400)
+        airplane_type = AirplaneType.objects.create(name="Boeing 737")
+        self.airplane = Airplane.objects.create(
+            name="SkyBird-737", rows=2, seats_in_row=2, airplane_type=airplane_type,
+        )
+        self.small_airplane = Airplane.objects.create(
+            name="Tiny", rows=1, seats_in_row=3, airplane_type=airplane_type,
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=timezone.make_aware(datetime(2025, 1, 12, 9, 0, 0)),
+            arrival_time=timezone.make_aware(datetime(2025, 1, 12, 12, 30, 0)),
+        )
+        self.order = Order.objects.create(user=self.user)
+
+    def test_capacity_copied_from_airplane(self):
+        self.assertEqual(self.flight.capacity, 4)
+
+    def test_ticket_counts_sold_seat_and_delete_releases_it(self):
+        ticket = Ticket.objects.create(row=1, seat=1, flight=self.flight, order=self.order)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 1)
+        ticket.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 0)
+
+    def test_reserve_is_conditional(self):
+        self.assertTrue(reserve(self.flight.id, 3))
+        self.assertFalse(reserve(self.flight.id, 2))
+        self.assertTrue(reserve(self.flight.id, 1))
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 4)
+
+    def test_order_rejected_when_sold_out(self):
+        Flight.objects.filter(id=self.flight.id).update(seats_sold=4)
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("sold out", str(res.data))
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_flight_save_keeps_concurrent_seats_sold(self):
+        Flight.objects.filter(id=self.flight.id).update(seats_sold=3)
+        self.flight.save()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_sold, 3)
+
+    def test_airplane_swap_remaps_and_flags_tickets(self):
+        for row, seat in ((1, 1), (2, 1), (2, 2), (1, 2)):
+            Ticket.objects.create(row=row, seat=seat, flight=self.flight, order=self.order)
+        self.flight.airplane = self.small_airplane
+        self.flight.save()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.capacity, 3)
+        self.assertEqual(self.flight.seats_sold, 4)
+        seats = set(Ticket.objects.filter(needs_reseat=False).values_list("row", "seat"))
+        self.assertEqual(seats, {(1, 1), (1, 2), (1, 3)})
+        self.assertEqual(Ticket.objects.filter(needs_reseat=True).count(), 1)
+        self.assertFalse(reserve(self.flight.id, 1))
+
+    def test_airplane_resize_updates_flights(self):
+        Ticket.objects.create(row=2, seat=2, flight=self.flight, order=self.order)
+        self.airplane.rows = 1
+        self.airplane.save()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.capacity, 2)
+        self.assertEqual(list(Ticket.objects.values_list("row", "seat")), [(1, 1)])
+
+    def test_refresh_availability_recounts(self):
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=self.order)
+        Flight.objects.update(capacity=0, seats_sold=0)
+        call_command("refresh_availability", stdout=StringIO())
+        self.flight.refresh_from_db()
+        self.assertEqual((self.flight.capacity, self.flight.seats_sold), (4, 1))
@@ -0,0 +1,144 @@
+from io import StringIO
+from datetime import datetime, timedelta
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from airport.jobs import claim_jobs, enqueue, queue_stats, run_job, schedule_periodic, task
+from airport.models import Airport, Route, Flight, AirplaneType, Airplane, Job, FlightFare
+from django.core.cache import cache
+
+ORDER_URL = reverse("airport:orders-list")
+JOB_ADMIN_URL = reverse("admin:airport_job_changelist")
+
+
+@task("test_failing")
+def failing_task():
+    raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.airport1 = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        self.airport2 = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        self.route1 = Route.objects.create(
+            source=self.airport1,
+            destination=self.airport2,
+            distance=2400,
+        )
+        self.airplane_type1 = AirplaneType.objects.create(name="Boeing 737")
+        self.airplane1 = Airplane.objects.create(
+            name="SkyBird-737",
+            rows=25,
+            seats_in_row=6,
+            airplane_type=self.airplane_type1,
+        )
+        self.flight1 = Flight.objects.create(
+            route=self.route1,
+            airplane=self.airplane1,
+            departure_time=timezone.make_aware(datetime(2025, 1, 12, 9, 0, 0)),
+            arrival_time=timezone.make_aware(datetime(2025, 1, 12, 12, 30, 0)),
+        )
+
+    def test_order_enqueues_confirmation_after_commit(self):
+        data = {"tickets": [{"row": 2, "seat": 3, "flight": self.flight1.id}]}
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(ORDER_URL, data, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        job = Job.objects.get()
+        self.assertEqual(job.name, "order_confirmation")
+        self.assertEqual(job.payload, {"order_id": res.data["id"]})
+
+        call_command("run_jobs", "--once", "--workers=1", stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+
+    def test_failed_order_enqueues_nothing(self):
+        data = {"tickets": [{"row": 100, "seat": 3, "flight": self.flight1.id}]}
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(ORDER_URL, data, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+
+    def test_retry_then_fail(self):
+        job = enqueue("test_failing", max_attempts=2)
+        (claimed,) = claim_jobs(10, visibility_timeout=60)
+        run_job(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.PENDING)
+        self.assertIn("boom", job.last_error)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertEqual(claim_jobs(10, visibility_timeout=60), [])
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        (claimed,) = claim_jobs(10, visibility_timeout=60)
+        run_job(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_visibility_timeout(self):
+        job = enqueue("test_failing")
+        self.assertEqual(len(claim_jobs(10, visibility_timeout=60)), 1)
+        self.assertEqual(claim_jobs(10, visibility_timeout=60), [])
+        Job.objects.filter(id=job.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        (claimed,) = claim_jobs(10, visibility_timeout=60)
+        self.assertEqual(claimed.attempts, 2)
+
+    def test_job_killing_its_worker_fails_after_max_attempts(self):
+        job = enqueue("test_failing", max_attempts=2)
+        for _ in range(2):
+            (claimed,) = claim_jobs(10, visibility_timeout=60)
+            # The worker dies without recording anything.
+            Job.objects.filter(id=job.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(claim_jobs(10, visibility_timeout=60), [])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+        self.assertIsNone(job.locked_until)
+
+    def test_oldest_pending_age_counts_from_run_at(self):
+        job = enqueue("test_failing")
+        Job.objects.filter(id=job.id).update(created_at=timezone.now() - timedelta(hours=5),
+                                             run_at=timezone.now() - timedelta(minutes=1))
+        age = queue_stats()["oldest_pending_age"]
+        self.assertLess(age, timedelta(minutes=2))
+
+    def test_fares_recomputed_periodically(self):
+        (job,) = schedule_periodic()
+        self.assertEqual(job.name, "recompute_fares")
+        self.assertEqual(schedule_periodic(), [])
+        self.flight1.departure_time = timezone.now() + timedelta(days=90)
+        Flight.objects.filter(id=self.flight1.id).update(departure_time=self.flight1.departure_time)
+        call_command("run_jobs", "--once", "--workers=1", stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(FlightFare.objects.get(flight=self.flight1).days_bucket, 0)
+        (next_run,) = Job.objects.filter(name="recompute_fares", status=Job.Status.PENDING)
+        self.assertEqual(next_run.run_at, job.run_at + timedelta(seconds=3600))
+
+    def test_admin_shows_queue_stats(self):
+        enqueue("test_failing")
+        admin = get_user_model().objects.create_superuser(
+            email="admin@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client.force_login(admin)
+        res = self.client.get(JOB_ADMIN_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.context["queue_stats"]["depth"], 1)
+        self.assertContains(res, "Depth (pending)")
@@ -0,0 +1,93 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport.localtime import fill_local_dates
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            AirplaneType,
+                            Airplane,
+                            RouteDailyAvailability)
+from airport.rotation import import_schedule
+from django.core.cache import cache
+
+AIRPORT_URL = reverse("airport:airports-list")
+FLIGHT_URL = reverse("airport:flights-list")
+
+
+def utc(day, hour, minute=0):
+    return datetime(2025, 1, day, hour, minute, tzinfo=dt_timezone.utc)
+
+
+class LocalDatesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_superuser(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.kyiv = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv", timezone="Europe/Kyiv")
+        self.barcelona = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona", timezone="Europe/Madrid")
+        self.route = Route.objects.create(source=self.kyiv, destination=self.barcelona, distance=2400)
+        self.airplane = Airplane.objects.create(
+            name="SkyBird-737",
+            rows=25,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Boeing 737"),
+        )
+        # 01:30 on Jan 13 in Kyiv, 23:30 on Jan 13 in Barcelona.
+        self.flight = Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=utc(12, 23, 30),
+            arrival_time=utc(13, 22, 30),
+        )
+
+    def test_local_dates_filled_on_save(self):
+        self.assertEqual((self.flight.departure_date, self.flight.arrival_date), (date(2025, 1, 13), date(2025, 1, 13)))
+        self.flight.arrival_time = utc(13, 23, 30)
+        self.flight.save()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.arrival_date, date(2025, 1, 14))
+
+    def test_flight_list_filters_by_local_day(self):
+        res = self.client.get(FLIGHT_URL, {"departure_time": "2025-01-13"})
+        self.assertEqual([flight["id"] for flight in res.data["results"]], [self.flight.id])
+        self.assertEqual(res.data["results"][0]["departure_local_time"], "2025-01-13T01:30:00+02:00")
+        self.assertEqual(res.data["results"][0]["arrival_local_time"], "2025-01-13T23:30:00+01:00")
+        res = self.client.get(FLIGHT_URL, {"departure_time": "2025-01-12"})
+        self.assertEqual(res.data["results"], [])
+
+    def test_availability_bucket_uses_local_day(self):
+        self.assertTrue(RouteDailyAvailability.objects.filter(route=self.route, date=date(2025, 1, 13)).exists())
+
+    def test_timezone_change_moves_flights_and_buckets(self):
+        self.kyiv.timezone = "UTC"
+        self.kyiv.save()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.departure_date, date(2025, 1, 12))
+        self.assertEqual(list(RouteDailyAvailability.objects.values_list("date", flat=True)), [date(2025, 1, 12)])
+
+    def test_unknown_timezone_rejected(self):
+        res = self.client.post(AIRPORT_URL, {"name": "Lviv", "closest_big_city": "Lviv", "timezone": "Europe/Nowhere"})
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("timezone", res.data)
+
+    def test_import_schedule_and_fill(self):
+        other = Airplane.objects.create(name="Other", rows=10, seats_in_row=4, airplane_type=self.airplane.airplane_type)
+        created, errors = import_schedule([
+            {"route": self.route.id, "airplane": other.id,
+             "departure_time": utc(20, 22, 30), "arrival_time": utc(21, 1)},
+        ])
+        self.assertEqual((created, errors), (1, []))
+        flight = Flight.objects.get(departure_time=utc(20, 22, 30))
+        self.assertEqual((flight.departure_date, flight.arrival_date), (date(2025, 1, 21), date(2025, 1, 21)))
+        Flight.objects.update(departure_date=None, arrival_date=None)
+        self.assertEqual(fill_local_dates(Flight.objects.all()), 2)
+        self.assertEqual(fill_local_dates(Flight.objects.all()), 0)
+        self.assertFalse(Flight.objects.filter(departure_date__isnull=True).exists())
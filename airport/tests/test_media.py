@@ -0,0 +1,71 @@
+import tempfile
+from pathlib import Path
+
+from django.http import Http404
+from django.test import TestCase, RequestFactory, override_settings
+from airport_service.media import serve_media
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SERVE_MODE="django")
+class ServeMediaTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.path = "upload-image/skybird-737.jpg"
+        self.content = bytes(range(256)) * 4
+        full_path = Path(MEDIA_ROOT) / self.path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_bytes(self.content)
+
+    def get(self, **headers):
+        request = self.factory.get(f"/media/{self.path}", headers=headers)
+        return serve_media(request, self.path)
+
+    def test_full_file_with_cache_headers(self):
+        res = self.get()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), self.content)
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+        self.assertIn("immutable", res["Cache-Control"])
+        self.assertEqual(res["Accept-Ranges"], "bytes")
+        self.assertTrue(res["ETag"])
+
+    def test_if_none_match(self):
+        etag = self.get()["ETag"]
+        res = self.get(if_none_match=etag)
+        self.assertEqual(res.status_code, 304)
+
+    def test_if_none_match_list(self):
+        etag = self.get()["ETag"]
+        for header, status in (
+            (f'"other", W/{etag}', 304),
+            (f"W/{etag}", 304),
+            ("*", 304),
+            ('"other"', 200),
+            (etag[:-2] + '"', 200),
+            (f'"x{etag[1:]}', 200),
+        ):
+            res = self.get(if_none_match=header)
+            self.assertEqual(res.status_code, status, header)
+
+    def test_range(self):
+        res = self.get(range="bytes=10-19")
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b"".join(res.streaming_content), self.content[10:20])
+        self.assertEqual(res["Content-Range"], f"bytes 10-19/{len(self.content)}")
+        res = self.get(range="bytes=-4")
+        self.assertEqual(b"".join(res.streaming_content), self.content[-4:])
+        res = self.get(range=f"bytes={len(self.content)}-")
+        self.assertEqual(res.status_code, 416)
+
+    @override_settings(MEDIA_SERVE_MODE="x-accel-redirect")
+    def test_x_accel_redirect(self):
+        res = self.get()
+        self.assertEqual(res["X-Accel-Redirect"], f"/protected-media/{self.path}")
+        self.assertEqual(res.content, b"")
+
+    def test_path_outside_media_root(self):
+        request = self.factory.get("/media/../settings.py")
+        with self.assertRaises(Http404):
+            serve_media(request, "../settings.py")
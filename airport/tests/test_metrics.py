@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport_service.metrics import registry, BUCKETS, MetricsMiddleware
+from django.core.cache import cache
+
+FLIGHT_URL = reverse("airport:flights-list")
+METRICS_URL = reverse("metrics")
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_records_viewset_action(self):
+        self.client.get(FLIGHT_URL)
+        self.client.get(FLIGHT_URL)
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 200)
+        body = res.content.decode()
+        labels = 'view="FlightViewSet.list",method="GET"'
+        self.assertIn(f"airport_http_request_duration_seconds_count{{{labels}}} 2", body)
+        self.assertIn(f'airport_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', body)
+        self.assertIn(f'airport_http_responses_total{{{labels},status="200"}} 2', body)
+        self.assertIn(f"airport_http_db_seconds_total{{{labels}}}", body)
+        self.assertIn(f"airport_http_render_seconds_total{{{labels}}}", body)
+
+    def test_times_queries_on_every_database(self):
+        wrapped = {}
+
+        def get_response(request):
+            wrapped.update({connection.alias: bool(connection.execute_wrappers) for connection in connections.all()})
+            return HttpResponse()
+
+        MetricsMiddleware(get_response)(RequestFactory().get("/"))
+        self.assertEqual(set(wrapped), set(connections))
+        self.assertTrue(all(wrapped.values()))
+
+    def test_forbidden_outside_allowed_ips(self):
+        res = self.client.get(METRICS_URL, REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(res.status_code, 403)
+
+    def test_sums_other_process_dumps(self):
+        with tempfile.TemporaryDirectory() as directory:
+            other = {
+                "requests": [["OrderViewSet.create", "POST", 3, 0.3, 0.1, 0.05]
+                             + [3] + [0] * (len(BUCKETS) - 1)],
+                "statuses": [["OrderViewSet.create", "POST", 201, 3]],
+            }
+            (Path(directory) / "99999.json").write_text(json.dumps(other))
+            with override_settings(METRICS_DIR=directory):
+                self.client.get(FLIGHT_URL)
+                self.assertTrue(list(Path(directory).glob("*.json")))
+                res = self.client.get(METRICS_URL)
+        body = res.content.decode()
+        labels = 'view="OrderViewSet.create",method="POST"'
+        self.assertIn(f"airport_http_request_duration_seconds_count{{{labels}}} 3", body)
+        self.assertIn('view="FlightViewSet.list",method="GET"} 1', body)
+
+    def test_dead_and_reused_pid_dumps_retired(self):
+        dump = {
+            "requests": [["OrderViewSet.create", "POST", 2, 0.2, 0.1, 0.05] + [2] + [0] * (len(BUCKETS) - 1)],
+            "statuses": [["OrderViewSet.create", "POST", 201, 2]],
+        }
+        labels = 'view="OrderViewSet.create",method="POST"'
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            # One from an exited worker, one from an exited process whose pid this one got.
+            (Path(directory) / "99999.json").write_text(json.dumps(dump))
+            (Path(directory) / f"{os.getpid()}.json").write_text(json.dumps(dump))
+            self.client.get(FLIGHT_URL)
+            res = self.client.get(METRICS_URL)
+            self.assertIn(f"airport_http_request_duration_seconds_count{{{labels}}} 4", res.content.decode())
+            self.assertEqual(sorted(path.name for path in Path(directory).glob("*.json")),
+                             sorted([f"{os.getpid()}.json", "retired.json"]))
+            res = self.client.get(METRICS_URL)
+        self.assertIn(f"airport_http_request_duration_seconds_count{{{labels}}} 4", res.content.decode())
@@ -0,0 +1,74 @@
+from datetime import datetime
+from io import StringIO
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport import partitioning
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            AirplaneType,
+                            Airplane,
+                            Ticket)
+from django.core.cache import cache
+
+ORDER_URL = reverse("airport:orders-list")
+
+
+class TicketPartitioningTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        airport1 = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        airport2 = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        self.flight = Flight.objects.create(
+            route=Route.objects.create(source=airport1, destination=airport2, distance=2400),
+            airplane=Airplane.objects.create(
+                name="SkyBird-737",
+                rows=25,
+                seats_in_row=6,
+                airplane_type=AirplaneType.objects.create(name="Boeing 737"),
+            ),
+            departure_time=timezone.make_aware(datetime(2025, 1, 12, 9, 0, 0)),
+            arrival_time=timezone.make_aware(datetime(2025, 1, 12, 12, 30, 0)),
+        )
+
+    def test_sqlite_keeps_single_partition(self):
+        out = StringIO()
+        call_command("partition_tickets", "--partitions", "8", stdout=out)
+        self.assertIn("single partition", out.getvalue())
+        self.assertEqual(partitioning.repartition(8), 1)
+        self.assertEqual(partitioning.partition_count(), 1)
+
+    def test_orders_unchanged_on_single_partition(self):
+        payload = {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]}
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(res.status_code, 201)
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(Ticket.objects.filter(flight=self.flight).count(), 1)
+
+    def test_rebuild_sql_partitions_by_flight(self):
+        statements = partitioning.rebuild_sql(4, connection.ops.quote_name)
+        self.assertIn('CREATE TABLE "airport_ticket_new" (LIKE "airport_ticket" INCLUDING DEFAULTS INCLUDING STORAGE) PARTITION BY HASH ("flight_id")', statements)
+        self.assertIn('ADD CONSTRAINT "airport_ticket_new_pkey" PRIMARY KEY ("id", "flight_id")', statements[1])
+        self.assertIn('UNIQUE ("row", "seat", "flight_id")', statements[1])
+        self.assertIn('CREATE TABLE "airport_ticket_new_p3" PARTITION OF "airport_ticket_new" FOR VALUES WITH (MODULUS 4, REMAINDER 3)', statements)
+        self.assertIn('ALTER TABLE "airport_ticket_new_p3" RENAME TO "airport_ticket_p3"', statements)
+
+    def test_rebuild_sql_plain_table(self):
+        statements = partitioning.rebuild_sql(1, connection.ops.quote_name)
+        self.assertNotIn("PARTITION", " ".join(statements))
+        self.assertIn('PRIMARY KEY ("id")', statements[1])
+        with self.assertRaises(ValueError):
+            partitioning.rebuild_sql(0, connection.ops.quote_name)
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport import geo, pricing
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            FlightFare,
+                            AirplaneType,
+                            Airplane,
+                            Order,
+                            Ticket)
+from django.core.cache import cache
+
+FLIGHT_URL = reverse("airport:flights-list")
+ORDER_URL = reverse("airport:orders-list")
+
+
+class PricingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        airport1 = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        airport2 = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        self.route = Route.objects.create(source=airport1, destination=airport2, distance=2400)
+        self.airplane = Airplane.objects.create(
+            name="SkyBird-737",
+            rows=10,
+            seats_in_row=2,
+            airplane_type=AirplaneType.objects.create(name="Boeing 737"),
+        )
+        self.departure = timezone.now() + timedelta(days=30)
+        self.flight = Flight.objects.create(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=self.departure,
+            arrival_time=self.departure + timedelta(hours=3),
+        )
+
+    def sell(self, count):
+        order = Order.objects.create(user=self.user)
+        sold = Ticket.objects.filter(flight=self.flight).count()
+        for index in range(sold, sold + count):
+            Ticket.objects.create(row=index // 2 + 1, seat=index % 2 + 1, flight=self.flight, order=order)
+
+    def test_buckets(self):
+        self.assertEqual(pricing.load_bucket(0, 20), 0)
+        self.assertEqual(pricing.load_bucket(10, 20), 1)
+        self.assertEqual(pricing.load_bucket(20, 20), 4)
+        now = timezone.now()
+        self.assertEqual(pricing.days_bucket(now + timedelta(days=90), now), 0)
+        self.assertEqual(pricing.days_bucket(now + timedelta(days=3), now), 3)
+        self.assertEqual(pricing.days_bucket(now - timedelta(days=1), now), 4)
+
+    def test_fare_created_with_flight(self):
+        fare = FlightFare.objects.get(flight=self.flight)
+        self.assertEqual(fare.price, Decimal("222.00"))
+        self.assertEqual((fare.load_bucket, fare.days_bucket), (0, 1))
+
+    def test_sales_move_fare_to_next_load_bucket(self):
+        self.sell(9)
+        self.assertEqual(FlightFare.objects.get(flight=self.flight).price, Decimal("222.00"))
+        self.sell(1)
+        self.assertEqual(FlightFare.objects.get(flight=self.flight).price, Decimal("244.20"))
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.filter(flight=self.flight).first().delete()
+        self.assertEqual(FlightFare.objects.get(flight=self.flight).price, Decimal("222.00"))
+
+    def test_refresh_writes_only_on_bucket_change(self):
+        with self.assertNumQueries(1):
+            prices = pricing.refresh([self.flight.id])
+        self.assertEqual(prices, {self.flight.id: Decimal("222.00")})
+
+    def test_distance_change_reprices(self):
+        self.route.distance = 100
+        self.route.save()
+        self.assertEqual(FlightFare.objects.get(flight=self.flight).price, Decimal("38.00"))
+        Route.objects.filter(id=self.route.id).update(distance=2400)
+        self.assertEqual(pricing.refresh([self.flight.id]), {self.flight.id: Decimal("222.00")})
+        Route.objects.filter(id=self.route.id).update(distance=100)
+        self.assertEqual(pricing.recompute_all(), {"flights": 1, "updated": 1})
+        self.assertEqual(FlightFare.objects.get(flight=self.flight).distance, 100)
+
+    def test_recomputed_distance_reprices(self):
+        Airport.objects.filter(id=self.route.source_id).update(latitude=50.345, longitude=30.8947)
+        Airport.objects.filter(id=self.route.destination_id).update(latitude=41.2971, longitude=2.0785)
+        self.assertEqual(geo.recompute_distances()["updated"], 1)
+        self.route.refresh_from_db()
+        fare = FlightFare.objects.get(flight=self.flight)
+        self.assertEqual(fare.distance, self.route.distance)
+        self.assertEqual(fare.price, pricing.fare(self.route.distance, 0, 1))
+
+    def test_order_tickets_priced_from_fare(self):
+        Flight.objects.filter(id=self.flight.id).update(seats_sold=9)
+        res = self.client.post(ORDER_URL, {"tickets": [
+            {"row": 1, "seat": 1, "flight": self.flight.id},
+            {"row": 1, "seat": 2, "flight": self.flight.id},
+        ]}, format="json")
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data["tickets"][0]["price"], "222.00")
+        self.assertEqual(FlightFare.objects.get(flight=self.flight).load_bucket, 1)
+
+    def test_flight_list_includes_fare(self):
+        for day in range(1, 4):
+            Flight.objects.create(
+                route=self.route,
+                airplane=Airplane.objects.create(name="Extra", rows=10, seats_in_row=2, airplane_type=self.airplane.airplane_type),
+                departure_time=self.departure + timedelta(days=day),
+                arrival_time=self.departure + timedelta(days=day, hours=3),
+            )
+        with self.assertNumQueries(3):
+            res = self.client.get(FLIGHT_URL)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([flight["fare"] for flight in res.data["results"]], ["222.00"] * 4)
+
+    def test_recompute_command(self):
+        FlightFare.objects.all().delete()
+        out = StringIO()
+        call_command("recompute_fares", stdout=out)
+        self.assertIn("Priced 1 flights, 1 fares changed.", out.getvalue())
+        result = pricing.recompute_all(now=timezone.now() + timedelta(days=20))
+        self.assertEqual(result, {"flights": 1, "updated": 1})
+        self.assertEqual(FlightFare.objects.get(flight=self.flight).price, Decimal("255.30"))
@@ -0,0 +1,118 @@
+import json
+import tempfile
+import zipfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from airport.models import RequestProfile
+from airport_service.profiling import cprofile_lock
+from django.core.cache import cache
+
+FLIGHT_URL = reverse("airport:flights-list")
+PROFILING_MIDDLEWARE = settings.MIDDLEWARE + [
+    "airport_service.profiling.ProfilingMiddleware"
+]
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.settings = override_settings(
+            MIDDLEWARE=PROFILING_MIDDLEWARE,
+            PROFILING_DIR=self.directory.name,
+            PROFILING_SAMPLE_RATE=0,
+            PROFILING_SLOW_THRESHOLD=60,
+            PROFILING_MAX_PROFILES=2,
+        )
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+
+    def authenticate(self, user):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_fast_requests_are_not_stored(self):
+        self.authenticate(self.user)
+        res = self.client.get(FLIGHT_URL)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn("X-Profile-Id", res)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_staff_header_stores_cprofile_and_sql(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.authenticate(self.user)
+        res = self.client.get(FLIGHT_URL, HTTP_X_PROFILE="1")
+        profile = RequestProfile.objects.get(id=res["X-Profile-Id"])
+        self.assertEqual(profile.kind, RequestProfile.Kind.CPROFILE)
+        self.assertEqual(profile.view, "FlightViewSet.list")
+        self.assertEqual(profile.status, 200)
+        self.assertGreater(profile.sql_count, 0)
+        with zipfile.ZipFile(Path(self.directory.name) / profile.file_name) as archive:
+            self.assertIn("profile.prof", archive.namelist())
+            timeline = json.loads(archive.read("sql.json"))
+        self.assertEqual(len(timeline), profile.sql_count)
+        self.assertIn("SELECT", timeline[0]["sql"])
+        self.assertEqual(timeline[0]["database"], "default")
+
+    def test_forced_profile_kept_while_cprofile_busy(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.authenticate(self.user)
+        with cprofile_lock:
+            res = self.client.get(FLIGHT_URL, HTTP_X_PROFILE="1")
+        profile = RequestProfile.objects.get(id=res["X-Profile-Id"])
+        self.assertEqual(profile.kind, RequestProfile.Kind.STACKS)
+
+    def test_header_ignored_for_regular_users(self):
+        self.authenticate(self.user)
+        res = self.client.get(FLIGHT_URL, HTTP_X_PROFILE="1")
+        self.assertNotIn("X-Profile-Id", res)
+
+    def test_slow_requests_store_sampled_stacks(self):
+        self.authenticate(self.user)
+        with override_settings(PROFILING_SLOW_THRESHOLD=0):
+            self.client.get(FLIGHT_URL)
+        profile = RequestProfile.objects.get()
+        self.assertEqual(profile.kind, RequestProfile.Kind.STACKS)
+        with zipfile.ZipFile(Path(self.directory.name) / profile.file_name) as archive:
+            self.assertIn("stacks.folded", archive.namelist())
+
+    def test_retention_removes_oldest_profiles(self):
+        self.authenticate(self.user)
+        with override_settings(PROFILING_SAMPLE_RATE=1):
+            for _ in range(4):
+                self.client.get(FLIGHT_URL)
+        self.assertEqual(RequestProfile.objects.count(), 2)
+        self.assertEqual(len(list(Path(self.directory.name).glob("*.zip"))), 2)
+
+    def test_admin_download(self):
+        admin_user = get_user_model().objects.create_superuser(
+            email="admin@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        with override_settings(PROFILING_SAMPLE_RATE=1):
+            self.authenticate(self.user)
+            self.client.get(FLIGHT_URL)
+        profile = RequestProfile.objects.get()
+        self.client.credentials()
+        self.client.force_login(admin_user)
+        res = self.client.get(
+            reverse("admin:airport_requestprofile_download", args=[profile.id])
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("attachment", res["Content-Disposition"])
+        res = self.client.get(reverse("admin:airport_requestprofile_changelist"))
+        self.assertContains(res, profile.file_name)
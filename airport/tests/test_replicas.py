@@ -0,0 +1,127 @@
+import os
+import tempfile
+from unittest import mock
+from datetime import datetime
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport import geo
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            AirplaneType,
+                            Airplane)
+from airport_service.db_router import (current_replica,
+                                       is_sticky,
+                                       mark_sticky,
+                                       sticky_key)
+from django.core.cache import cache, caches
+
+FLIGHT_URL = reverse("airport:flights-list")
+ORDER_URL = reverse("airport:orders-list")
+REPLICA = "replica_test"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTests(TransactionTestCase):
+    """A second SQLite file stands in for a replica that never catches
+    up, so whatever a request reads from it is visibly stale."""
+    databases = {"default", REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        handle, cls.replica_path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        connections.settings[REPLICA] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+            REPLICA: {"ENGINE": "django.db.backends.sqlite3",
+                      "NAME": cls.replica_path},
+        })[REPLICA]
+        call_command("migrate", database=REPLICA, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        os.remove(cls.replica_path)
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        get_user_model().objects.using(REPLICA).create(id=self.user.id, email=self.user.email)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        airport1 = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        airport2 = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        route = Route.objects.create(source=airport1, destination=airport2, distance=2400)
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=Airplane.objects.create(
+                name="SkyBird-737",
+                rows=25,
+                seats_in_row=6,
+                airplane_type=AirplaneType.objects.create(name="Boeing 737"),
+            ),
+            departure_time=timezone.make_aware(datetime(2025, 1, 12, 9, 0, 0)),
+            arrival_time=timezone.make_aware(datetime(2025, 1, 12, 12, 30, 0)),
+        )
+
+    def tearDown(self):
+        # flush() skips the replica: the router keeps migrations off it.
+        get_user_model().objects.using(REPLICA).all().delete()
+
+    def test_reads_go_to_replica(self):
+        res = self.client.get(FLIGHT_URL)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["count"], 0)
+        self.assertIsNone(current_replica.get())
+
+    def test_writes_go_to_primary_and_stick(self):
+        res = self.client.post(ORDER_URL, {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]}, format="json")
+        self.assertEqual(res.status_code, 201)
+        res = self.client.get(ORDER_URL)
+        self.assertEqual(res.data["count"], 1)
+        cache.delete(sticky_key(self.user.id))
+        res = self.client.get(ORDER_URL)
+        self.assertEqual(res.data["count"], 0)
+
+    def test_sticky_across_workers(self):
+        # Two cache handles on one table stand in for two processes.
+        shared = {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "sticky_cache"}
+        with override_settings(CACHES={"default": shared, "other": shared}):
+            call_command("createcachetable", verbosity=0)
+            worker1, worker2 = caches["default"], caches["other"]
+            self.assertIsNot(worker1, worker2)
+            with mock.patch("airport_service.db_router.cache", worker1):
+                mark_sticky(self.user)
+            with mock.patch("airport_service.db_router.cache", worker2):
+                self.assertTrue(is_sticky(self.user))
+                # Served by the primary, the cache read included.
+                res = self.client.get(FLIGHT_URL)
+                self.assertEqual(res.data["count"], 1)
+
+    def test_airport_grid_built_from_primary(self):
+        Airport.objects.filter(id=self.flight.route.source_id).update(latitude=50.345, longitude=30.8947)
+        geo.invalidate_grid()
+        token = current_replica.set(REPLICA)
+        try:
+            grid = geo.get_grid()
+        finally:
+            current_replica.reset(token)
+        self.assertEqual([airport_id for _, airport_id in grid.nearby(50.345, 30.8947, 10)], [self.flight.route.source_id])
+
+    def test_no_replicas_configured(self):
+        with override_settings(DATABASE_REPLICAS=[]):
+            res = self.client.get(FLIGHT_URL)
+        self.assertEqual(res.data["count"], 1)
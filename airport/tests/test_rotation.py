@@ -0,0 +1,154 @@
+import tempfile
+from datetime import datetime
+from io import StringIO
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            AirplaneType,
+                            Airplane,
+                            Crew,
+                            RouteDailyAvailability)
+from airport.rotation import import_schedule, validate_schedule, make_leg
+from django.core.cache import cache
+
+FLIGHT_URL = reverse("airport:flights-list")
+
+
+def at(day, hour, minute=0):
+    return timezone.make_aware(datetime(2025, 1, day, hour, minute, 0))
+
+
+class RotationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_superuser(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.kyiv = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        self.barcelona = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        self.warsaw = Airport.objects.create(name="Warsaw Chopin", closest_big_city="Warsaw")
+        self.kyiv_barcelona = Route.objects.create(source=self.kyiv, destination=self.barcelona, distance=2400)
+        self.barcelona_kyiv = Route.objects.create(source=self.barcelona, destination=self.kyiv, distance=2400)
+        self.warsaw_kyiv = Route.objects.create(source=self.warsaw, destination=self.kyiv, distance=800)
+        self.airplane = Airplane.objects.create(
+            name="SkyBird-737",
+            rows=25,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Boeing 737"),
+        )
+        self.pilot = Crew.objects.create(first_name="John", last_name="Walker")
+        self.flight = Flight.objects.create(
+            route=self.kyiv_barcelona,
+            airplane=self.airplane,
+            departure_time=at(12, 9),
+            arrival_time=at(12, 12),
+        )
+
+    def post(self, route, departure, arrival):
+        return self.client.post(FLIGHT_URL, {
+            "route": route.id,
+            "airplane": self.airplane.id,
+            "departure_time": departure.isoformat(),
+            "arrival_time": arrival.isoformat(),
+            "crew": [self.pilot.id],
+        }, format="json")
+
+    def test_valid_next_leg(self):
+        res = self.post(self.barcelona_kyiv, at(12, 12, 30), at(12, 15))
+        self.assertEqual(res.status_code, 201)
+
+    def test_short_turnaround_rejected(self):
+        res = self.post(self.barcelona_kyiv, at(12, 12, 10), at(12, 15))
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("is not ready before 2025-01-12 12:30", res.data["airplane"][0])
+
+    def test_departure_from_wrong_airport_rejected(self):
+        res = self.post(self.warsaw_kyiv, at(13, 9), at(13, 11))
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("cannot depart from airport", res.data["airplane"][0])
+
+    def test_insert_before_next_leg_checks_both_neighbours(self):
+        res = self.post(self.barcelona_kyiv, at(11, 9), at(11, 12))
+        self.assertEqual(res.status_code, 201)
+        res = self.post(self.barcelona_kyiv, at(10, 9), at(10, 12))
+        self.assertEqual(res.status_code, 400)
+
+    def test_arrival_before_departure_rejected(self):
+        res = self.post(self.barcelona_kyiv, at(12, 15), at(12, 14))
+        self.assertIn("arrival_time", res.data)
+
+    def test_rotation_endpoint(self):
+        Flight.objects.create(route=self.warsaw_kyiv, airplane=self.airplane,
+                              departure_time=at(12, 13), arrival_time=at(12, 14))
+        res = self.client.get(reverse("airport:airplanes-rotation", args=[self.airplane.id]),
+                              {"from": "2025-01-12"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data), 2)
+        self.assertIsNone(res.data[0]["ground_minutes"])
+        self.assertEqual(res.data[1]["ground_minutes"], 60)
+        self.assertEqual(len(res.data[1]["issues"]), 1)
+
+    def test_rotation_invalid_parameters(self):
+        url = reverse("airport:airplanes-rotation", args=[self.airplane.id])
+        for params in ({"days": "week"}, {"days": -1}, {"days": 10 ** 9}, {"from": "12.01.2025"}):
+            res = self.client.get(url, params)
+            self.assertEqual(res.status_code, 400, params)
+            self.assertIn(next(iter(params)), res.data)
+
+    def test_validate_schedule_in_fixed_number_of_queries(self):
+        legs = [
+            make_leg(None, self.airplane.id, at(12, 13), at(12, 15), self.barcelona.id, self.kyiv.id),
+            make_leg(None, self.airplane.id, at(12, 15, 10), at(12, 18), self.kyiv.id, self.barcelona.id),
+            make_leg(None, self.airplane.id, at(13, 9), at(13, 11), self.warsaw.id, self.kyiv.id),
+        ]
+        with self.assertNumQueries(2):
+            errors = validate_schedule(legs)
+        self.assertEqual([index for index, _ in errors], [1, 2])
+
+    def test_import_schedule(self):
+        created, errors = import_schedule([
+            {"route": self.barcelona_kyiv.id, "airplane": self.airplane.id,
+             "departure_time": at(12, 13), "arrival_time": at(12, 16)},
+            {"route": self.kyiv_barcelona.id, "airplane": self.airplane.id,
+             "departure_time": at(13, 9), "arrival_time": at(13, 12)},
+        ])
+        self.assertEqual((created, errors), (2, []))
+        flight = Flight.objects.get(departure_time=at(13, 9))
+        self.assertEqual(flight.capacity, 150)
+        self.assertEqual(RouteDailyAvailability.objects.get(route=self.kyiv_barcelona, date=flight.departure_time.date()).flights_count, 1)
+
+    def test_import_schedule_command_rejects_invalid_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as schedule:
+            schedule.write("route,airplane,departure_time,arrival_time\n")
+            schedule.write(f"{self.warsaw_kyiv.id},{self.airplane.id},2025-01-13T09:00,2025-01-13T11:00\n")
+            schedule.flush()
+            stderr = StringIO()
+            with self.assertRaises(CommandError):
+                call_command("import_schedule", schedule.name, stdout=StringIO(), stderr=stderr)
+        self.assertIn("line 2:", stderr.getvalue())
+        self.assertEqual(Flight.objects.count(), 1)
+
+    def test_import_schedule_command_reports_invalid_values(self):
+        for line, message in (
+            (f"x,{self.airplane.id},2025-01-13T09:00,2025-01-13T11:00", "line 3: Invalid value"),
+            (f"{self.warsaw_kyiv.id},{self.airplane.id},tomorrow,2025-01-13T11:00", "line 3: Invalid datetime"),
+            (f"{self.warsaw_kyiv.id},{self.airplane.id}", "line 3: Invalid value"),
+        ):
+            with tempfile.NamedTemporaryFile("w", suffix=".csv") as schedule:
+                schedule.write("route,airplane,departure_time,arrival_time\n")
+                schedule.write(f"{self.kyiv_barcelona.id},{self.airplane.id},2025-01-13T09:00,2025-01-13T11:00\n")
+                schedule.write(line + "\n")
+                schedule.flush()
+                with self.assertRaisesMessage(CommandError, message):
+                    call_command("import_schedule", schedule.name, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Flight.objects.count(), 1)
@@ -0,0 +1,74 @@
+import gzip
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+SCHEMA_URL = reverse("schema")
+
+
+class PrecomputedSchemaTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema_dir = tempfile.mkdtemp()
+        call_command("build_schema", "--dir", cls.schema_dir, stdout=StringIO(), stderr=StringIO())
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.schema_dir)
+        super().tearDownClass()
+
+    def get(self, **headers):
+        with override_settings(API_SCHEMA_DIR=self.schema_dir):
+            return self.client.get(SCHEMA_URL, **headers)
+
+    def test_serves_built_yaml_with_etag(self):
+        res = self.get()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "application/vnd.oai.openapi")
+        self.assertTrue(res.content.startswith(b"openapi:"))
+        self.assertEqual(res["Cache-Control"], "public, no-cache")
+        self.assertIn("Accept-Encoding", res["Vary"])
+        res = self.get(HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+
+    def test_json_and_gzip(self):
+        res = self.get(HTTP_ACCEPT="application/json", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        schema = json.loads(gzip.decompress(res.content))
+        self.assertIn("/airport/flights/", schema["paths"])
+        with override_settings(API_SCHEMA_DIR=self.schema_dir):
+            plain = self.client.get(SCHEMA_URL, {"format": "json"})
+        self.assertEqual(json.loads(plain.content), schema)
+        self.assertNotEqual(plain["ETag"], self.get()["ETag"])
+        self.assertEqual(res["ETag"], plain["ETag"][:-1] + '-gzip"')
+
+    def test_gzip_refused(self):
+        for header in ("gzip;q=0", "br", "identity, *;q=0.5, gzip;q=0"):
+            res = self.get(HTTP_ACCEPT_ENCODING=header)
+            self.assertNotIn("Content-Encoding", res, header)
+            self.assertTrue(res.content.startswith(b"openapi:"))
+        self.assertEqual(self.get(HTTP_ACCEPT_ENCODING="*")["Content-Encoding"], "gzip")
+
+    def test_gzip_etag_only_matches_gzip(self):
+        identity = self.get()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=identity["ETag"], HTTP_ACCEPT_ENCODING="gzip").status_code, 200)
+        gzipped = self.get(HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=gzipped["ETag"]).status_code, 200)
+        res = self.get(HTTP_IF_NONE_MATCH=gzipped["ETag"], HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res["ETag"], gzipped["ETag"])
+
+    def test_missing_schema(self):
+        with override_settings(API_SCHEMA_DIR=f"{self.schema_dir}/missing"):
+            self.assertEqual(self.client.get(SCHEMA_URL).status_code, 404)
+            with override_settings(DEBUG=True):
+                res = self.client.get(SCHEMA_URL)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn("ETag", res)
@@ -0,0 +1,132 @@
+from datetime import datetime
+from unittest import mock
+from django.utils import timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from airport.models import (Airport,
+                            Route,
+                            Flight,
+                            AirplaneType,
+                            Airplane,
+                            Order,
+                            Ticket)
+from airport.seatmap import SeatMap, get_seat_map
+from django.core.cache import cache
+
+
+def flight_detail_url(flight_id):
+    return reverse("airport:flights-detail", args=[flight_id])
+
+
+class FlightWithTicketsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@gmail.com",
+            password="ASDasfsfgwe$123",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        airport1 = Airport.objects.create(name="Kyiv Boryspil", closest_big_city="Kyiv")
+        airport2 = Airport.objects.create(name="Barcelona El Prat", closest_big_city="Barcelona")
+        route = Route.objects.create(source=airport1, destination=airport2, distance=2400)
+        self.airplane = Airplane.objects.create(
+            name="SkyBird-737",
+            rows=3,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Boeing 737"),
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=self.airplane,
+            departure_time=timezone.make_aware(datetime(2025, 1, 12, 9, 0, 0)),
+            arrival_time=timezone.make_aware(datetime(2025, 1, 12, 12, 30, 0)),
+        )
+        self.order = Order.objects.create(user=self.user)
+        for row, seat in ((1, 3), (1, 4), (2, 1)):
+            Ticket.objects.create(row=row, seat=seat, flight=self.flight, order=self.order)
+
+
+class SeatMapTests(FlightWithTicketsTestCase):
+    def test_summary(self):
+        summary = SeatMap.build(self.flight).summary()
+        self.assertEqual(summary[0], {
+            "row": 1,
+            "free_seats": [1, 2, 5, 6],
+            "largest_block": 2,
+            "largest_block_start": 1,
+        })
+        self.assertEqual(summary[1]["free_seats"], [2, 3, 4, 5, 6])
+        self.assertEqual(summary[1]["largest_block"], 5)
+        self.assertEqual(summary[2]["largest_block"], 6)
+
+    def test_retrieve_with_seat_availability(self):
+        res = self.client.get(flight_detail_url(self.flight.id), {"seat_availability": "true"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["tickets_available"], 15)
+        self.assertEqual(len(res.data["seat_availability"]), 3)
+        self.assertEqual(res.data["seat_availability"][0]["free_seats"], [1, 2, 5, 6])
+
+    def test_retrieve_without_seat_availability(self):
+        res = self.client.get(flight_detail_url(self.flight.id))
+        self.assertNotIn("seat_availability", res.data)
+
+    def test_cached_seat_map_needs_no_query(self):
+        get_seat_map(self.flight, tickets=3)
+        with self.assertNumQueries(0):
+            seat_map = get_seat_map(self.flight, tickets=3)
+        self.assertFalse(seat_map.is_free(1, 3))
+
+    def test_new_ticket_invalidates_cache(self):
+        get_seat_map(self.flight)
+        Ticket.objects.create(row=3, seat=1, flight=self.flight, order=self.order)
+        self.assertFalse(get_seat_map(self.flight).is_free(3, 1))
+
+    def test_stale_cache_rebuilt_on_ticket_count_mismatch(self):
+        get_seat_map(self.flight)
+        Ticket.objects.bulk_create([Ticket(row=3, seat=2, flight=self.flight, order=self.order)])
+        self.assertTrue(get_seat_map(self.flight).is_free(3, 2))
+        self.assertFalse(get_seat_map(self.flight, tickets=4).is_free(3, 2))
+
+
+class SeatAllocationTests(TestCase):
+    def test_allocate_tightest_block_in_one_row(self):
+        seat_map = SeatMap(3, 6, [0b001100, 0b000001, 0], 0)
+        self.assertEqual(seat_map.allocate(2), [(1, 1), (1, 2)])
+        self.assertEqual(seat_map.allocate(5), [(2, 2), (2, 3), (2, 4), (2, 5), (2, 6)])
+
+    def test_allocate_over_adjacent_rows(self):
+        seat_map = SeatMap(4, 4, [0b1111, 0b0110, 0b1001, 0b1111], 0)
+        self.assertEqual(seat_map.allocate(4), [(2, 1), (2, 4), (3, 2), (3, 3)])
+
+    def test_allocate_too_many(self):
+        seat_map = SeatMap(2, 2, [0b11, 0b01], 0)
+        self.assertIsNone(seat_map.allocate(2))
+        self.assertEqual(seat_map.allocate(1), [(2, 2)])
+
+
+class OrderAllocateTests(FlightWithTicketsTestCase):
+    ALLOCATE_URL = reverse("airport:orders-allocate")
+
+    def test_allocate_contiguous_seats(self):
+        res = self.client.post(self.ALLOCATE_URL, {"flight": self.flight.id, "passengers": 4}, format="json")
+        self.assertEqual(res.status_code, 201)
+        seats = sorted((ticket["row"], ticket["seat"]) for ticket in res.data["tickets"])
+        self.assertEqual(seats, [(2, 2), (2, 3), (2, 4), (2, 5)])
+        self.assertEqual(Ticket.objects.filter(order_id=res.data["id"]).count(), 4)
+
+    def test_allocate_more_than_available(self):
+        res = self.client.post(self.ALLOCATE_URL, {"flight": self.flight.id, "passengers": 16}, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("15 seats", str(res.data["passengers"]))
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_allocate_seat_taken_meanwhile(self):
+        # A concurrent order took a seat after the map was read.
+        with mock.patch.object(SeatMap, "allocate", return_value=[(1, 3)]):
+            res = self.client.post(self.ALLOCATE_URL, {"flight": self.flight.id, "passengers": 1}, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(Order.objects.count(), 1)
@@ -0,0 +1,60 @@
+import os
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from airport_service import startup
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _json
+import time:       300 |        420 |   json.decoder
+import time:      1000 |       1420 | json
+import time:      2500 |       2500 | airport.geo
+"""
+
+
+class StartupTests(TestCase):
+    def test_parse_importtime(self):
+        imports = startup.parse_importtime(IMPORTTIME.splitlines())
+        self.assertEqual(imports, [
+            ("_json", 120, 120, 2),
+            ("json.decoder", 300, 420, 1),
+            ("json", 1000, 1420, 0),
+            ("airport.geo", 2500, 2500, 0),
+        ])
+        self.assertEqual(startup.by_package(imports), {"airport": 2500, "json": 1300, "_json": 120})
+
+    def test_web_worker_skips_optional_imports(self):
+        result = startup.measure("wsgi")
+        self.assertIn("airport.views", result["modules"])
+        self.assertNotIn("drf_spectacular.views", result["modules"])
+        self.assertNotIn("PIL.Image", result["modules"])
+
+    def test_startup_report(self):
+        out = StringIO()
+        call_command("startup_report", "--target", "setup", "--limit", "3", stdout=out)
+        self.assertIn("setup:", out.getvalue())
+        self.assertIn("django", out.getvalue())
+
+    def test_docs_view_loaded_on_request(self):
+        res = self.client.get(reverse("swagger-ui"))
+        self.assertEqual(res.status_code, 200)
+
+    def test_prepare_creates_superuser_once(self):
+        env = {"DJANGO_SUPERUSER_EMAIL": "admin@gmail.com", "DJANGO_SUPERUSER_PASSWORD": "ASDasfsfgwe$123"}
+        with mock.patch.dict(os.environ, env):
+            call_command("prepare", stdout=StringIO())
+            call_command("prepare", stdout=StringIO())
+        self.assertTrue(get_user_model().objects.get(email="admin@gmail.com").is_superuser)
+
+    def test_prepare_creates_shared_cache_table(self):
+        shared = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "prepare_cache"}}
+        with override_settings(CACHES=shared):
+            call_command("prepare", stdout=StringIO())
+            cache.set("worker", 1)
+            self.assertEqual(cache.get("worker"), 1)
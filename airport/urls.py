@@ -8,6 +8,8 @@ from airport.views import (
     AirplaneViewSet,
     FlightViewSet,
     OrderViewSet,
+    RouteDailyAvailabilityViewSet,
+    AnalyticsViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -20,6 +22,10 @@ router.register("airplane_types",
 router.register("airplanes", AirplaneViewSet, basename="airplanes")
 router.register("flights", FlightViewSet, basename="flights")
 router.register("orders", OrderViewSet, basename="orders")
+router.register("availability",
+                RouteDailyAvailabilityViewSet,
+                basename="availability")
+router.register("analytics", AnalyticsViewSet, basename="analytics")
 urlpatterns = [path("", include(router.urls))]
 
 app_name = "airport"
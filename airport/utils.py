@@ -0,0 +1,8 @@
+import itertools
+
+
+def chunked(iterable, size: int):
+    """Lists of up to `size` consecutive items of `iterable`."""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
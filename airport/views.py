@@ -1,16 +1,28 @@
-from datetime import datetime
-from django.db.models import Count, F
+import math
+from datetime import datetime, timedelta
+from django.db.models import F
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, mixins, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
 
+from airport import analytics, geo, idempotency, rotation
+from airport_service.db_router import ReplicaReadsMixin
+from airport_service.renderers import BULK_RENDERER_CLASSES
+from airport.images import delete_renditions, schedule_renditions
+from airport.jobs import enqueue_on_commit
 from airport.serializers import (
     CrewSerializer,
+    CrewScheduleSerializer,
     AirportSerializer,
+    AirportNearbySerializer,
     RouteSerializer,
     RouteListSerializer,
     RouteRetrieveSerializer,
@@ -23,8 +35,12 @@ from airport.serializers import (
     FlightSerializer,
     FlightListSerializer,
     FlightRetrieveSerializer,
+    FlightRetrieveWithSeatsSerializer,
     OrderSerializer,
     OrderListSerializer,
+    OrderRetrieveSerializer,
+    OrderSeatAllocationSerializer,
+    RouteDailyAvailabilitySerializer,
 )
 from airport.models import (
     Crew,
@@ -34,13 +50,99 @@ from airport.models import (
     AirplaneType,
     Flight,
     Order,
+    RouteDailyAvailability,
 )
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+def query_number(request, name: str, default, cast=int, min_value=0,
+                 max_value=None):
+    """?name= converted with `cast`, `default` when it is missing.
+    Raises a 400 for a value that is not a number or is outside
+    [min_value, max_value]."""
+    value = request.GET.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        number = cast(value)
+    except ValueError:
+        number = None
+    if number is None or not math.isfinite(number):
+        raise ValidationError({name: "A valid number is required."})
+    if number < min_value:
+        raise ValidationError(
+            {name: f"Ensure this value is greater than or equal to "
+                   f"{min_value}."}
+        )
+    if max_value is not None and number > max_value:
+        raise ValidationError(
+            {name: f"Ensure this value is less than or equal to "
+                   f"{max_value}."}
+        )
+    return number
+
+
+def query_date(request, name: str):
+    """?name= as a naive datetime at midnight, None when it is missing.
+    Raises a 400 for a value that is not a YYYY-MM-DD date."""
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValidationError({name: "Use the YYYY-MM-DD format."})
+
+
+ROTATION_MAX_DAYS = 366
+
+
+class CrewViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     queryset = Crew.objects.all().order_by("id")
     serializer_class = CrewSerializer
 
+    def get_serializer_class(self):
+        if self.action == "schedule":
+            return CrewScheduleSerializer
+        return CrewSerializer
+
+    @extend_schema(parameters=[
+        OpenApiParameter(
+            name="from",
+            type=str,
+            description="Flights departing on or after a date "
+                        "(ex. ?from=2022-01-10)",
+        ),
+        OpenApiParameter(
+            name="to",
+            type=str,
+            description="Flights departing on or before a date "
+                        "(ex. ?to=2022-01-31)",
+        ),
+    ])
+    @action(methods=["GET"], detail=True, url_path="schedule")
+    def schedule(self, request, pk=None):
+        """Flights of a crew member ordered by departure"""
+        crew = self.get_object()
+        date_from = query_date(request, "from")
+        date_to = query_date(request, "to")
+        assignments = (crew.assignments
+                       .select_related("flight__route__source",
+                                       "flight__route__destination")
+                       .order_by("departure_time"))
+        if date_from:
+            assignments = assignments.filter(
+                departure_time__gte=timezone.make_aware(date_from)
+            )
+        if date_to:
+            assignments = assignments.filter(
+                departure_time__lt=timezone.make_aware(
+                    date_to + timedelta(days=1)
+                )
+            )
+        page = self.paginate_queryset(assignments)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     def get_queryset(self):
         last_name = self.request.GET.get("last_name")
         first_name = self.request.GET.get("first_name")
@@ -67,10 +169,46 @@ class CrewViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class AirportViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     queryset = Airport.objects.all().order_by("id")
     serializer_class = AirportSerializer
 
+    def get_serializer_class(self):
+        if self.action == "nearby":
+            return AirportNearbySerializer
+        return AirportSerializer
+
+    @extend_schema(parameters=[
+        OpenApiParameter(
+            name="radius",
+            type=float,
+            description="Distance in km, 100 by default (ex. ?radius=250)",
+        ),
+        OpenApiParameter(
+            name="limit",
+            type=int,
+            description="Number of airports, 20 by default (ex. ?limit=5)",
+        ),
+    ])
+    @action(methods=["GET"], detail=True, url_path="nearby")
+    def nearby(self, request, pk=None):
+        """Other airports within a radius, nearest first"""
+        airport = self.get_object()
+        if airport.latitude is None or airport.longitude is None:
+            raise ValidationError(
+                {"detail": "The airport has no coordinates."}
+            )
+        radius = query_number(request, "radius", 100, cast=float)
+        limit = query_number(request, "limit", 20)
+        airports = geo.nearby_airports(airport.latitude,
+                                       airport.longitude,
+                                       radius,
+                                       limit=limit + 1)
+        airports = [other for other in airports
+                    if other.id != airport.id][:limit]
+        serializer = self.get_serializer(airports, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
     def get_queryset(self):
         name = self.request.GET.get("name")
         queryset = self.queryset
@@ -89,11 +227,13 @@ class AirportViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     queryset = (Route.objects.all()
                 .select_related("source", "destination")
                 .order_by("id")
                 )
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES,
+                        *BULK_RENDERER_CLASSES]
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -130,7 +270,7 @@ class RouteViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+class AirplaneTypeViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     queryset = AirplaneType.objects.all().order_by("id")
     serializer_class = AirplaneTypeSerializer
 
@@ -157,7 +297,7 @@ class AirplaneTypeViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     queryset = Airplane.objects.all().order_by("id")
     serializer_class = AirplaneSerializer
 
@@ -181,10 +321,45 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         airplane = self.get_object()
         serializer = self.get_serializer(airplane, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            previous_image = airplane.image.name
+            airplane = serializer.save()
+            if previous_image and previous_image != airplane.image.name:
+                delete_renditions(previous_image)
+            if airplane.image:
+                schedule_renditions(airplane.image.name)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(parameters=[
+        OpenApiParameter(
+            name="from",
+            type=str,
+            description="First departure date, today by default "
+                        "(ex. ?from=2022-01-10)",
+        ),
+        OpenApiParameter(
+            name="days",
+            type=int,
+            description="Number of days shown, 7 by default, "
+                        f"{ROTATION_MAX_DAYS} at most (ex. ?days=30)",
+        ),
+    ])
+    @action(methods=["GET"], detail=True, url_path="rotation")
+    def rotation(self, request, pk=None):
+        """Flights of an airplane in order with ground times and issues"""
+        airplane = self.get_object()
+        date_from = query_date(request, "from")
+        days = query_number(request, "days", 7, max_value=ROTATION_MAX_DAYS)
+        if date_from:
+            start = timezone.make_aware(date_from)
+        else:
+            start = timezone.localtime().replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+        legs = rotation.rotation(airplane.id, start,
+                                 start + timedelta(days=days))
+        return Response(legs, status=status.HTTP_200_OK)
+
     def get_queryset(self):
         name = self.request.GET.get("name")
         queryset = self.queryset
@@ -203,24 +378,24 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(ReplicaReadsMixin, viewsets.ModelViewSet):
     queryset = (
         Flight.objects
         .select_related(
             "route",
             "airplane",
             "route__source",
-            "route__destination")
+            "route__destination",
+            "fare")
         .prefetch_related("crew")
         .annotate(
-            tickets_available=(
-                F("airplane__rows") * F("airplane__seats_in_row")
-                - Count("tickets")
-            )
+            tickets_available=F("capacity") - F("seats_sold")
         )
         .order_by("id")
     )
     serializer_class = FlightSerializer
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES,
+                        *BULK_RENDERER_CLASSES]
 
     def get_queryset(self):
         departure_time = self.request.GET.get("departure_time")
@@ -229,17 +404,19 @@ class FlightViewSet(viewsets.ModelViewSet):
         if departure_time:
             departure_time = datetime.strptime(
                 departure_time, "%Y-%m-%d").date()
-            queryset = queryset.filter(departure_time__date=departure_time)
+            queryset = queryset.filter(departure_date=departure_time)
         if arrival_time:
             arrival_time = datetime.strptime(
                 arrival_time, "%Y-%m-%d").date()
-            queryset = queryset.filter(arrival_time__date=arrival_time)
+            queryset = queryset.filter(arrival_date=arrival_time)
         return queryset.distinct()
 
     def get_serializer_class(self):
         if self.action == "list":
             return FlightListSerializer
         if self.action == "retrieve":
+            if self.request.GET.get("seat_availability") == "true":
+                return FlightRetrieveWithSeatsSerializer
             return FlightRetrieveSerializer
         return FlightSerializer
 
@@ -247,19 +424,42 @@ class FlightViewSet(viewsets.ModelViewSet):
         OpenApiParameter(
             name="departure_time",
             type=str,
-            description="Filter departure time by date(ex. ?date=2022-01-10)",
+            description="Filter by departure date in the source airport's "
+                        "timezone (ex. ?departure_time=2022-01-10)",
         ),
         OpenApiParameter(
             name="arrival_time",
             type=str,
-            description="Filter arrival time by date(ex. ?date=2022-01-10)",
+            description="Filter by arrival date in the destination "
+                        "airport's timezone (ex. ?arrival_time=2022-01-10)",
         )
     ])
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(parameters=[
+        OpenApiParameter(
+            name="seat_availability",
+            type=bool,
+            description="Include free seats and the largest free block "
+                        "of every row (ex. ?seat_availability=true)",
+        )
+    ])
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+IDEMPOTENCY_KEY_PARAMETER = OpenApiParameter(
+    name=idempotency.HEADER,
+    type=str,
+    location=OpenApiParameter.HEADER,
+    description="Retries with the same key return the first response "
+                "instead of creating another order",
+)
+
 
 class OrderViewSet(
+    ReplicaReadsMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -271,6 +471,9 @@ class OrderViewSet(
                 .prefetch_related("tickets",
                                   "tickets__flight",
                                   "tickets__flight__route",
+                                  "archived_tickets",
+                                  "archived_tickets__flight",
+                                  "archived_tickets__flight__route",
                                   )
                 .order_by("id")
                 )
@@ -298,7 +501,168 @@ class OrderViewSet(
     def get_serializer_class(self):
         if self.action == "list":
             return OrderListSerializer
+        if self.action == "retrieve":
+            return OrderRetrieveSerializer
+        if self.action == "allocate":
+            return OrderSeatAllocationSerializer
         return OrderSerializer
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        order = serializer.save(user=self.request.user)
+        enqueue_on_commit("order_confirmation", order_id=order.id)
+
+    @extend_schema(parameters=[IDEMPOTENCY_KEY_PARAMETER])
+    def create(self, request, *args, **kwargs):
+        return idempotency.run_once(
+            request, lambda: super(OrderViewSet, self).create(request)
+        )
+
+    @extend_schema(parameters=[IDEMPOTENCY_KEY_PARAMETER])
+    @action(methods=["POST"], detail=False, url_path="allocate")
+    def allocate(self, request):
+        """Order seats for a number of passengers picked by the server"""
+        return idempotency.run_once(request, lambda: self._allocate(request))
+
+    def _allocate(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class RouteDailyAvailabilityViewSet(ReplicaReadsMixin,
+                                    viewsets.ReadOnlyModelViewSet):
+    queryset = (RouteDailyAvailability.objects.all()
+                .select_related("route__source", "route__destination")
+                .order_by("date", "route_id")
+                )
+    serializer_class = RouteDailyAvailabilitySerializer
+
+    def get_queryset(self):
+        route = query_number(self.request, "route", None)
+        date = query_date(self.request, "date")
+        source = self.request.GET.get("source")
+        destination = self.request.GET.get("destination")
+        queryset = self.queryset
+        if route is not None:
+            queryset = queryset.filter(route_id=route)
+        if date:
+            queryset = queryset.filter(date=date.date())
+        if source:
+            queryset = queryset.filter(route__source__name__icontains=source)
+        if destination:
+            queryset = queryset.filter(
+                route__destination__name__icontains=destination)
+        return queryset
+
+    @extend_schema(parameters=[
+        OpenApiParameter(
+            name="route",
+            type=int,
+            description="Filter by route id (ex. ?route=1)",
+        ),
+        OpenApiParameter(
+            name="date",
+            type=str,
+            description="Filter by departure date (ex. ?date=2022-01-10)",
+        ),
+        OpenApiParameter(
+            name="source",
+            type=str,
+            description="Filter by source (ex. ?source=Boryspil)",
+        ),
+        OpenApiParameter(
+            name="destination",
+            type=str,
+            description="Filter by destination (ex. ?destination=Chopin)",
+        )
+    ])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+def analytics_period(request) -> tuple:
+    """Aware [start, end) datetimes from ?from= and ?to= dates."""
+    start, end = query_date(request, "from"), query_date(request, "to")
+    if start:
+        start = timezone.make_aware(start)
+    if end:
+        end = timezone.make_aware(end + timedelta(days=1))
+    return start, end
+
+
+ANALYTICS_PERIOD_PARAMETERS = [
+    OpenApiParameter(
+        name="from",
+        type=str,
+        description="Flights departing on or after a date "
+                    "(ex. ?from=2022-01-10)",
+    ),
+    OpenApiParameter(
+        name="to",
+        type=str,
+        description="Flights departing on or before a date "
+                    "(ex. ?to=2022-01-31)",
+    ),
+]
+
+
+class AnalyticsViewSet(ReplicaReadsMixin, viewsets.ViewSet):
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=OpenApiTypes.OBJECT, parameters=[
+        OpenApiParameter(
+            name="group",
+            type=str,
+            enum=analytics.LOAD_FACTOR_GROUPS,
+            description="Group by route, day or airplane_type, "
+                        "route by default (ex. ?group=day)",
+        ),
+        *ANALYTICS_PERIOD_PARAMETERS,
+    ])
+    @action(methods=["GET"], detail=False, url_path="load-factor")
+    def load_factor(self, request):
+        """Capacity, seats sold, load factor and revenue per group"""
+        group = request.GET.get("group", "route")
+        if group not in analytics.LOAD_FACTOR_GROUPS:
+            raise ValidationError(
+                {"group": f"Must be one of: "
+                          f"{', '.join(analytics.LOAD_FACTOR_GROUPS)}."}
+            )
+        rows = analytics.load_factor(group, *analytics_period(request))
+        return Response(rows, status=status.HTTP_200_OK)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT, parameters=[
+        OpenApiParameter(
+            name="limit",
+            type=int,
+            description="Number of airports, 10 by default (ex. ?limit=5)",
+        ),
+        *ANALYTICS_PERIOD_PARAMETERS,
+    ])
+    @action(methods=["GET"], detail=False, url_path="busiest-airports")
+    def busiest_airports(self, request):
+        """Airports ordered by departing and arriving passengers"""
+        limit = query_number(request, "limit", 10)
+        rows = analytics.busiest_airports(*analytics_period(request),
+                                          limit=limit)
+        return Response(rows, status=status.HTTP_200_OK)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT, parameters=[
+        OpenApiParameter(
+            name="airplane_type",
+            type=int,
+            required=True,
+            description="Airplane type id (ex. ?airplane_type=1)",
+        ),
+        *ANALYTICS_PERIOD_PARAMETERS,
+    ])
+    @action(methods=["GET"], detail=False, url_path="seat-heatmap")
+    def seat_heatmap(self, request):
+        """Share of flights each seat was sold on, by row"""
+        airplane_type = query_number(request, "airplane_type", None)
+        if airplane_type is None:
+            raise ValidationError({"airplane_type": "This field is required."})
+        heatmap = analytics.seat_heatmap(airplane_type,
+                                         *analytics_period(request))
+        return Response(heatmap, status=status.HTTP_200_OK)
@@ -0,0 +1,101 @@
+"""
+Negotiated response compression.
+
+CompressionMiddleware compresses responses of at least
+COMPRESSION_MIN_SIZE bytes with the best coding the client accepts:
+Brotli or zstd when their packages (`brotli`, `zstandard`) are
+installed, gzip always. Already encoded, streaming and binary responses
+pass through untouched. Levels favour speed over ratio, since API
+responses are compressed once per request.
+"""
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODINGS = {"gzip": lambda content: gzip.compress(content, 6, mtime=0)}
+if brotli is not None:
+    CODINGS["br"] = lambda content: brotli.compress(content, quality=4)
+if zstandard is not None:
+    CODINGS["zstd"] = zstandard.ZstdCompressor(level=3).compress
+# Preferred first when the client accepts several with the same q.
+PREFERENCE = ("br", "zstd", "gzip")
+COMPRESSIBLE_TYPES = re.compile(
+    r"^(text/|application/(json|javascript|xml|yaml|vnd\.oai\.openapi)"
+    r"|application/([\w.-]+\+)?msgpack"
+    r"|application/[\w.+-]+\+(json|xml))"
+)
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """{coding: q} of an Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        match = re.search(r"q=([\d.]+)", params)
+        if match:
+            try:
+                quality = float(match[1])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def choose_coding(header: str, available=None):
+    """The coding out of `available` (CODINGS by default) the client
+    prefers, None for identity."""
+    accepted = parse_accept_encoding(header)
+    available = CODINGS if available is None else available
+    candidates = [
+        (accepted.get(coding, accepted.get("*", 0.0)), -rank, coding)
+        for rank, coding in enumerate(PREFERENCE)
+        if coding in available
+    ]
+    quality, _rank, coding = max(candidates)
+    return coding if quality > 0 else None
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming
+                or response.has_header("Content-Encoding")
+                or not COMPRESSIBLE_TYPES.match(
+                    response.get("Content-Type", ""))):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        coding = choose_coding(request.headers.get("Accept-Encoding", ""))
+        if coding is None:
+            return response
+        compressed = CODINGS[coding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = coding
+        # The compressed body is not byte-identical any more.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
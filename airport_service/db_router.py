@@ -0,0 +1,80 @@
+"""
+Read replicas for API reads (DATABASE_REPLICAS).
+
+Viewsets using ReplicaReadsMixin pick a random replica for a request
+with a safe method, once the user is authenticated; ReplicaRouter then
+sends that request's reads to it. Everything else reads and writes the
+primary: requests outside the viewsets, unsafe methods, transactions,
+and the rest of a request once it wrote anything.
+
+After a successful write a user reads the primary for
+REPLICA_STICKY_SECONDS, so an order they just created shows up in their
+next GET even while replicas lag behind. The marker is kept in the
+cache, which therefore has to be shared by all worker processes (see
+CACHES); the database cache itself is always read from the primary.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+current_replica = ContextVar("current_replica", default=None)
+
+
+def sticky_key(user_id) -> str:
+    return f"db:primary:{user_id}"
+
+
+def mark_sticky(user) -> None:
+    cache.set(sticky_key(user.pk), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_sticky(user) -> bool:
+    return bool(user.is_authenticated and cache.get(sticky_key(user.pk)))
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == "django_cache":
+            return None
+        alias = current_replica.get()
+        if alias and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Read our own writes for the rest of the request.
+        current_replica.set(None)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadsMixin:
+    """Serve safe-method viewset actions from a replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        token = current_replica.set(None)
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            if (self.request.method not in SAFE_METHODS
+                    and response.status_code < 400
+                    and self.request.user.is_authenticated):
+                mark_sticky(self.request.user)
+            return response
+        finally:
+            current_replica.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (settings.DATABASE_REPLICAS
+                and request.method in SAFE_METHODS
+                and not is_sticky(request.user)):
+            current_replica.set(random.choice(settings.DATABASE_REPLICAS))
@@ -0,0 +1,133 @@
+"""
+Production serving of MEDIA_ROOT files.
+
+Uploaded file names carry a uuid (see `airplane_image_path`) and
+renditions are derived from them, so a URL never changes content and
+can be cached as immutable. Depending on MEDIA_SERVE_MODE the file is
+streamed by Django (`FileResponse`, which lets the WSGI server use
+`os.sendfile`) or handed off to the front web server.
+"""
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.http import (FileResponse,
+                         Http404,
+                         HttpResponse,
+                         HttpResponseNotModified,
+                         StreamingHttpResponse)
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.http import require_safe
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def resolve_media_path(path: str) -> Path:
+    root = Path(settings.MEDIA_ROOT).resolve()
+    full_path = (root / path).resolve()
+    if root not in full_path.parents or not full_path.is_file():
+        raise Http404("File does not exist.")
+    return full_path
+
+
+def file_etag(stat) -> str:
+    return quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: `W/"x"` matches `"x"`,
+    `*` matches any existing file."""
+    etags = parse_etags(header) if header else []
+    return etags == ["*"] or etag in (tag.removeprefix("W/")
+                                      for tag in etags)
+
+
+def parse_range(header: str, size: int):
+    """Return (start, end) for a single satisfiable byte range,
+    None to serve the whole file, or raise ValueError if unsatisfiable."""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    start, end = match.groups()
+    if start == "":
+        length = int(end)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def iter_range(full_path: Path, start: int, end: int):
+    with open(full_path, "rb") as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def accel_response(full_path: Path, path: str) -> HttpResponse:
+    response = HttpResponse()
+    if settings.MEDIA_SERVE_MODE == "x-accel-redirect":
+        response["X-Accel-Redirect"] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/")
+            + "/" + path.lstrip("/")
+        )
+    else:
+        response["X-Sendfile"] = str(full_path)
+    # Let the front server fill in the real type from the file.
+    del response["Content-Type"]
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    full_path = resolve_media_path(path)
+    stat = full_path.stat()
+    etag = file_etag(stat)
+    if etag_matches(request.headers.get("If-None-Match", ""), etag):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    if settings.MEDIA_SERVE_MODE in ("x-sendfile", "x-accel-redirect"):
+        response = accel_response(full_path, path)
+    else:
+        content_type, _ = mimetypes.guess_type(full_path.name)
+        content_type = content_type or "application/octet-stream"
+        try:
+            byte_range = parse_range(
+                request.headers.get("Range", ""), stat.st_size
+            )
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+        if byte_range and request.method == "GET":
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                iter_range(full_path, start, end),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+            response["Content-Length"] = end - start + 1
+        else:
+            response = FileResponse(
+                open(full_path, "rb"), content_type=content_type
+            )
+        response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -0,0 +1,266 @@
+"""
+Per-endpoint request metrics in the Prometheus text format.
+
+`MetricsMiddleware` labels every request with its view (for DRF
+viewsets `FlightViewSet.list`, `OrderViewSet.create`, ...) and records
+a latency histogram, status counts, time spent in SQL and time spent
+rendering the response. Each process keeps plain counters in memory
+and, when METRICS_DIR is set, dumps them to `<pid>.json` there at most
+every METRICS_FLUSH_INTERVAL seconds; `/metrics` sums all the dumps so
+every worker of the server is reported. Dumps of processes that exited
+are folded into `retired.json` and removed, so the totals never go
+backwards and a new worker reusing a pid does not overwrite them.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RETIRED = "retired.json"
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # (view, method) -> [count, sum, db, render, *bucket counts]
+        self.requests = defaultdict(lambda: [0, 0.0, 0.0, 0.0]
+                                    + [0] * len(BUCKETS))
+        # (view, method, status) -> count
+        self.statuses = defaultdict(int)
+        self.flushed_at = 0.0
+        # Whether <pid>.json is this process's own dump yet.
+        self.claimed = False
+
+    def observe(self, view, method, status, duration, db, render):
+        with self.lock:
+            series = self.requests[view, method]
+            series[0] += 1
+            series[1] += duration
+            series[2] += db
+            series[3] += render
+            for index, bound in enumerate(BUCKETS):
+                if duration <= bound:
+                    series[4 + index] += 1
+                    break
+            self.statuses[view, method, status] += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "requests": [[*key, *value]
+                             for key, value in self.requests.items()],
+                "statuses": [[*key, value]
+                             for key, value in self.statuses.items()],
+            }
+
+    def flush(self, directory: str, interval: float) -> None:
+        now = time.monotonic()
+        if now - self.flushed_at < interval:
+            return
+        self.flushed_at = now
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        if not self.claimed:
+            # Left by an exited process that had the same pid.
+            retire(path, [path / f"{os.getpid()}.json"])
+            self.claimed = True
+        write_snapshot(path / f"{os.getpid()}.json", self.snapshot())
+
+
+registry = Registry()
+
+
+def write_snapshot(path: Path, snapshot: dict) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(snapshot))
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: Path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def retire(directory: Path, dumps: list) -> None:
+    """Fold `dumps` into retired.json and remove them, under a lock so
+    two workers never fold the same dump twice."""
+    with open(directory / ".lock", "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        dumps = [dump for dump in dumps if dump.is_file()]
+        if not dumps:
+            return
+        snapshots = [read_snapshot(path)
+                     for path in (directory / RETIRED, *dumps)]
+        requests, statuses = merge(filter(None, snapshots))
+        write_snapshot(directory / RETIRED, {
+            "requests": [[*key, *value] for key, value in requests.items()],
+            "statuses": [[*key, value] for key, value in statuses.items()],
+        })
+        for dump in dumps:
+            dump.unlink(missing_ok=True)
+
+
+def collect_snapshots() -> list:
+    snapshots = [registry.snapshot()]
+    directory = getattr(settings, "METRICS_DIR", None)
+    if directory and Path(directory).is_dir():
+        retire(Path(directory), [
+            dump for dump in Path(directory).glob("*.json")
+            if dump.stem.isdigit() and int(dump.stem) != os.getpid()
+            and not is_running(int(dump.stem))
+        ])
+        own = f"{os.getpid()}.json"
+        for dump in Path(directory).glob("*.json"):
+            if dump.name == own:
+                continue
+            snapshot = read_snapshot(dump)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+    return snapshots
+
+
+def merge(snapshots: list) -> tuple:
+    requests = defaultdict(lambda: [0, 0.0, 0.0, 0.0] + [0] * len(BUCKETS))
+    statuses = defaultdict(int)
+    for snapshot in snapshots:
+        for view, method, *values in snapshot["requests"]:
+            series = requests[view, method]
+            for index, value in enumerate(values):
+                series[index] += value
+        for view, method, status, count in snapshot["statuses"]:
+            statuses[view, method, status] += count
+    return requests, statuses
+
+
+def render_prometheus(requests: dict, statuses: dict) -> str:
+    lines = [
+        "# HELP airport_http_request_duration_seconds Request latency.",
+        "# TYPE airport_http_request_duration_seconds histogram",
+    ]
+    for (view, method), series in sorted(requests.items()):
+        labels = f'view="{view}",method="{method}"'
+        cumulative = 0
+        for bound, count in zip(BUCKETS, series[4:]):
+            cumulative += count
+            lines.append(
+                "airport_http_request_duration_seconds_bucket"
+                f'{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append("airport_http_request_duration_seconds_bucket"
+                     f'{{{labels},le="+Inf"}} {series[0]}')
+        lines.append("airport_http_request_duration_seconds_sum"
+                     f"{{{labels}}} {series[1]:.6f}")
+        lines.append("airport_http_request_duration_seconds_count"
+                     f"{{{labels}}} {series[0]}")
+    for name, index, help_text in (
+        ("airport_http_db_seconds_total", 2, "Time spent in SQL."),
+        ("airport_http_render_seconds_total", 3,
+         "Time spent rendering responses."),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (view, method), series in sorted(requests.items()):
+            lines.append(f'{name}{{view="{view}",method="{method}"}} '
+                         f"{series[index]:.6f}")
+    lines += [
+        "# HELP airport_http_responses_total Responses by status code.",
+        "# TYPE airport_http_responses_total counter",
+    ]
+    for (view, method, status), count in sorted(statuses.items()):
+        lines.append("airport_http_responses_total"
+                     f'{{view="{view}",method="{method}",'
+                     f'status="{status}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def view_label(request, view_func) -> str:
+    view_class = getattr(view_func, "cls", None)
+    if view_class is None:
+        match = request.resolver_match
+        return (match.view_name if match and match.view_name
+                else getattr(view_func, "__name__", "unknown"))
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f"{view_class.__name__}.{action}"
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        request._metrics = {"view": "unresolved", "db": 0.0, "render": None}
+
+        def timed_query(execute, sql, params, many, context):
+            query_started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                request._metrics["db"] += time.perf_counter() - query_started
+
+        # Replica reads count as database time as well.
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timed_query))
+            response = self.get_response(request)
+
+        finished = time.perf_counter()
+        metrics = request._metrics
+        render = finished - metrics["render"] if metrics["render"] else 0.0
+        registry.observe(metrics["view"],
+                         request.method,
+                         response.status_code,
+                         finished - started,
+                         metrics["db"],
+                         render)
+        directory = getattr(settings, "METRICS_DIR", None)
+        if directory:
+            registry.flush(directory, settings.METRICS_FLUSH_INTERVAL)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics["view"] = view_label(request, view_func)
+
+    def process_template_response(self, request, response):
+        # Runs after the view returned and right before response.render().
+        request._metrics["render"] = time.perf_counter()
+        return response
+
+
+def metrics_view(request):
+    allowed = getattr(settings, "METRICS_ALLOWED_IPS", [])
+    if (request.META.get("REMOTE_ADDR") not in allowed
+            and not request.user.is_staff):
+        return HttpResponseForbidden()
+    requests, statuses = merge(collect_snapshots())
+    return HttpResponse(render_prometheus(requests, statuses),
+                        content_type="text/plain; version=0.0.4")
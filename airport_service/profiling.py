@@ -0,0 +1,231 @@
+"""
+Opt-in request profiling (PROFILING_ENABLED=1).
+
+A PROFILING_SAMPLE_RATE share of requests, and every request of a staff
+user sending `X-Profile: 1`, run under cProfile. All other requests are
+watched by a background stack sampler that only costs anything while
+requests are in flight; if one ends up slower than
+PROFILING_SLOW_THRESHOLD its sampled stacks are kept. A forced request
+that finds cProfile busy with another request is sampled and always
+kept. Either way the SQL timeline of every database is stored next to
+the profile in one zip per request under PROFILING_DIR, and at most
+PROFILING_MAX_PROFILES are kept.
+"""
+import cProfile
+import json
+import marshal
+import random
+import sys
+import threading
+import time
+import uuid
+import zipfile
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+from airport_service.metrics import view_label
+
+# Only one cProfile can be active per process on recent Pythons.
+cprofile_lock = threading.Lock()
+
+
+def fold_stack(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Samples the frames of registered threads every `interval`."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stacks = {}
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def start(self, thread_id: int) -> None:
+        with self.lock:
+            self.stacks[thread_id] = Counter()
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run,
+                                               name="request-sampler",
+                                               daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+
+    def stop(self, thread_id: int) -> Counter:
+        with self.lock:
+            return self.stacks.pop(thread_id, Counter())
+
+    def run(self) -> None:
+        while True:
+            with self.lock:
+                idle = not self.stacks
+            if idle:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, stacks in self.stacks.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[fold_stack(frame)] += 1
+
+
+sampler = StackSampler(getattr(settings, "PROFILING_SAMPLE_INTERVAL", 0.005))
+
+
+def is_staff(request) -> bool:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken
+
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return False
+    return bool(authenticated and authenticated[0].is_staff)
+
+
+def write_archive(path: Path, kind: str, profile: bytes,
+                  timeline: list, meta: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            "profile.prof" if kind == "cprofile" else "stacks.folded",
+            profile,
+        )
+        archive.writestr("sql.json", json.dumps([
+            {"start": round(start, 6), "duration": round(duration, 6),
+             "database": alias, "sql": sql}
+            for start, duration, alias, sql in timeline
+        ], indent=1))
+        archive.writestr("request.json", json.dumps(meta, indent=1))
+
+
+def enforce_retention() -> None:
+    from airport.models import RequestProfile
+
+    directory = Path(settings.PROFILING_DIR)
+    expired = list(
+        RequestProfile.objects
+        .order_by("-created_at", "-id")
+        .values_list("id", "file_name")[settings.PROFILING_MAX_PROFILES:]
+    )
+    for _, file_name in expired:
+        (directory / file_name).unlink(missing_ok=True)
+    RequestProfile.objects.filter(
+        id__in=[profile_id for profile_id, _ in expired]
+    ).delete()
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        forced = ("HTTP_X_PROFILE" in request.META) and is_staff(request)
+        use_cprofile = (
+            (forced or random.random() < settings.PROFILING_SAMPLE_RATE)
+            and cprofile_lock.acquire(blocking=False)
+        )
+        request._profiling_view = "unresolved"
+        timeline = []
+        started = time.perf_counter()
+
+        def record_query(execute, sql, params, many, context):
+            query_started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                timeline.append((query_started - started,
+                                 time.perf_counter() - query_started,
+                                 context["connection"].alias,
+                                 sql))
+
+        thread_id = threading.get_ident()
+        profiler = None
+        if use_cprofile:
+            profiler = cProfile.Profile()
+        else:
+            sampler.start(thread_id)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(record_query)
+                    )
+                if profiler:
+                    profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profiler:
+                        profiler.disable()
+        finally:
+            if use_cprofile:
+                cprofile_lock.release()
+                stacks = None
+            else:
+                stacks = sampler.stop(thread_id)
+        duration = time.perf_counter() - started
+
+        if profiler:
+            profiler.create_stats()
+            data = marshal.dumps(profiler.stats)
+            kind = "cprofile"
+        elif forced or duration >= settings.PROFILING_SLOW_THRESHOLD:
+            data = "\n".join(f"{stack} {count}"
+                             for stack, count in stacks.items()).encode()
+            kind = "stacks"
+        else:
+            return response
+        profile = self.save(request, response, duration,
+                            kind, data, timeline)
+        response["X-Profile-Id"] = str(profile.id)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._profiling_view = view_label(request, view_func)
+
+    def save(self, request, response, duration, kind, data, timeline):
+        from airport.models import RequestProfile
+
+        file_name = (f"{time.strftime('%Y%m%d-%H%M%S')}-"
+                     f"{uuid.uuid4().hex[:8]}.zip")
+        meta = {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "view": request._profiling_view,
+            "status": response.status_code,
+            "duration": duration,
+        }
+        write_archive(Path(settings.PROFILING_DIR) / file_name,
+                      kind, data, timeline, meta)
+        profile = RequestProfile.objects.create(
+            method=request.method,
+            path=request.get_full_path()[:500],
+            view=request._profiling_view,
+            status=response.status_code,
+            duration=duration,
+            sql_count=len(timeline),
+            sql_duration=sum(query[1] for query in timeline),
+            kind=kind,
+            file_name=file_name,
+        )
+        enforce_retention()
+        return profile
@@ -0,0 +1,129 @@
+"""
+Precomputed OpenAPI schema.
+
+The build_schema command renders the schema once, at image build time,
+into API_SCHEMA_DIR as schema.yaml and schema.json plus a gzipped copy
+of each. The image builds into /files/schema, outside /app where
+docker-compose mounts the source tree. `/doc/` serves those files from
+memory with an ETag of their content, suffixed with -gzip for the
+gzipped copy, so a client polling the schema mostly gets 304 responses
+and nothing is introspected per request. Without the files the schema
+is generated per request under DEBUG and missing otherwise.
+"""
+import gzip
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import quote_etag
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_safe
+
+from airport_service.compression import choose_coding
+
+FORMATS = {
+    "yaml": "application/vnd.oai.openapi",
+    "json": "application/vnd.oai.openapi+json",
+}
+SCHEMA_CACHE_CONTROL = "public, no-cache"
+
+
+def schema_path(fmt: str, directory=None) -> Path:
+    return Path(directory or settings.API_SCHEMA_DIR) / f"schema.{fmt}"
+
+
+def render_schema() -> dict:
+    """{format: rendered schema bytes}, like `manage.py spectacular`."""
+    from drf_spectacular.renderers import (OpenApiJsonRenderer,
+                                           OpenApiYamlRenderer)
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        "yaml": OpenApiYamlRenderer().render(schema, renderer_context={}),
+        "json": OpenApiJsonRenderer().render(schema, renderer_context={}),
+    }
+
+
+def build(directory=None) -> dict:
+    """Write every format and its .gz next to it, returns the paths."""
+    written = {}
+    for fmt, content in render_schema().items():
+        path = schema_path(fmt, directory)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        path.with_name(path.name + ".gz").write_bytes(
+            gzip.compress(content, mtime=0)
+        )
+        written[fmt] = path
+    return written
+
+
+@lru_cache(maxsize=8)
+def _load(path: Path, mtime_ns: int):
+    content = path.read_bytes()
+    compressed = path.with_name(path.name + ".gz")
+    gzipped = (compressed.read_bytes() if compressed.is_file()
+               else gzip.compress(content, mtime=0))
+    etag = quote_etag(hashlib.sha256(content).hexdigest()[:32])
+    return content, gzipped, etag
+
+
+def load(fmt: str):
+    """(content, gzipped content, etag) of a built schema, or None."""
+    path = schema_path(fmt)
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _load(path, mtime_ns)
+
+
+def requested_format(request) -> str:
+    fmt = request.GET.get("format")
+    if fmt in FORMATS:
+        return fmt
+    return "json" if "json" in request.headers.get("Accept", "") else "yaml"
+
+
+_live_view = None
+
+
+def live_schema(request):
+    global _live_view
+    if _live_view is None:
+        _live_view = import_string(
+            "drf_spectacular.views.SpectacularAPIView"
+        ).as_view()
+    return _live_view(request)
+
+
+@require_safe
+def schema_view(request):
+    fmt = requested_format(request)
+    built = load(fmt)
+    if built is None:
+        if settings.DEBUG:
+            return live_schema(request)
+        raise Http404("The API schema was not built, run build_schema.")
+    content, gzipped, etag = built
+    encoding = None
+    if choose_coding(request.headers.get("Accept-Encoding", ""),
+                     available=("gzip",)):
+        # Each representation needs its own strong validator.
+        content, encoding, etag = gzipped, "gzip", etag[:-1] + '-gzip"'
+
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=FORMATS[fmt])
+        if encoding:
+            response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    response["Cache-Control"] = SCHEMA_CACHE_CONTROL
+    patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+    return response
@@ -39,8 +39,14 @@ INTERNAL_IPS = [
 
 # Application definition
 
+# Optional parts a process can leave out to boot faster,
+# e.g. API-only workers
+ADMIN_ENABLED = os.environ.get("ADMIN_ENABLED", "1") == "1"
+DEBUG_TOOLBAR_ENABLED = (
+    DEBUG and os.environ.get("DEBUG_TOOLBAR_ENABLED", "1") == "1"
+)
+
 INSTALLED_APPS = [
-    "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -49,14 +55,16 @@ INSTALLED_APPS = [
     "rest_framework",
     "drf_spectacular",
     "rest_framework_simplejwt",
-    "debug_toolbar",
     "airport",
     "user",
 ]
+if ADMIN_ENABLED:
+    INSTALLED_APPS.insert(0, "django.contrib.admin")
 
 MIDDLEWARE = [
+    "airport_service.metrics.MetricsMiddleware",
+    "airport_service.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -64,6 +72,12 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+if DEBUG_TOOLBAR_ENABLED:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
 
 ROOT_URLCONF = "airport_service.urls"
 
@@ -112,6 +126,49 @@ else:
         }
     }
 
+# Comma separated replica hosts (PostgreSQL) or files (SQLite),
+# see airport_service.db_router
+DATABASE_REPLICAS = []
+for index, replica in enumerate(
+        filter(None, os.environ.get("DATABASE_REPLICAS", "").split(","))):
+    alias = f"replica_{index}"
+    location = {"HOST": replica} if USE_DOCKER else {"NAME": replica}
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        **location,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ["airport_service.db_router.ReplicaRouter"]
+
+# The cache must be shared by every worker process: the replica
+# stickiness marker, the airport grid version and cached seat maps and
+# analytics have to agree across them. Redis when REDIS_URL is set, a
+# database table (created by `manage.py prepare`) under Docker's
+# multi-worker gunicorn, process memory for a local runserver and tests.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+elif USE_DOCKER:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "airport_cache",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+# Seconds a user reads from the primary after writing
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 10))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -153,6 +210,67 @@ USE_TZ = True
 STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 
+# How MEDIA_URL is served:
+# "static" - django.conf.urls.static, development only
+# "django" - FileResponse with Range/ETag and immutable caching
+# "x-sendfile" / "x-accel-redirect" - hand the file off to the web server
+MEDIA_SERVE_MODE = os.environ.get("MEDIA_SERVE_MODE", "static")
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get(
+    "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/"
+)
+
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+
+# Per-process metrics dumps, summed by /metrics across workers
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+METRICS_ALLOWED_IPS = os.environ.get(
+    "METRICS_ALLOWED_IPS", ",".join(INTERNAL_IPS)
+).split(",")
+
+# Smallest response body worth compressing, in bytes
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+
+# Thread pool size for generating airplane image renditions
+AIRPLANE_IMAGE_WORKERS = int(os.environ.get("AIRPLANE_IMAGE_WORKERS", 2))
+
+# Seconds a flight's cached seat map is kept
+SEAT_MAP_CACHE_TIMEOUT = int(os.environ.get("SEAT_MAP_CACHE_TIMEOUT", 300))
+
+# Seconds admin analytics results are cached
+ANALYTICS_CACHE_TIMEOUT = int(os.environ.get("ANALYTICS_CACHE_TIMEOUT", 300))
+
+# Minutes an airplane needs on the ground between two flights
+AIRPLANE_MIN_TURNAROUND = int(os.environ.get("AIRPLANE_MIN_TURNAROUND", 30))
+
+# Seconds between two runs of the fare recomputation job, which moves
+# fares into their current days-to-departure bucket
+FARE_RECOMPUTE_INTERVAL = int(os.environ.get("FARE_RECOMPUTE_INTERVAL", 3600))
+
+# Seconds an Idempotency-Key of an order request is remembered
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", 86400))
+
+# Opt-in request profiling, see airport_service/profiling.py
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED") == "1"
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0.01))
+PROFILING_SLOW_THRESHOLD = float(
+    os.environ.get("PROFILING_SLOW_THRESHOLD", 1.0)
+)
+PROFILING_SAMPLE_INTERVAL = float(
+    os.environ.get("PROFILING_SAMPLE_INTERVAL", 0.005)
+)
+PROFILING_DIR = os.environ.get("PROFILING_DIR", BASE_DIR / "profiles")
+PROFILING_MAX_PROFILES = int(os.environ.get("PROFILING_MAX_PROFILES", 200))
+if PROFILING_ENABLED:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index(
+            "django.contrib.auth.middleware.AuthenticationMiddleware"
+        ) + 1,
+        "airport_service.profiling.ProfilingMiddleware",
+    )
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -166,6 +284,15 @@ SIMPLE_JWT = {
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": (
+        "airport_service.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "airport_service.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_PAGINATION_CLASS":
         "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 5,
@@ -185,6 +312,10 @@ REST_FRAMEWORK = {
     },
 }
 
+# Built by `manage.py build_schema`, see airport_service/schema.py;
+# the Docker image sets /files/schema
+API_SCHEMA_DIR = os.environ.get("API_SCHEMA_DIR", BASE_DIR / "schema")
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Airport Service API",
     "DESCRIPTION": "Order tickets for your Airport Service",
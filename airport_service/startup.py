@@ -0,0 +1,89 @@
+"""
+Startup instrumentation.
+
+measure() boots a target in a fresh interpreter under
+`python -X importtime` and returns how long each imported module took,
+so slow imports show up without touching the running process. The
+startup_report command prints the result.
+
+Targets:
+    wsgi   - what a web worker loads: settings, apps and the URLconf
+    setup  - what every manage.py command loads: settings and apps
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+
+TARGETS = {
+    "wsgi": "import airport_service.wsgi",
+    "setup": "import django; django.setup()",
+}
+IMPORT_LINE = re.compile(
+    r"^import time:\s+(?P<own>\d+) \|\s+(?P<total>\d+) \|(?P<indent> *)"
+    r"(?P<module>\S+)$"
+)
+
+
+def warm_up():
+    """Import the URLconf and with it every view, so a pre-forking
+    server loads them once before forking instead of in each worker."""
+    from django.urls import get_resolver
+
+    return get_resolver().url_patterns
+
+
+def parse_importtime(lines) -> list:
+    """[(module, own µs, cumulative µs, depth)] from -X importtime
+    output, in import order."""
+    imports = []
+    for line in lines:
+        match = IMPORT_LINE.match(line.rstrip("\n"))
+        if match:
+            imports.append((
+                match["module"],
+                int(match["own"]),
+                int(match["total"]),
+                len(match["indent"]) // 2,
+            ))
+    return imports
+
+
+def by_package(imports) -> dict:
+    """Own import time summed per top-level package, slowest first."""
+    totals = defaultdict(int)
+    for module, own, _total, _depth in imports:
+        totals[module.partition(".")[0]] += own
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def measure(target: str = "wsgi") -> dict:
+    """Boot `target` (see TARGETS) in a subprocess and time it."""
+    env = {**os.environ,
+           "DJANGO_SETTINGS_MODULE": os.environ.get(
+               "DJANGO_SETTINGS_MODULE", "airport_service.settings")}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", TARGETS[target]],
+        cwd=Path(settings.BASE_DIR),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    imports = parse_importtime(result.stderr.splitlines())
+    if result.returncode:
+        errors = [line for line in result.stderr.splitlines()
+                  if not IMPORT_LINE.match(line)]
+        raise RuntimeError("\n".join(errors[-20:]))
+    return {
+        "target": target,
+        "seconds": elapsed,
+        "imports": imports,
+        "modules": {module for module, *_rest in imports},
+    }
@@ -14,25 +14,63 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf.urls.static import static
 from django.conf import settings
-from drf_spectacular.views import (SpectacularAPIView,
-                                   SpectacularRedocView,
-                                   SpectacularSwaggerView)
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
+from django.utils.module_loading import import_string
+
+from airport_service.media import serve_media
+from airport_service.metrics import metrics_view
+from airport_service.schema import schema_view
+
+
+def lazy_view(view_path: str, **initkwargs):
+    """Import a class-based view on its first request: schema
+    generation is rarely used and slow to import."""
+    view = None
+
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(view_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return dispatch
 
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("user/", include("user.urls", namespace="user")),
     path("airport/", include("airport.urls", namespace="airport")),
-    path("__debug__/", include("debug_toolbar.urls")),
-    path("doc/", SpectacularAPIView.as_view(), name="schema"),
+    path("metrics", metrics_view, name="metrics"),
+    path("doc/", schema_view, name="schema"),
     path("doc/swagger/",
-         SpectacularSwaggerView.as_view(url_name="schema"),
+         lazy_view("drf_spectacular.views.SpectacularSwaggerView",
+                   url_name="schema"),
          name="swagger-ui"),
     path("doc/redoc/",
-         SpectacularRedocView.as_view(url_name="schema"),
+         lazy_view("drf_spectacular.views.SpectacularRedocView",
+                   url_name="schema"),
          name="redoc"),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
+
+if settings.DEBUG_TOOLBAR_ENABLED:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
+
+# Admin and toolbar assets under DEBUG, also when not using runserver
+urlpatterns += staticfiles_urlpatterns()
+
+if settings.MEDIA_SERVE_MODE == "static":
+    urlpatterns += static(settings.MEDIA_URL,
+                          document_root=settings.MEDIA_ROOT)
+else:
+    urlpatterns += [
+        re_path(r"^%s(?P<path>.*)$" % settings.MEDIA_URL.lstrip("/"),
+                serve_media,
+                name="media"),
+    ]
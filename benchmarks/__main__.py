@@ -0,0 +1,268 @@
+"""
+Booking flow benchmarks.
+
+    python -m benchmarks run --scale small --concurrency 8 -o new.json
+    python -m benchmarks run --url http://127.0.0.1:8000 \\
+        --email bench0@example.com --password bench-password
+    python -m benchmarks compare base.json new.json
+    python -m benchmarks overhead
+    python -m benchmarks pricing --flights 100000
+    python -m benchmarks encoding --sizes 1000 1000000
+
+In-process runs create a separate test database (a SQLite file when the
+default database is SQLite), seed it and disable DRF throttling.
+HTTP runs measure a server that is already seeded and running, e.g.
+with `manage.py generate_data --email-prefix bench --password
+bench-password`; the server's throttle rates apply there.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "airport_service.settings")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def collect_targets(pages_size: int) -> dict:
+    from airport.models import Flight
+
+    flights = list(
+        Flight.objects
+        .order_by("?")
+        .values_list("id", "airplane__rows", "airplane__seats_in_row")[:1000]
+    )
+    return {
+        "flights": flights,
+        "flight_pages": max(Flight.objects.count() // pages_size, 1),
+    }
+
+
+@contextmanager
+def bench_database(keepdb: bool):
+    from django.conf import settings
+    from django.test.utils import (setup_databases,
+                                   setup_test_environment,
+                                   teardown_databases)
+
+    database = settings.DATABASES["default"]
+    if database["ENGINE"].endswith("sqlite3"):
+        database.setdefault("TEST", {})
+        if not database["TEST"].get("NAME"):
+            database["TEST"]["NAME"] = str(settings.BASE_DIR / "bench.sqlite3")
+    setup_test_environment()
+    old_config = setup_databases(
+        verbosity=0, interactive=False, keepdb=keepdb
+    )
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0, keepdb=keepdb)
+
+
+def run_in_process(args) -> tuple:
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test.utils import override_settings
+
+    from airport.datagen import SCALES, generate
+    from airport.models import Flight, Ticket
+    from benchmarks import runner
+
+    no_throttling = {**settings.REST_FRAMEWORK,
+                     "DEFAULT_THROTTLE_CLASSES": []}
+    with bench_database(args.keepdb):
+        with override_settings(DEBUG=False, REST_FRAMEWORK=no_throttling):
+            user_model = get_user_model()
+            if not (user_model.objects
+                    .filter(email=runner.BENCH_EMAIL).exists()):
+                generate(seed=args.seed,
+                         email_prefix=runner.BENCH_EMAIL_PREFIX,
+                         password=runner.BENCH_PASSWORD,
+                         **SCALES[args.scale])
+            user = user_model.objects.get(email=runner.BENCH_EMAIL)
+            dataset = {
+                "scale": args.scale,
+                "flights": Flight.objects.count(),
+                "tickets": Ticket.objects.count(),
+            }
+            targets = collect_targets(settings.REST_FRAMEWORK["PAGE_SIZE"])
+            results = runner.run(
+                lambda: runner.ClientTransport(user),
+                targets,
+                scenarios=args.scenarios,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                seed=args.seed,
+            )
+    return dataset, results
+
+
+def run_http(args) -> tuple:
+    from benchmarks import runner
+
+    probe = runner.HttpTransport(args.url, args.email, args.password)
+    headers = {"Authorization": f"Bearer {probe.token}"}
+    _, body = probe._send("GET", "/airport/flights/", headers=headers)
+    page = json.loads(body)
+    flights = []
+    for flight in page["results"]:
+        _, body = probe._send(
+            "GET", f"/airport/flights/{flight['id']}/", headers=headers
+        )
+        airplane = json.loads(body)["airplane"]
+        flights.append(
+            (flight["id"], airplane["rows"], airplane["seats_in_row"])
+        )
+    targets = {
+        "flights": flights,
+        "flight_pages": max(page["count"] // max(len(flights), 1), 1),
+    }
+    results = runner.run(
+        lambda: runner.HttpTransport(args.url, args.email, args.password),
+        targets,
+        scenarios=args.scenarios,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        seed=args.seed,
+    )
+    return {"url": args.url, "flights": page["count"]}, results
+
+
+def command_run(args) -> None:
+    django.setup()
+    from benchmarks.runner import SCENARIOS
+
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    if args.url:
+        dataset, results = run_http(args)
+    else:
+        dataset, results = run_in_process(args)
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "mode": "http" if args.url else "in-process",
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "scenarios": args.scenarios,
+        },
+        "dataset": dataset,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as result_file:
+            result_file.write(output + "\n")
+    print(output)
+
+
+def command_compare(args) -> None:
+    from benchmarks.runner import compare
+
+    with open(args.base) as base_file, open(args.new) as new_file:
+        rows = compare(json.load(base_file), json.load(new_file))
+    print(f"{'scenario':<16}{'metric':<22}{'base':>12}{'new':>12}"
+          f"{'change %':>10}")
+    for scenario, metric, old_value, new_value, change in rows:
+        print(f"{scenario:<16}{metric:<22}{old_value!s:>12}"
+              f"{new_value!s:>12}{change if change is not None else '-':>10}")
+
+
+def command_overhead(args) -> None:
+    django.setup()
+    from django.utils.module_loading import import_string
+
+    from benchmarks.overhead import measure
+
+    results = [measure(import_string(path), args.iterations)
+               for path in args.middleware]
+    print(json.dumps(results, indent=2))
+
+
+def command_pricing(args) -> None:
+    django.setup()
+    from benchmarks.pricing import measure
+
+    with bench_database(args.keepdb):
+        result = measure(args.flights, args.seed, args.chunk_size)
+    print(json.dumps(result, indent=2))
+
+
+def command_encoding(args) -> None:
+    django.setup()
+    from benchmarks.encoding import measure
+
+    print(json.dumps(measure(args.sizes, args.min_seconds), indent=2))
+
+
+def main(argv=None) -> None:
+    sys.path.insert(0, os.getcwd())
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--scale", default="small",
+                            choices=("tiny", "small", "medium", "large"))
+    run_parser.add_argument("--requests", type=int, default=200)
+    run_parser.add_argument("--concurrency", type=int, default=4)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--scenarios", nargs="*")
+    run_parser.add_argument("--keepdb", action="store_true")
+    run_parser.add_argument("--url")
+    run_parser.add_argument("--email", default="bench0@example.com")
+    run_parser.add_argument("--password", default="bench-password")
+    run_parser.add_argument("-o", "--output")
+    run_parser.set_defaults(func=command_run)
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.set_defaults(func=command_compare)
+
+    overhead_parser = commands.add_parser("overhead")
+    overhead_parser.add_argument(
+        "--middleware", nargs="*",
+        default=["airport_service.metrics.MetricsMiddleware"],
+    )
+    overhead_parser.add_argument("--iterations", type=int, default=20_000)
+    overhead_parser.set_defaults(func=command_overhead)
+
+    pricing_parser = commands.add_parser("pricing")
+    pricing_parser.add_argument("--flights", type=int, default=100_000)
+    pricing_parser.add_argument("--chunk-size", type=int, default=5_000)
+    pricing_parser.add_argument("--seed", type=int, default=0)
+    pricing_parser.add_argument("--keepdb", action="store_true")
+    pricing_parser.set_defaults(func=command_pricing)
+
+    encoding_parser = commands.add_parser("encoding")
+    encoding_parser.add_argument("--sizes", type=int, nargs="*",
+                                 default=[1_000, 10_000, 100_000,
+                                          1_000_000, 5_000_000])
+    encoding_parser.add_argument("--min-seconds", type=float, default=0.2)
+    encoding_parser.set_defaults(func=command_encoding)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
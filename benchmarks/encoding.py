@@ -0,0 +1,111 @@
+"""
+JSON rendering, parsing and response compression by payload size.
+
+Payloads are flight list pages (nested route, airplane and crew, as
+the serializers output them) grown to each target size. Rendering and
+parsing compare DRF's stdlib JSONRenderer/JSONParser with the orjson
+fast path; compression reports the ratio and time of every coding
+CompressionMiddleware can use here. "layouts" are the body sizes of
+the bulk formats (see BULK_RENDERER_CLASSES) for the same rows.
+"""
+import io
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from airport_service.compression import CODINGS
+from airport_service.parsers import FastJSONParser
+from airport_service.renderers import (BULK_RENDERER_CLASSES,
+                                       FastJSONRenderer,
+                                       orjson)
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 5_000_000)
+
+
+def flight(index: int) -> dict:
+    departure = (datetime(2025, 1, 1, tzinfo=timezone.utc)
+                 + timedelta(hours=index))
+    return {
+        "id": index,
+        "route": {
+            "id": index % 500,
+            "source": f"Airport {index % 97}",
+            "destination": f"Airport {index % 89}",
+            "distance": 300 + index % 4000,
+        },
+        "airplane": {"id": index % 200, "name": f"SkyBird-{index % 200}",
+                     "rows": 30, "seats_in_row": 6},
+        "crew": [{"id": index % 50 + crew, "full_name": f"Pilot {crew}"}
+                 for crew in range(3)],
+        "departure_time": departure.isoformat(),
+        "arrival_time": (departure
+                         + timedelta(hours=2, minutes=30)).isoformat(),
+        "tickets_available": 180 - index % 180,
+        "fare": str(Decimal("129.90") + index % 300),
+    }
+
+
+def payload(size: int) -> list:
+    """A flight list whose JSON is at least `size` bytes."""
+    per_flight = len(JSONRenderer().render([flight(0)]))
+    return [flight(index) for index in range(max(size // per_flight, 1))]
+
+
+def timed(function, min_seconds: float) -> float:
+    """Median milliseconds of `function`, repeated for at least
+    `min_seconds` and 3 runs."""
+    runs = []
+    started = time.perf_counter()
+    while len(runs) < 3 or time.perf_counter() - started < min_seconds:
+        run_started = time.perf_counter()
+        function()
+        runs.append(time.perf_counter() - run_started)
+    return round(statistics.median(runs) * 1000, 3)
+
+
+def measure(sizes=SIZES, min_seconds: float = 0.2) -> dict:
+    results = []
+    for size in sizes:
+        data = payload(size)
+        content = JSONRenderer().render(data)
+        assert json.loads(FastJSONRenderer().render(data)) == \
+            json.loads(content)
+        row = {
+            "target_bytes": size,
+            "bytes": len(content),
+            "render_ms": {
+                "stdlib": timed(lambda: JSONRenderer().render(data),
+                                min_seconds),
+                "fast": timed(lambda: FastJSONRenderer().render(data),
+                              min_seconds),
+            },
+            "parse_ms": {
+                "stdlib": timed(
+                    lambda: JSONParser().parse(io.BytesIO(content)),
+                    min_seconds),
+                "fast": timed(
+                    lambda: FastJSONParser().parse(io.BytesIO(content)),
+                    min_seconds),
+            },
+            "compression": {},
+            "layouts": {
+                renderer.format: len(renderer().render({"results": data}))
+                for renderer in BULK_RENDERER_CLASSES
+            },
+        }
+        for coding, compress in CODINGS.items():
+            compressed = compress(content)
+            row["compression"][coding] = {
+                "bytes": len(compressed),
+                "ratio": round(len(content) / len(compressed), 2),
+                "ms": timed(lambda: compress(content), min_seconds),
+            }
+        results.append(row)
+    return {"orjson": orjson is not None and orjson.__version__,
+            "codings": list(CODINGS),
+            "sizes": results}
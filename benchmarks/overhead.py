@@ -0,0 +1,36 @@
+"""
+Per-request cost of always-on middleware, measured against a view
+that does nothing, so the difference is the middleware itself.
+"""
+import time
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+
+def noop_view(request):
+    return HttpResponse(b"{}", content_type="application/json")
+
+
+def time_calls(handler, requests: list) -> float:
+    started = time.perf_counter()
+    for request in requests:
+        handler(request)
+    return time.perf_counter() - started
+
+
+def measure(middleware_class, iterations: int = 20_000) -> dict:
+    factory = RequestFactory()
+    requests = [factory.get("/airport/flights/") for _ in range(iterations)]
+    wrapped = middleware_class(noop_view)
+    baseline = time_calls(noop_view, requests)
+    with_middleware = time_calls(wrapped, requests)
+    per_request = (with_middleware - baseline) / iterations
+    return {
+        "middleware": f"{middleware_class.__module__}."
+                      f"{middleware_class.__name__}",
+        "iterations": iterations,
+        "baseline_us": round(baseline / iterations * 1e6, 3),
+        "with_middleware_us": round(with_middleware / iterations * 1e6, 3),
+        "overhead_us": round(per_request * 1e6, 3),
+    }
@@ -0,0 +1,49 @@
+"""
+Batch fare recompute over `flights` seeded flights: a cold run inserts
+every fare, a warm run finds nothing to write and a run a day later
+writes only the flights that crossed a days bucket.
+
+Flights are seeded with few orders and `seats_sold` is then spread over
+the whole capacity range, so every load bucket is exercised without
+inserting millions of tickets.
+"""
+import time
+from datetime import timedelta
+
+from django.db.models import F
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from airport.datagen import generate
+from airport.models import Flight, FlightFare
+from airport.pricing import recompute_all
+
+
+def timed(**kwargs) -> dict:
+    started = time.perf_counter()
+    result = recompute_all(**kwargs)
+    seconds = time.perf_counter() - started
+    return {**result,
+            "seconds": round(seconds, 3),
+            "flights_per_second": round(result["flights"] / seconds)}
+
+
+def measure(flights: int = 100_000, seed: int = 0,
+            chunk_size: int = 5_000) -> dict:
+    now = timezone.now()
+    if Flight.objects.count() < flights:
+        generate(seed=seed, users=50, airports=min(flights // 200 + 10, 500),
+                 airplanes=200, flights=flights - Flight.objects.count(),
+                 as_of=now, load_factor=0.02, chunk_size=chunk_size)
+        Flight.objects.update(
+            seats_sold=Mod(F("id") * 7919, F("capacity") + 1)
+        )
+    FlightFare.objects.all().delete()
+    return {
+        "flights": Flight.objects.count(),
+        "chunk_size": chunk_size,
+        "cold": timed(now=now, chunk_size=chunk_size),
+        "warm": timed(now=now, chunk_size=chunk_size),
+        "next_day": timed(now=now + timedelta(days=1),
+                          chunk_size=chunk_size),
+    }
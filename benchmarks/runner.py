@@ -0,0 +1,175 @@
+"""
+Drive the booking endpoints with a pool of threads and report
+latency percentiles, throughput and queries per request.
+
+Requests go either through an in-process `APIClient` (one per thread,
+queries are counted) or over HTTP against a running server.
+"""
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+SCENARIOS = ("flight_list", "flight_retrieve", "order_create", "order_list")
+BENCH_EMAIL_PREFIX = "bench"
+BENCH_EMAIL = f"{BENCH_EMAIL_PREFIX}0@example.com"
+BENCH_PASSWORD = "bench-password"
+
+
+class ClientTransport:
+    def __init__(self, user):
+        self.client = APIClient(raise_request_exception=False)
+        self.client.force_authenticate(user=user)
+
+    def request(self, method: str, path: str, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            if method == "POST":
+                response = self.client.post(path, data, format="json")
+            else:
+                response = self.client.get(path)
+        return response.status_code, len(queries)
+
+
+class HttpTransport:
+    def __init__(self, base_url: str, email: str, password: str):
+        self.base_url = base_url.rstrip("/")
+        _, body = self._send("POST", "/user/token/", {
+            "email": email, "password": password,
+        })
+        self.token = json.loads(body)["access"]
+
+    def _send(self, method, path, data=None, headers=None):
+        request = urllib.request.Request(
+            self.base_url + path,
+            method=method,
+            data=json.dumps(data).encode() if data is not None else None,
+            headers={"Content-Type": "application/json", **(headers or {})},
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, error.read()
+
+    def request(self, method: str, path: str, data=None):
+        status, _ = self._send(
+            method, path, data, {"Authorization": f"Bearer {self.token}"}
+        )
+        return status, None
+
+
+def build_request(scenario: str, rng: random.Random, targets: dict):
+    """Return (method, path, data) for one request of a scenario."""
+    flight_id, rows, seats_in_row = rng.choice(targets["flights"])
+    if scenario == "flight_list":
+        page = rng.randint(1, targets["flight_pages"])
+        return "GET", f"/airport/flights/?page={page}", None
+    if scenario == "flight_retrieve":
+        return "GET", f"/airport/flights/{flight_id}/", None
+    if scenario == "order_create":
+        return "POST", "/airport/orders/", {"tickets": [{
+            "row": rng.randint(1, rows),
+            "seat": rng.randint(1, seats_in_row),
+            "flight": flight_id,
+        }]}
+    if scenario == "order_list":
+        return "GET", "/airport/orders/", None
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = round(pct / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(scenario, make_transport, targets, requests, concurrency,
+                 seed=0) -> dict:
+    latencies, queries, statuses = [], [], Counter()
+    lock = threading.Lock()
+    per_worker = max(requests // concurrency, 1)
+
+    def worker(worker_id):
+        rng = random.Random(f"{seed}-{scenario}-{worker_id}")
+        transport = make_transport()
+        local_latencies, local_queries, local_statuses = [], [], Counter()
+        try:
+            for _ in range(per_worker):
+                method, path, data = build_request(scenario, rng, targets)
+                started = time.perf_counter()
+                status, query_count = transport.request(method, path, data)
+                local_latencies.append(time.perf_counter() - started)
+                local_statuses[status] += 1
+                if query_count is not None:
+                    local_queries.append(query_count)
+        finally:
+            connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            queries.extend(local_queries)
+            statuses.update(local_statuses)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+        },
+        "queries_per_request": (
+            round(sum(queries) / len(queries), 2) if queries else None
+        ),
+        "statuses": {str(code): count for code, count in statuses.items()},
+    }
+
+
+def run(make_transport, targets, scenarios=SCENARIOS, requests=200,
+        concurrency=4, seed=0) -> dict:
+    return {
+        scenario: run_scenario(scenario, make_transport, targets,
+                               requests, concurrency, seed)
+        for scenario in scenarios
+    }
+
+
+def compare(base: dict, new: dict) -> list:
+    """Rows of (scenario, metric, base, new, change %) for two results."""
+    rows = []
+    for scenario, result in new["results"].items():
+        previous = base["results"].get(scenario)
+        if previous is None:
+            continue
+        metrics = [("throughput_rps", previous["throughput_rps"],
+                    result["throughput_rps"])]
+        metrics += [(f"{name}_ms", previous["latency_ms"][name],
+                     result["latency_ms"][name])
+                    for name in ("p50", "p95", "p99")]
+        metrics.append(("queries_per_request",
+                        previous["queries_per_request"],
+                        result["queries_per_request"]))
+        for metric, old_value, new_value in metrics:
+            change = None
+            if old_value and new_value is not None:
+                change = round((new_value - old_value) / old_value * 100, 1)
+            rows.append((scenario, metric, old_value, new_value, change))
+    return rows